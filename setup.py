@@ -46,7 +46,7 @@ setup(name='enneper',
       author_email='andreas.kuehrmann@gmail.com',
       packages=['enneper'],
       package_dir={'': 'src/enneper'},
-      install_requires=['numpy >= 1.5.1'],
+      install_requires=['numpy >= 1.10'],
       cmdclass = {'build_ext': build_ext},
       ext_modules = exts
       )
\ No newline at end of file
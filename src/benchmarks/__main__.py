@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import argparse
+import sys
+
+# project packages
+import cases
+import harness
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='write a JSON report')
+    run_parser.add_argument('-k', '--filter', dest='pattern',
+                            help='glob pattern on the benchmark keys')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--min-time', type=float, default=.05,
+                            help='seconds per repetition')
+    run_parser.add_argument('--quick', action='store_true',
+                            help='fewer degrees and sizes')
+    run_parser.add_argument('--compare', metavar='BASELINE',
+                            help='compare with a JSON report')
+    run_parser.add_argument('--threshold', type=float, default=.1)
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='compare two JSON reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=.1)
+    return parser
+
+
+def compare(baseline, current, threshold):
+
+    # exit status 1 flags regressions
+    rows = harness.compare(baseline, current, threshold)
+    print(harness.format_comparison(rows))
+    return int(any(row['status'] == 'slower' for row in rows))
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.baseline) as f:
+            baseline = harness.load(f)
+        with open(args.current) as f:
+            current = harness.load(f)
+        return compare(baseline, current, args.threshold)
+
+    report = harness.run(cases.get_cases(args.quick), args.repeat,
+                         args.min_time, args.pattern, sys.stderr)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            harness.dump(report, f)
+    if args.compare is not None:
+        with open(args.compare) as f:
+            return compare(harness.load(f), report, args.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import cStringIO
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.cfoundation as cfdn
+from harness import Case
+
+
+DEGREES = range(1, 8)
+KNOT_COUNTS = (16, 256)
+LOOP_SAMPLE_COUNTS = (1, 1000)
+SAMPLE_COUNTS = (1000, 100000)
+SURFACE_KNOT_COUNTS = (16, 64)
+SURFACE_SAMPLE_COUNTS = (100, 10000)
+
+
+###############################################################################
+# test data
+###############################################################################
+
+def get_knots(deg, n_knots, random_state):
+    knots = np.sort(random_state.uniform(0, 1, n_knots - 2 * deg - 2))
+    return np.hstack((np.zeros(deg + 1), knots, np.ones(deg + 1)))
+
+
+def get_ctrl_pnts(shape, random_state):
+    weights = random_state.uniform(.5, 1.5, shape + (1,))
+    pnts = random_state.uniform(-1, 1, shape + (3,))
+    return np.concatenate((pnts * weights, weights), -1)
+
+
+def get_curve(deg, n_knots, seed=0):
+    random_state = np.random.RandomState(seed)
+    knots = get_knots(deg, n_knots, random_state)
+    ctrl_pnts = get_ctrl_pnts((n_knots - deg - 1,), random_state)
+    return enneper.Curve(ctrl_pnts, knots)
+
+
+def get_surface(deg, n_knots, seed=0):
+    random_state = np.random.RandomState(seed)
+    knots_u = get_knots(deg, n_knots, random_state)
+    knots_v = get_knots(deg, n_knots, random_state)
+    n_ctrl = n_knots - deg - 1
+    ctrl_pnts = get_ctrl_pnts((n_ctrl, n_ctrl), random_state)
+    return enneper.Surface(ctrl_pnts, knots_u, knots_v)
+
+
+def get_params(n_samples, seed=1):
+    return np.random.RandomState(seed).uniform(0, 1, n_samples)
+
+
+###############################################################################
+# cfoundation kernels
+###############################################################################
+
+def setup_get_index(deg, n_knots, n_samples):
+    knots = get_curve(deg, n_knots).knots
+    us = get_params(n_samples).tolist()
+
+    def func():
+        for u in us:
+            cfdn.get_index(u, deg, knots)
+    return func
+
+
+def setup_calc_basis_funs(deg, n_knots, n_samples):
+    knots = get_curve(deg, n_knots).knots
+    us = get_params(n_samples).tolist()
+    indices = [cfdn.get_index(u, deg, knots) for u in us]
+    basis_funs = np.empty(deg + 1)
+
+    def func():
+        for index, u in zip(indices, us):
+            cfdn.calc_basis_funs(index, u, deg, knots, basis_funs)
+    return func
+
+
+def setup_get_indices(deg, n_knots, n_samples):
+    knots = get_curve(deg, n_knots).knots
+    us = get_params(n_samples)
+    indices = np.empty(n_samples, dtype=np.intc)
+    return lambda: cfdn.get_indices(us, deg, knots, indices)
+
+
+def setup_calc_basis_funs_many(deg, n_knots, n_samples):
+    knots = get_curve(deg, n_knots).knots
+    us = get_params(n_samples)
+    indices = np.empty(n_samples, dtype=np.intc)
+    basis_funs = np.empty((n_samples, deg + 1))
+    return lambda: cfdn.calc_basis_funs_many(us, deg, knots, indices,
+                                             basis_funs)
+
+
+###############################################################################
+# evaluation
+###############################################################################
+
+def setup_curve_evaluate_at(deg, n_knots, n_samples):
+    curve = get_curve(deg, n_knots)
+    us = get_params(n_samples).tolist()
+
+    def func():
+        for u in us:
+            curve.evaluate_at(u)
+    return func
+
+
+def setup_curve_evaluate_many(deg, n_knots, n_samples):
+    curve = get_curve(deg, n_knots)
+    us = get_params(n_samples)
+    out = np.empty((n_samples, 4))
+    return lambda: curve.evaluate_many(us, out)
+
+
+def setup_surface_evaluate_at(deg, n_knots, n_samples):
+    surface = get_surface(deg, n_knots)
+    us, vs = get_params(n_samples, 1).tolist(), get_params(n_samples, 2)
+
+    def func():
+        for u, v in zip(us, vs):
+            surface.evaluate_at(u, v)
+    return func
+
+
+def setup_surface_evaluate_many(deg, n_knots, n_samples):
+    surface = get_surface(deg, n_knots)
+    us, vs = get_params(n_samples, 1), get_params(n_samples, 2)
+    out = np.empty((n_samples, 4))
+    return lambda: surface.evaluate_many(us, vs, out)
+
+
+###############################################################################
+# serialization
+###############################################################################
+
+def setup_curve_export(n_knots):
+    curve = get_curve(3, n_knots)
+    return lambda: curve.export(cStringIO.StringIO())
+
+
+def setup_curve_from_json(n_knots):
+    file_like_obj = cStringIO.StringIO()
+    get_curve(3, n_knots).export(file_like_obj)
+    data = file_like_obj.getvalue()
+    return lambda: enneper.Curve.from_json(cStringIO.StringIO(data))
+
+
+def setup_surface_export(n_knots):
+    surface = get_surface(3, n_knots)
+    return lambda: surface.export(cStringIO.StringIO())
+
+
+def setup_surface_from_json(n_knots):
+    file_like_obj = cStringIO.StringIO()
+    get_surface(3, n_knots).export(file_like_obj)
+    data = file_like_obj.getvalue()
+    return lambda: enneper.Surface.from_json(cStringIO.StringIO(data))
+
+
+###############################################################################
+# primitives
+###############################################################################
+
+def setup_circular_arc(length):
+    return lambda: enneper.primitives.CircularArc(length)
+
+
+def setup_line():
+    start_pnt, end_pnt = np.zeros(3), np.ones(3)
+    return lambda: enneper.primitives.Line(start_pnt, end_pnt)
+
+
+###############################################################################
+# suite
+###############################################################################
+
+def get_cases(quick=False):
+
+    # the quick suite keeps the lowest, a common and the highest degree
+    degrees = (1, 3, 7) if quick else DEGREES
+    knot_counts = KNOT_COUNTS[:1] if quick else KNOT_COUNTS
+
+    cases = list()
+    evaluations = (
+        ('cfoundation.get_index', setup_get_index, LOOP_SAMPLE_COUNTS),
+        ('cfoundation.calc_basis_funs', setup_calc_basis_funs,
+         LOOP_SAMPLE_COUNTS),
+        ('cfoundation.get_indices', setup_get_indices, SAMPLE_COUNTS),
+        ('cfoundation.calc_basis_funs_many', setup_calc_basis_funs_many,
+         SAMPLE_COUNTS),
+        ('Curve.evaluate_at', setup_curve_evaluate_at, LOOP_SAMPLE_COUNTS),
+        ('Curve.evaluate_many', setup_curve_evaluate_many, SAMPLE_COUNTS))
+    for name, setup, sample_counts in evaluations:
+        for deg in degrees:
+            for n_knots in knot_counts:
+                for n_samples in sample_counts:
+                    params = dict(deg=deg, n_knots=n_knots,
+                                  n_samples=n_samples)
+                    cases.append(Case(name, params, setup))
+
+    knot_counts = SURFACE_KNOT_COUNTS[:1] if quick else SURFACE_KNOT_COUNTS
+    evaluations = (
+        ('Surface.evaluate_at', setup_surface_evaluate_at,
+         LOOP_SAMPLE_COUNTS),
+        ('Surface.evaluate_many', setup_surface_evaluate_many,
+         SURFACE_SAMPLE_COUNTS))
+    for name, setup, sample_counts in evaluations:
+        for deg in degrees:
+            for n_knots in knot_counts:
+                for n_samples in sample_counts:
+                    params = dict(deg=deg, n_knots=n_knots,
+                                  n_samples=n_samples)
+                    cases.append(Case(name, params, setup))
+
+    serializations = (
+        ('Curve.export', setup_curve_export, KNOT_COUNTS),
+        ('Curve.from_json', setup_curve_from_json, KNOT_COUNTS),
+        ('Surface.export', setup_surface_export, SURFACE_KNOT_COUNTS),
+        ('Surface.from_json', setup_surface_from_json, SURFACE_KNOT_COUNTS))
+    for name, setup, counts in serializations:
+        for n_knots in counts[:1] if quick else counts:
+            cases.append(Case(name, dict(n_knots=n_knots), setup))
+
+    for length in (.5 * np.pi, np.pi, 2 * np.pi):
+        cases.append(Case('primitives.CircularArc',
+                          dict(length=round(length, 6)), setup_circular_arc))
+    cases.append(Case('primitives.Line', dict(), setup_line))
+    return cases
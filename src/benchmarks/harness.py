@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import collections
+import fnmatch
+import json
+import platform
+import time
+import timeit
+
+# 3rd party packages
+import numpy as np
+
+
+# a benchmark: setup(**params) returns the callable to time
+Case = collections.namedtuple('Case', 'name params setup')
+
+
+def get_key(name, params):
+    args = ','.join('%s=%s' % item for item in sorted(params.items()))
+    return '%s[%s]' % (name, args)
+
+
+def get_environment():
+    return dict(python=platform.python_version(),
+                implementation=platform.python_implementation(),
+                numpy=np.__version__,
+                platform=platform.platform(),
+                machine=platform.machine(),
+                timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'))
+
+
+def calibrate(timer, min_time):
+
+    # number of calls per repetition so that a repetition lasts min_time
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            return number
+        if elapsed <= 0:
+            number *= 10
+        else:
+            number = max(2 * number, int(1.2 * number * min_time / elapsed))
+
+
+def time_case(case, repeat=5, min_time=.05):
+
+    # warm up lazy imports and caches before timing
+    func = case.setup(**case.params)
+    func()
+
+    # timings per call; the best one is the least disturbed by the system
+    timer = timeit.Timer(func)
+    number = calibrate(timer, min_time)
+    timings = np.array(timer.repeat(repeat, number)) / number
+    return dict(key=get_key(case.name, case.params), name=case.name,
+                params=case.params, number=number, repeat=repeat,
+                best=float(timings.min()), median=float(np.median(timings)),
+                mean=float(timings.mean()), stdev=float(timings.std()))
+
+
+def run(cases, repeat=5, min_time=.05, pattern=None, log=None):
+    results = list()
+    for case in cases:
+        key = get_key(case.name, case.params)
+        if pattern is not None and not fnmatch.fnmatch(key, pattern):
+            continue
+        result = time_case(case, repeat, min_time)
+        if log is not None:
+            log.write('%-64s %12.4e s\n' % (key, result['best']))
+            log.flush()
+        results.append(result)
+    return dict(environment=get_environment(), results=results)
+
+
+def dump(report, file_like_obj):
+    json.dump(report, file_like_obj, indent=2, sort_keys=True)
+
+
+def load(file_like_obj):
+    return json.load(file_like_obj)
+
+
+def compare(baseline, current, threshold=.1):
+
+    # ratios of the best timings of the benchmarks both reports contain
+    timings = dict((r['key'], r['best']) for r in baseline['results'])
+    rows = list()
+    for result in current['results']:
+        key = result['key']
+        if key not in timings:
+            continue
+        ratio = result['best'] / timings[key]
+        if ratio > 1 + threshold:
+            status = 'slower'
+        elif ratio < 1 / (1 + threshold):
+            status = 'faster'
+        else:
+            status = 'same'
+        rows.append(dict(key=key, baseline=timings[key],
+                         current=result['best'], ratio=ratio, status=status))
+    return rows
+
+
+def format_comparison(rows):
+    lines = ['%-64s %12s %12s %8s' % ('benchmark', 'baseline', 'current',
+                                      'ratio')]
+    for row in rows:
+        lines.append('%-64s %12.4e %12.4e %8.3f %s' % (
+            row['key'], row['baseline'], row['current'], row['ratio'],
+            '' if row['status'] == 'same' else row['status']))
+    return '\n'.join(lines)
@@ -21,7 +21,14 @@
 # ***************************************************************************
 
 
+import batch
+import bezier
+import bvh
+import cache
+import collection
+import parallel
 import primitives
+import profiling
 
 import curve
 from curve import *
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import hashlib
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import refinement as rfn
+
+
+def get_key(curve):
+
+    # cheap compared to the integration, detects in-place modifications
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(curve.ctrl_pnts).view(np.uint8))
+    digest.update(np.ascontiguousarray(curve.knots).view(np.uint8))
+    return curve.ctrl_pnts.shape, digest.hexdigest()
+
+
+def get_speeds(curve, us):
+    ders = curve.derivatives_many(np.ravel(us), 1, cartesian=True,
+                                  dtype=np.double)[:, 1]
+    return np.sqrt(np.sum(ders * ders, -1)).reshape(np.shape(us))
+
+
+# Cumulative arc length at the ends of every knot span subdivision. The
+# lengths are integrated with Gauss-Legendre quadrature and inverted with a
+# table lookup followed by a few Newton iterations.
+class ArcLengthTable(object):
+
+    def __init__(self, curve, n_subdivisions=32, order=5):
+        self.curve = curve
+        self.key = get_key(curve)
+        self.nodes, self.weights = np.polynomial.legendre.leggauss(order)
+
+        # parameters at the ends of the subdivided knot spans
+        breakpoints = rfn.get_breakpoints(curve.knots, curve.deg)
+        ts = np.linspace(0, 1, n_subdivisions + 1)[:-1]
+        lbs, ubs = breakpoints[:-1, None], breakpoints[1:, None]
+        self.params = np.append((lbs + (ubs - lbs) * ts).ravel(),
+                                breakpoints[-1])
+
+        lengths = self.integrate(self.params[:-1], self.params[1:])
+        self.lengths = np.append(0, np.cumsum(lengths))
+        self.speeds = get_speeds(curve, self.params)
+
+###############################################################################
+# properties
+###############################################################################
+
+    @property
+    def length(self):
+        return self.lengths[-1]
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def integrate(self, lbs, ubs):
+
+        # Gauss-Legendre quadrature of the speed over every interval
+        lbs, ubs = np.asarray(lbs, np.double), np.asarray(ubs, np.double)
+        mids, halves = (lbs + ubs) * .5, (ubs - lbs) * .5
+        us = mids[..., None] + halves[..., None] * self.nodes
+        return halves * np.dot(get_speeds(self.curve, us), self.weights)
+
+    def get_lengths(self, us):
+
+        # arc length from the start of the curve to every parameter
+        us = np.clip(us, self.params[0], self.params[-1])
+        indices = np.searchsorted(self.params, us, 'right') - 1
+        indices = np.clip(indices, 0, len(self.params) - 2)
+        return self.lengths[indices] + self.integrate(self.params[indices], us)
+
+    def get_params(self, lengths, tol=1e-12, max_iter=8):
+
+        # locate the table interval of every length
+        lengths = np.clip(np.asarray(lengths, np.double), 0, self.length)
+        indices = np.searchsorted(self.lengths, lengths, 'right') - 1
+        indices = np.clip(indices, 0, len(self.params) - 2)
+        lbs, ubs = self.params[indices], self.params[indices + 1]
+        lb_lengths = self.lengths[indices]
+        deltas = self.lengths[indices + 1] - lb_lengths
+
+        # cubic Hermite interpolation of u(s) with du/ds = 1 / |C'(u)| is
+        # accurate enough to converge in one or two Newton iterations
+        ts = np.divide(lengths - lb_lengths, deltas,
+                       out=np.zeros_like(lengths), where=deltas > 0)
+        speeds = self.speeds[indices], self.speeds[indices + 1]
+        m0, m1 = [np.divide(deltas, v, out=ubs - lbs, where=v > 0)
+                  for v in speeds]
+        us = lbs + (ubs - lbs) * ts * ts * (3 - 2 * ts) + \
+            (ts * (1 - ts) ** 2) * m0 - (ts * ts * (1 - ts)) * m1
+        us = np.clip(us, lbs, ubs)
+
+        # Newton iteration on s(u) - length = 0 with s'(u) = |C'(u)|
+        for _ in xrange(max_iter):
+            errors = lb_lengths + self.integrate(lbs, us) - lengths
+            if np.all(np.abs(errors) <= tol * max(self.length, 1.)):
+                break
+            speeds = get_speeds(self.curve, us)
+            steps = np.divide(errors, speeds, out=np.zeros_like(errors),
+                              where=speeds > 0)
+            us = np.clip(us - steps, lbs, ubs)
+        return us
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import json
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import binary
+import cfoundation as cfdn
+import foundation as fdn
+import matrices
+from curve import Curve
+from surface import Surface
+
+
+__all__ = ['CurveBatch', 'SurfaceBatch']
+
+
+def _pad_knots(knots_seq, size):
+
+    # trailing knots repeat the last one, so padded knot vectors stay sorted
+    knots = np.empty((len(knots_seq), size), dtype=np.double)
+    for knots_row, k in zip(knots, knots_seq):
+        knots_row[:len(k)] = k
+        knots_row[len(k):] = k[-1]
+    return knots
+
+
+class CurveBatch(object):
+
+    # Structure of arrays for many curves of the same degree: the control
+    # points and knots of all curves are stacked into padded arrays and
+    # counts holds the number of control points of every curve.
+
+    def __init__(self, ctrl_pnts, knots, counts, deg, dtype=None):
+        self.ctrl_pnts, is_new = fdn.get_ctrl_pnts(ctrl_pnts, dtype, 'C')
+        self._owned_ctrl_pnts = self.ctrl_pnts if is_new else None
+        self.knots = np.ascontiguousarray(knots, dtype=np.double)
+        self.counts = np.ascontiguousarray(counts, dtype=np.intc)
+        self.deg = int(np.asarray(deg))
+
+###############################################################################
+# constructors
+###############################################################################
+
+    @classmethod
+    def from_curves(cls, curves):
+
+        degs = set(curve.deg for curve in curves)
+        if len(degs) != 1:
+            raise ValueError('all curves must have the same degree')
+        dims = set(curve.ctrl_pnts.shape[1] for curve in curves)
+        if len(dims) != 1:
+            raise ValueError('all curves must have the same dimension')
+
+        counts = [len(curve.ctrl_pnts) for curve in curves]
+        dtype = np.result_type(*[curve.ctrl_pnts for curve in curves])
+        ctrl_pnts = np.zeros((len(curves), max(counts), dims.pop()), dtype)
+        for ctrl_pnts_row, curve in zip(ctrl_pnts, curves):
+            ctrl_pnts_row[:len(curve.ctrl_pnts)] = curve.ctrl_pnts
+        knots = _pad_knots([curve.knots for curve in curves],
+                           max(len(curve.knots) for curve in curves))
+
+        return fdn.hand_over(cls(ctrl_pnts, knots, counts, degs.pop()))
+
+    @classmethod
+    def from_json(cls, file_like_obj):
+        return cls(**json.load(file_like_obj))
+
+    @classmethod
+    def from_binary(cls, file_like_obj, mmap_mode=None):
+        _, arrays = binary.load(file_like_obj, 'curve_batch', mmap_mode)
+        return cls(**arrays)
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getitem__(self, index):
+        n = self.counts[index]
+        return fdn.hand_over(Curve(
+            self.ctrl_pnts[index, :n].copy(),
+            self.knots[index, :n + self.deg + 1].copy()))
+
+    def to_curves(self):
+        return [self[i] for i in xrange(len(self))]
+
+    def evaluate_many(self, us, out=None, cartesian=False):
+
+        # shared parameters are broadcast without copying them
+        us = np.asarray(us, dtype=np.double)
+        if us.ndim == 1:
+            us = np.broadcast_to(us, (len(self), us.size))
+
+        shape = us.shape + (self.ctrl_pnts.shape[2] - bool(cartesian),)
+        if out is None:
+            out = np.empty(shape, dtype=self.ctrl_pnts.dtype)
+        else:
+            fdn.check_out(out, shape, self.ctrl_pnts.dtype)
+
+        cfdn.evaluate_curve_batch(us, self.deg, self.knots, self.counts,
+                                  self.ctrl_pnts, out, cartesian)
+        return out
+
+    def transform(self, matrix):
+
+        # a single matrix or one matrix per entity, padding stays zero;
+        # control points that aren't owned are copied once
+        if self.ctrl_pnts is not self._owned_ctrl_pnts:
+            self.ctrl_pnts = self._owned_ctrl_pnts = np.array(self.ctrl_pnts)
+        matrices.apply(matrix, self.ctrl_pnts)
+
+    def export(self, file_like_obj, indent=None):
+
+        # json can't handle ndarrays
+        obj_to_serialize = dict(ctrl_pnts=self.ctrl_pnts.tolist(),
+                                knots=self.knots.tolist(),
+                                counts=self.counts.tolist(),
+                                deg=self.deg)
+        json.dump(obj_to_serialize, file_like_obj, indent=indent)
+
+    def export_binary(self, file_like_obj):
+        arrays = [('ctrl_pnts', self.ctrl_pnts), ('knots', self.knots),
+                  ('counts', self.counts), ('deg', [self.deg])]
+        binary.dump(file_like_obj, 'curve_batch', arrays)
+
+
+class SurfaceBatch(object):
+
+    # Structure of arrays for many surfaces of the same degrees, counts holds
+    # the number of control points in u and v direction of every surface.
+
+    def __init__(self, ctrl_pnts, knots_u, knots_v, counts, deg_u, deg_v,
+                 dtype=None):
+        self.ctrl_pnts, is_new = fdn.get_ctrl_pnts(ctrl_pnts, dtype, 'C')
+        self._owned_ctrl_pnts = self.ctrl_pnts if is_new else None
+        self.knots_u = np.ascontiguousarray(knots_u, dtype=np.double)
+        self.knots_v = np.ascontiguousarray(knots_v, dtype=np.double)
+        self.counts = np.ascontiguousarray(counts, dtype=np.intc)
+        self.deg_u = int(np.asarray(deg_u))
+        self.deg_v = int(np.asarray(deg_v))
+
+###############################################################################
+# constructors
+###############################################################################
+
+    @classmethod
+    def from_surfaces(cls, surfaces):
+
+        degs = set((surface.deg_u, surface.deg_v) for surface in surfaces)
+        if len(degs) != 1:
+            raise ValueError('all surfaces must have the same degrees')
+        dims = set(surface.ctrl_pnts.shape[2] for surface in surfaces)
+        if len(dims) != 1:
+            raise ValueError('all surfaces must have the same dimension')
+
+        counts = [surface.ctrl_pnts.shape[:2] for surface in surfaces]
+        n_u, n_v = np.max(counts, 0)
+        dtype = np.result_type(*[surface.ctrl_pnts for surface in surfaces])
+        ctrl_pnts = np.zeros((len(surfaces), n_u, n_v, dims.pop()), dtype)
+        for ctrl_pnts_row, (i, j), surface in zip(ctrl_pnts, counts,
+                                                  surfaces):
+            ctrl_pnts_row[:i, :j] = surface.ctrl_pnts
+        knots_u = _pad_knots([surface.knots_u for surface in surfaces],
+                             max(len(surface.knots_u) for surface in surfaces))
+        knots_v = _pad_knots([surface.knots_v for surface in surfaces],
+                             max(len(surface.knots_v) for surface in surfaces))
+
+        deg_u, deg_v = degs.pop()
+        return fdn.hand_over(
+            cls(ctrl_pnts, knots_u, knots_v, counts, deg_u, deg_v))
+
+    @classmethod
+    def from_json(cls, file_like_obj):
+        return cls(**json.load(file_like_obj))
+
+    @classmethod
+    def from_binary(cls, file_like_obj, mmap_mode=None):
+        _, arrays = binary.load(file_like_obj, 'surface_batch', mmap_mode)
+        return cls(**arrays)
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getitem__(self, index):
+        n_u, n_v = self.counts[index]
+        return fdn.hand_over(Surface(
+            self.ctrl_pnts[index, :n_u, :n_v].copy(),
+            self.knots_u[index, :n_u + self.deg_u + 1].copy(),
+            self.knots_v[index, :n_v + self.deg_v + 1].copy()))
+
+    def to_surfaces(self):
+        return [self[i] for i in xrange(len(self))]
+
+    def evaluate_many(self, us, vs, out=None, cartesian=False):
+
+        # shared parameters are broadcast without copying them
+        us = np.asarray(us, dtype=np.double)
+        vs = np.asarray(vs, dtype=np.double)
+        if us.ndim == 1:
+            us = np.broadcast_to(us, (len(self), us.size))
+        if vs.ndim == 1:
+            vs = np.broadcast_to(vs, (len(self), vs.size))
+
+        shape = us.shape + (self.ctrl_pnts.shape[3] - bool(cartesian),)
+        if out is None:
+            out = np.empty(shape, dtype=self.ctrl_pnts.dtype)
+        else:
+            fdn.check_out(out, shape, self.ctrl_pnts.dtype)
+
+        cfdn.evaluate_surface_batch(us, vs, self.deg_u, self.deg_v,
+                                    self.knots_u, self.knots_v, self.counts,
+                                    self.ctrl_pnts, out, cartesian)
+        return out
+
+    def transform(self, matrix):
+
+        # a single matrix or one matrix per entity, padding stays zero;
+        # control points that aren't owned are copied once
+        if self.ctrl_pnts is not self._owned_ctrl_pnts:
+            self.ctrl_pnts = self._owned_ctrl_pnts = np.array(self.ctrl_pnts)
+        matrices.apply(matrix, self.ctrl_pnts)
+
+    def export(self, file_like_obj, indent=None):
+
+        # json can't handle ndarrays
+        obj_to_serialize = dict(ctrl_pnts=self.ctrl_pnts.tolist(),
+                                knots_u=self.knots_u.tolist(),
+                                knots_v=self.knots_v.tolist(),
+                                counts=self.counts.tolist(),
+                                deg_u=self.deg_u, deg_v=self.deg_v)
+        json.dump(obj_to_serialize, file_like_obj, indent=indent)
+
+    def export_binary(self, file_like_obj):
+        arrays = [('ctrl_pnts', self.ctrl_pnts), ('knots_u', self.knots_u),
+                  ('knots_v', self.knots_v), ('counts', self.counts),
+                  ('deg_u', [self.deg_u]), ('deg_v', [self.deg_v])]
+        binary.dump(file_like_obj, 'surface_batch', arrays)
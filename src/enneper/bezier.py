@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import foundation as fdn
+
+
+def get_power_basis_matrix(deg):
+
+    # B_i(t) = sum_k matrix[k, i] * t**k for the Bernstein polynomials B_i
+    bin_coeffs = fdn.get_binomial_coefficients(deg)
+    matrix = np.zeros((deg + 1, deg + 1), dtype=np.double)
+    for i in range(deg + 1):
+        for k in range(i, deg + 1):
+            sign = -1 if (k - i) % 2 else 1
+            matrix[k, i] = \
+                sign * bin_coeffs[deg, i] * bin_coeffs[deg - i, k - i]
+    return matrix
+
+
+def get_segment_params(us, breakpoints):
+
+    # segment index and local parameter in [0, 1] of every parameter
+    us = np.asarray(us, dtype=np.double)
+    segments = np.searchsorted(breakpoints, us, 'right') - 1
+    segments = np.clip(segments, 0, len(breakpoints) - 2)
+    lb, ub = breakpoints[segments], breakpoints[segments + 1]
+    return segments, (us - lb) / (ub - lb)
+
+
+def horner(coeffs, ts):
+
+    # coeffs: (deg + 1, N, ...), ts broadcasts against coeffs[0]
+    result = coeffs[-1]
+    for coeff in coeffs[-2::-1]:
+        result = result * ts + coeff
+    return result
+
+
+class BezierCurveEngine(object):
+
+    # Evaluates a curve segment by segment from the power basis coefficients
+    # of its Bezier form, i.e. without span search and basis recursion.
+
+    def __init__(self, coeffs, breakpoints):
+        self.coeffs = np.asarray(coeffs, dtype=np.double)
+        self.breakpoints = np.asarray(breakpoints, dtype=np.double)
+
+###############################################################################
+# constructors
+###############################################################################
+
+    @classmethod
+    def from_curve(cls, curve):
+        segments, breakpoints = curve.decompose()
+        matrix = get_power_basis_matrix(curve.deg)
+        coeffs = np.einsum('ki,sid->skd', matrix, segments)
+        return cls(coeffs, breakpoints)
+
+###############################################################################
+# properties
+###############################################################################
+
+    @property
+    def deg(self):
+        return self.coeffs.shape[1] - 1
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def evaluate_many(self, us, out=None):
+        segments, ts = get_segment_params(us, self.breakpoints)
+        coeffs = self.coeffs[segments].swapaxes(0, 1)
+        result = horner(coeffs, ts[:, None])
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    def sample(self, n_per_segment):
+
+        # same local parameters in every segment: (n_seg, n_per_segment, dim)
+        ts = np.linspace(0, 1, n_per_segment)
+        coeffs = self.coeffs.swapaxes(0, 1)[:, :, None]
+        return horner(coeffs, ts[:, None])
+
+
+class BezierSurfaceEngine(object):
+
+    # Evaluates a surface patch by patch from the power basis coefficients
+    # of its Bezier form, i.e. without span search and basis recursion.
+
+    def __init__(self, coeffs, breakpoints_u, breakpoints_v):
+        self.coeffs = np.asarray(coeffs, dtype=np.double)
+        self.breakpoints_u = np.asarray(breakpoints_u, dtype=np.double)
+        self.breakpoints_v = np.asarray(breakpoints_v, dtype=np.double)
+
+###############################################################################
+# constructors
+###############################################################################
+
+    @classmethod
+    def from_surface(cls, surface):
+        patches, breakpoints_u, breakpoints_v = surface.decompose()
+        matrix_u = get_power_basis_matrix(surface.deg_u)
+        matrix_v = get_power_basis_matrix(surface.deg_v)
+        coeffs = np.einsum('ki,abijd->abkjd', matrix_u, patches)
+        coeffs = np.einsum('lj,abkjd->abkld', matrix_v, coeffs)
+        return cls(coeffs, breakpoints_u, breakpoints_v)
+
+###############################################################################
+# properties
+###############################################################################
+
+    @property
+    def deg_u(self):
+        return self.coeffs.shape[2] - 1
+
+    @property
+    def deg_v(self):
+        return self.coeffs.shape[3] - 1
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def evaluate_many(self, us, vs, out=None):
+        segments_u, ts_u = get_segment_params(us, self.breakpoints_u)
+        segments_v, ts_v = get_segment_params(vs, self.breakpoints_v)
+
+        # (deg_u + 1, deg_v + 1, N, dim)
+        coeffs = self.coeffs[segments_u, segments_v].transpose(1, 2, 0, 3)
+        result = horner(horner(coeffs, ts_u[:, None]), ts_v[:, None])
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    def evaluate_grid(self, us, vs, out=None):
+        segments_u, ts_u = get_segment_params(us, self.breakpoints_u)
+        segments_v, ts_v = get_segment_params(vs, self.breakpoints_v)
+
+        # contract u-direction: (deg_v + 1, M, n_seg_v, dim)
+        coeffs = self.coeffs[segments_u].transpose(2, 3, 0, 1, 4)
+        rows = horner(coeffs, ts_u[:, None, None])
+
+        # contract v-direction: (M, N, dim)
+        rows = rows[:, :, segments_v]
+        result = horner(rows, ts_v[:, None])
+        if out is None:
+            return result
+        out[...] = result
+        return out
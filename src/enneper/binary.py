@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import json
+import struct
+
+# 3rd party packages
+import numpy as np
+
+
+# A record consists of a fixed size preamble (magic number, version and
+# length of the header), a JSON header and the raw little-endian array
+# blocks. Every block starts at a multiple of ALIGNMENT relative to the
+# beginning of the record, so records can be memory-mapped.
+MAGIC = b'ENNEPER\x00'
+VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<8sII')
+
+
+class BinaryFormatError(Exception):
+    pass
+
+
+def _align(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def dump(file_like_obj, kind, arrays):
+
+    # arrays: sequence of (name, array) pairs, stored as little-endian doubles
+    arrays = [(name, np.ascontiguousarray(array, dtype='<f8'))
+              for name, array in arrays]
+
+    # offsets depend on the header size and vice versa, so the header is
+    # measured with placeholders of maximum width and padded with spaces
+    placeholder = 2**63 - 1
+    entries = [dict(name=name, shape=list(array.shape), offset=placeholder)
+               for name, array in arrays]
+    header = dict(kind=kind, dtype='<f8', arrays=entries, size=placeholder)
+    header_size = _align(PREAMBLE.size + len(json.dumps(header)))
+    offset = header_size
+    for entry, (_, array) in zip(entries, arrays):
+        entry['offset'] = offset
+        offset = _align(offset + array.nbytes)
+    header['size'] = offset
+
+    # write preamble and header
+    encoded = json.dumps(header).encode('ascii')
+    encoded += b' ' * (header_size - PREAMBLE.size - len(encoded))
+    file_like_obj.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+    file_like_obj.write(encoded)
+
+    # write blocks without temporary copies
+    position = header_size
+    for entry, (_, array) in zip(entries, arrays):
+        file_like_obj.write(b'\x00' * (entry['offset'] - position))
+        file_like_obj.write(memoryview(array.reshape(-1).view(np.uint8)))
+        position = entry['offset'] + array.nbytes
+    file_like_obj.write(b'\x00' * (header['size'] - position))
+
+
+def load_header(file_like_obj):
+    preamble = file_like_obj.read(PREAMBLE.size)
+    if len(preamble) == 0:
+        raise EOFError
+    if len(preamble) != PREAMBLE.size:
+        raise BinaryFormatError('truncated record')
+    magic, version, header_size = PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise BinaryFormatError('not an enneper binary record')
+    if version != VERSION:
+        raise BinaryFormatError('unsupported version {0}'.format(version))
+    return json.loads(file_like_obj.read(header_size).decode('ascii'))
+
+
+def load(file_like_obj, kind=None, mmap_mode=None):
+
+    # the record may start anywhere in the file
+    start = file_like_obj.tell()
+    header = load_header(file_like_obj)
+    if kind is not None and header['kind'] != kind:
+        msg = 'expected a {0} record, got a {1} record'
+        raise BinaryFormatError(msg.format(kind, header['kind']))
+
+    arrays = dict()
+    for entry in header['arrays']:
+        name, shape = str(entry['name']), tuple(entry['shape'])
+        offset = start + entry['offset']
+
+        # zero-copy view of the file
+        if mmap_mode is not None:
+            arrays[name] = np.memmap(file_like_obj, dtype='<f8',
+                                     mode=mmap_mode, offset=offset,
+                                     shape=shape)
+            continue
+
+        # read straight into the final array
+        array = np.empty(shape, dtype='<f8')
+        buf = memoryview(array.reshape(-1).view(np.uint8))
+        file_like_obj.seek(offset)
+        if hasattr(file_like_obj, 'readinto'):
+            n_bytes = file_like_obj.readinto(buf)
+        else:
+            data = file_like_obj.read(array.nbytes)
+            n_bytes = len(data)
+            buf[:n_bytes] = data
+        if n_bytes != array.nbytes:
+            raise BinaryFormatError('truncated record')
+        arrays[name] = array
+
+    # leave the file at the end of the record
+    file_like_obj.seek(start + header['size'])
+    return header['kind'], arrays
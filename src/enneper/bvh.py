@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# 3rd party packages
+import numpy as np
+
+
+def get_patch_boxes(surface):
+
+    # Bezier patches lie in the convex hull of their control points
+    patches, bp_u, bp_v = surface.decompose()
+    pnts = patches[..., :-1] / patches[..., -1:]
+    lows = pnts.min(3).min(2).reshape(-1, pnts.shape[-1])
+    highs = pnts.max(3).max(2).reshape(-1, pnts.shape[-1])
+
+    # parameter ranges: (n_patches, 4) with u0, u1, v0, v1
+    ranges = np.empty(patches.shape[:2] + (4,))
+    ranges[..., 0], ranges[..., 1] = bp_u[:-1, None], bp_u[1:, None]
+    ranges[..., 2], ranges[..., 3] = bp_v[:-1], bp_v[1:]
+    return lows, highs, ranges.reshape(-1, 4)
+
+
+def get_morton_codes(pnts, bits=10):
+
+    # interleave the bits of the quantized coordinates
+    lb, ub = pnts.min(0), pnts.max(0)
+    scale = np.where(ub > lb, ub - lb, 1)
+    cells = ((pnts - lb) / scale * (2**bits - 1)).astype(np.int64)
+    codes = np.zeros(len(pnts), dtype=np.int64)
+    dim = pnts.shape[1]
+    for bit in xrange(bits):
+        for axis in xrange(dim):
+            codes |= ((cells[:, axis] >> bit) & 1) << (bit * dim + axis)
+    return codes
+
+
+class BoundingVolumeHierarchy(object):
+
+    # Binary tree of axis aligned boxes. The leaves are sorted along a
+    # Morton curve and node i of a level has the children 2 * i and
+    # 2 * i + 1 on the level below, so the topology is implicit and every
+    # level is built, refitted and traversed with array operations.
+
+    def __init__(self, lows, highs):
+        lows = np.asarray(lows, dtype=np.double)
+        highs = np.asarray(highs, dtype=np.double)
+        self.order = np.argsort(get_morton_codes((lows + highs) * .5),
+                                kind='mergesort')
+        self.refit(lows, highs)
+
+        # set by from_surfaces
+        self.offsets = None
+        self.surface_indices = None
+        self.ranges = None
+
+###############################################################################
+# constructors
+###############################################################################
+
+    @classmethod
+    def from_surfaces(cls, surfaces):
+        boxes = [get_patch_boxes(surface) for surface in surfaces]
+        bvh = cls(np.concatenate([lows for lows, _, _ in boxes]),
+                  np.concatenate([highs for _, highs, _ in boxes]))
+
+        # map leaves to surfaces and parameter ranges
+        counts = [len(lows) for lows, _, _ in boxes]
+        bvh.offsets = np.append(0, np.cumsum(counts))
+        bvh.surface_indices = np.repeat(np.arange(len(surfaces)), counts)
+        bvh.ranges = np.concatenate([ranges for _, _, ranges in boxes])
+        return bvh
+
+###############################################################################
+# properties
+###############################################################################
+
+    @property
+    def depth(self):
+        return len(self.levels)
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def refit(self, lows, highs):
+
+        # the leaves keep their position, only the boxes are recomputed
+        self.lows = np.asarray(lows, dtype=np.double)
+        self.highs = np.asarray(highs, dtype=np.double)
+        level = (self.lows[self.order], self.highs[self.order])
+        self.levels = [level]
+        while len(level[0]) > 1:
+            lows, highs = level
+            if len(lows) % 2:
+                lows = np.vstack((lows, np.full(lows.shape[1], np.inf)))
+                highs = np.vstack((highs, np.full(highs.shape[1], -np.inf)))
+            level = (np.minimum(lows[::2], lows[1::2]),
+                     np.maximum(highs[::2], highs[1::2]))
+            self.levels.append(level)
+        self.levels.reverse()
+
+    def refit_surfaces(self, surfaces, indices=None):
+
+        # recompute the leaves of the given (moved) surfaces only
+        if indices is None:
+            indices = range(len(surfaces))
+        lows, highs = self.lows.copy(), self.highs.copy()
+        for index in indices:
+            lb, ub = self.offsets[index], self.offsets[index + 1]
+            lows[lb:ub], highs[lb:ub], _ = get_patch_boxes(surfaces[index])
+        self.refit(lows, highs)
+
+    def _traverse(self, n_queries, test):
+
+        # breadth first over the levels with one (query, node) pair per
+        # candidate, test returns the pairs whose boxes are hit
+        queries = np.arange(n_queries)
+        nodes = np.zeros(n_queries, dtype=np.intp)
+        mask = test(queries, self.levels[0], nodes)
+        queries, nodes = queries[mask], nodes[mask]
+        for level in self.levels[1:]:
+            queries = np.repeat(queries, 2)
+            nodes = (2 * nodes[:, None] + [0, 1]).ravel()
+            is_valid = nodes < len(level[0])
+            queries, nodes = queries[is_valid], nodes[is_valid]
+            mask = test(queries, level, nodes)
+            queries, nodes = queries[mask], nodes[mask]
+        return queries, self.order[nodes]
+
+    def query_boxes(self, lows, highs):
+
+        # pairs (box index, leaf index) of overlapping boxes
+        lows = np.atleast_2d(np.asarray(lows, dtype=np.double))
+        highs = np.atleast_2d(np.asarray(highs, dtype=np.double))
+
+        def test(queries, level, nodes):
+            return np.all((level[0][nodes] <= highs[queries]) &
+                          (level[1][nodes] >= lows[queries]), 1)
+        return self._traverse(len(lows), test)
+
+    def query_rays(self, origins, dirs, t_max=np.inf):
+
+        # pairs (ray index, leaf index) of boxes hit by the rays, sorted by
+        # ray and entry distance, plus the entry distances
+        origins = np.atleast_2d(np.asarray(origins, dtype=np.double))
+        dirs = np.atleast_2d(np.asarray(dirs, dtype=np.double))
+        with np.errstate(divide='ignore'):
+            inv_dirs = 1. / dirs
+
+        # slab test, NaNs of rays inside a slab plane are ignored
+        def test(queries, level, nodes, return_nears=False):
+            with np.errstate(invalid='ignore'):
+                t0 = (level[0][nodes] - origins[queries]) * inv_dirs[queries]
+                t1 = (level[1][nodes] - origins[queries]) * inv_dirs[queries]
+            nears = np.fmax.reduce(np.fmin(t0, t1), 1)
+            fars = np.fmin.reduce(np.fmax(t0, t1), 1)
+            if return_nears:
+                return nears
+            return (nears <= fars) & (fars >= 0) & (nears <= t_max)
+
+        queries, leaves = self._traverse(len(origins), test)
+        nears = test(queries, (self.lows, self.highs), leaves, True)
+        order = np.lexsort((nears, queries))
+        return queries[order], leaves[order], np.maximum(nears[order], 0)
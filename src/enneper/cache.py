@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import collections
+import hashlib
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import foundation as fdn
+
+
+# the cache is opt-in, see enable_cache
+_cache = None
+
+
+# LRU cache of knot span indices and basis functions keyed by a hash of the
+# knot vector, the degree and the parameters
+class BasisCache(object):
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+###############################################################################
+# properties
+###############################################################################
+
+    @property
+    def stats(self):
+        return dict(hits=self.hits, misses=self.misses,
+                    evictions=self.evictions, entries=len(self._entries),
+                    n_bytes=self.n_bytes, max_bytes=self.max_bytes)
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def get_basis_funs(self, us, deg, knots):
+
+        us = np.ascontiguousarray(us, dtype=np.double).ravel()
+        knots = np.ascontiguousarray(knots, dtype=np.double)
+        key = self._get_key(us, deg, knots)
+
+        try:
+            entry = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            entry = self._insert(key, fdn.get_basis_funs(us, deg, knots))
+        else:
+            # reinsert to mark the entry as most recently used
+            self.hits += 1
+            self._entries[key] = entry
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.n_bytes = 0
+
+    def _get_key(self, us, deg, knots):
+        digest = hashlib.sha1(knots.view(np.uint8))
+        digest.update(us.view(np.uint8))
+        return deg, us.size, digest.hexdigest()
+
+    def _insert(self, key, entry):
+
+        # cached arrays are shared, so nobody may modify them
+        for array in entry:
+            array.setflags(write=False)
+
+        n_bytes = sum(array.nbytes for array in entry)
+        if n_bytes > self.max_bytes:
+            return entry
+
+        # evict least recently used entries
+        while self.n_bytes + n_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.n_bytes -= sum(array.nbytes for array in evicted)
+            self.evictions += 1
+
+        self._entries[key] = entry
+        self.n_bytes += n_bytes
+        return entry
+
+
+def enable_cache(max_bytes=64 * 2**20):
+    global _cache
+    _cache = BasisCache(max_bytes)
+    return _cache
+
+
+def disable_cache():
+    global _cache
+    _cache = None
+
+
+def get_cache():
+    return _cache
+
+
+def get_basis_funs(us, deg, knots):
+    if _cache is None:
+        return fdn.get_basis_funs(us, deg, knots)
+    return _cache.get_basis_funs(us, deg, knots)
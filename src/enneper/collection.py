@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import os
+
+# project packages
+import binary
+from batch import CurveBatch, SurfaceBatch
+from curve import Curve
+from surface import Surface
+
+
+KINDS = dict(curve=Curve, surface=Surface, curve_batch=CurveBatch,
+             surface_batch=SurfaceBatch)
+
+
+# A collection file is a plain sequence of binary records (see binary.py),
+# so new objects are simply appended to the end of the file.
+
+
+class CollectionWriter(object):
+
+    def __init__(self, filename):
+        self._file = open(filename, 'ab')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, obj):
+        obj.export_binary(self._file)
+
+    def write_many(self, objs):
+        for obj in objs:
+            obj.export_binary(self._file)
+
+    def close(self):
+        self._file.close()
+
+
+class CollectionReader(object):
+
+    def __init__(self, filename, mmap_mode=None):
+        self.mmap_mode = mmap_mode
+        self._file = open(filename, 'rb')
+        self._offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+
+        # objects are loaded one by one, so memory stays bounded
+        position = 0
+        while True:
+            self._file.seek(position)
+            try:
+                obj = self._load()
+            except EOFError:
+                return
+            position = self._file.tell()
+            yield obj
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        self._file.seek(self.offsets[index])
+        return self._load()
+
+    @property
+    def offsets(self):
+
+        # walk the headers once, the array blocks are skipped
+        if self._offsets is None:
+            offsets, position = [], 0
+            size = os.fstat(self._file.fileno()).st_size
+            while position < size:
+                self._file.seek(position)
+                offsets.append(position)
+                position += binary.load_header(self._file)['size']
+            self._offsets = offsets
+        return self._offsets
+
+    def close(self):
+        self._file.close()
+
+    def _load(self):
+        kind, arrays = binary.load(self._file, mmap_mode=self.mmap_mode)
+        return KINDS[kind](**arrays)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import fitting
+import foundation as fdn
+import matrices
+import primitives
+import refinement as rfn
+
+
+def revolve(ctrl_pnts, pos_v, dir_v, angle):
+
+    # see "The NURBS Book" 2nd edition: algorithm A8.1, every control point
+    # of the profile sweeps a scaled copy of the same unit arc
+    arc = primitives.CircularArc(angle)
+    arc_weights = arc.ctrl_pnts[:, -1]
+    arc_pnts = arc.ctrl_pnts[:, :2] / arc_weights[:, None]
+
+    pos_v = np.asarray(pos_v, dtype=np.double)
+    dir_v = np.asarray(dir_v, dtype=np.double)
+    dir_v = dir_v / np.sqrt(np.dot(dir_v, dir_v))
+
+    # local frame of the circle of every control point
+    weights = ctrl_pnts[:, -1]
+    pnts = ctrl_pnts[:, :-1] / weights[:, None]
+    centers = fdn.project_point_to_line(pnts, pos_v, dir_v)
+    x_axes = pnts - centers
+    radii = np.sqrt(np.sum(x_axes * x_axes, -1))[:, None]
+    x_axes = np.divide(x_axes, radii, out=np.zeros_like(x_axes),
+                       where=radii > 0)
+    y_axes = np.cross(dir_v, x_axes)
+
+    # (arc, profile, dim)
+    net = centers + radii * (arc_pnts[:, None, :1] * x_axes +
+                             arc_pnts[:, None, 1:] * y_axes)
+    net_weights = arc_weights[:, None] * weights
+    h_net = np.empty(net.shape[:2] + (net.shape[2] + 1,))
+    h_net[..., :-1] = net * net_weights[..., None]
+    h_net[..., -1] = net_weights
+    return h_net, arc.knots
+
+
+def skin(ctrl_pnts_seq, knots_seq, deg, deg_v=3, params=None):
+
+    # see "The NURBS Book" 2nd edition: section 10.3, the sections are made
+    # compatible and their control points interpolated across sections
+    sections, knots_u = rfn.make_compatible(ctrl_pnts_seq, knots_seq, deg)
+    sections = np.array(sections)
+    if params is None:
+        pnts = fdn.get_cartesian_points(sections)
+        params = fitting.get_grid_params(pnts)
+
+    # all columns share one banded system
+    deg_v = min(deg_v, len(sections) - 1)
+    flat = sections.reshape(len(sections), -1)
+    net, knots_v, _ = fitting.interpolate(flat, deg_v, params=params)
+    return net.reshape(sections.shape).swapaxes(0, 1), knots_u, knots_v
+
+
+def get_frames(tangents):
+
+    # see "The NURBS Book" 2nd edition: section 10.4, projection normals;
+    # columns of every frame are normal, binormal and tangent
+    frames = np.empty(tangents.shape + (3,))
+    frames[:, :, 2] = tangents
+    axis = np.identity(3)[np.argmin(np.abs(tangents[0]))]
+    binormal = np.cross(tangents[0], axis)
+    for frame, tangent in zip(frames, tangents):
+        normal = np.cross(binormal, tangent)
+        normal /= np.sqrt(np.dot(normal, normal))
+        binormal = np.cross(tangent, normal)
+        frame[:, 0], frame[:, 1] = normal, binormal
+    return frames
+
+
+def sweep(profile, trajectory, n_sections=None):
+
+    # monorail sweep: the profile is given in the xy-plane and moved along
+    # the trajectory with z in tangent direction, the copies are skinned
+    deg, knots = trajectory.deg, trajectory.knots
+    if n_sections is None:
+        n_sections = len(trajectory.ctrl_pnts) + deg
+    params = np.linspace(knots[deg], knots[-deg - 1], n_sections)
+    ders = trajectory.derivatives_many(params, 1, cartesian=True)
+    tangents = ders[:, 1] / np.sqrt(np.sum(ders[:, 1]**2, -1))[:, None]
+
+    # one matrix per section
+    transforms = np.zeros((n_sections, 4, 4))
+    transforms[:, :3, :3] = get_frames(tangents)
+    transforms[:, :3, 3] = ders[:, 0]
+    transforms[:, 3, 3] = 1
+    ctrl_pnts = profile.ctrl_pnts
+    if ctrl_pnts.shape[1] == 3:
+        ctrl_pnts = np.insert(ctrl_pnts, 2, 0, 1)
+    sections = np.repeat(ctrl_pnts[None], n_sections, 0)
+    matrices.apply(transforms, sections)
+
+    params = (params - params[0]) / (params[-1] - params[0])
+    deg_v = min(deg, n_sections - 1)
+    flat = sections.reshape(n_sections, -1)
+    net, knots_v, _ = fitting.interpolate(flat, deg_v, params=params)
+    return net.reshape(sections.shape).swapaxes(0, 1), profile.knots, knots_v
@@ -28,8 +28,16 @@ import json
 import numpy as np
 
 # project packages
+import arclength
+import binary
+import cache
 import foundation as fdn
 import cfoundation as cfdn
+import fitting
+import intersection
+import matrices
+import projection
+import refinement as rfn
 
 
 __all__ = ['Curve']
@@ -37,9 +45,11 @@ __all__ = ['Curve']
 
 class Curve(object):
 
-    def __init__(self, ctrl_pnts, knots):
-        self.ctrl_pnts = np.asarray(ctrl_pnts, dtype=np.double)
+    def __init__(self, ctrl_pnts, knots, dtype=None):
+        self.ctrl_pnts, is_new = fdn.get_ctrl_pnts(ctrl_pnts, dtype)
+        self._owned_ctrl_pnts = self.ctrl_pnts if is_new else None
         self.knots = np.asarray(knots, dtype=np.double)
+        self._arclength_table = None
 
 ###############################################################################
 # constructors
@@ -47,12 +57,22 @@ class Curve(object):
 
     @classmethod
     def from_curve(cls, curve):
-        return cls(curve.ctrl_pnts.copy(), curve.knots.copy())
+        return fdn.hand_over(cls(curve.ctrl_pnts.copy(), curve.knots.copy()))
+
+    @classmethod
+    def fit(cls, pnts, deg, n_ctrl=None, tol=None, method='chord'):
+        return fdn.hand_over(
+            cls(*fitting.fit_curve(pnts, deg, n_ctrl, tol, method)))
 
     @classmethod
     def from_json(cls, file_like_obj):
         return cls(**json.load(file_like_obj))
 
+    @classmethod
+    def from_binary(cls, file_like_obj, mmap_mode=None):
+        _, arrays = binary.load(file_like_obj, 'curve', mmap_mode)
+        return cls(**arrays)
+
 ###############################################################################
 # properties
 ###############################################################################
@@ -71,17 +91,121 @@ class Curve(object):
         knots = self.knots
         deg = self.deg
 
-        # see "The NURBS Book" 2nd edition: algorithm A2.1 and A2.2
+        # see "The NURBS Book" 2nd edition: algorithm A2.1 and A2.2, single
+        # parameters bypass the cache, one entry each would only evict
+        # the batched ones
         index = cfdn.get_index(u, deg, knots)
         basis_funs = np.empty((deg + 1, 1), dtype=np.double)
         cfdn.calc_basis_funs(index, u, deg, knots, basis_funs[:, 0])
 
-        # calc homogeneous point
+        # calc homogeneous point in the precision of the control points
         lb, ub = index - deg, index + 1
-        return np.sum(self.ctrl_pnts[lb:ub] * basis_funs, 0)
+        pnt = np.sum(self.ctrl_pnts[lb:ub] * basis_funs, 0)
+        return pnt.astype(self.ctrl_pnts.dtype, copy=False)
+
+    def evaluate_many(self, us, out=None, cartesian=False):
+
+        # the compiled kernel needs contiguous arrays, the points have the
+        # precision of the control points; cartesian points are divided by
+        # their weight in the same pass
+        us = np.ascontiguousarray(us, dtype=np.double)
+        ctrl_pnts = np.ascontiguousarray(self.ctrl_pnts)
+        knots = np.ascontiguousarray(self.knots)
+
+        shape = (us.size, ctrl_pnts.shape[1] - bool(cartesian))
+        if out is None:
+            out = np.empty(shape, ctrl_pnts.dtype)
+        else:
+            fdn.check_out(out, shape, ctrl_pnts.dtype)
+
+        # see "The NURBS Book" 2nd edition: algorithm A2.1, A2.2 and A4.1
+        if cache.get_cache() is None:
+            cfdn.evaluate_curve(us, self.deg, knots, ctrl_pnts, out,
+                                cartesian)
+        else:
+            indices, basis_funs = cache.get_basis_funs(us, self.deg, knots)
+            cfdn.contract_curve(indices, basis_funs, ctrl_pnts, out,
+                                cartesian)
+        return out
+
+    def derivatives_many(self, us, n_ders, cartesian=False, dtype=None):
+
+        # see "The NURBS Book" 2nd edition: algorithm A2.3 and A3.2
+        deg = self.deg
+        indices, ders = fdn.get_ders_basis_funs(us, deg, n_ders, self.knots)
+
+        # control points of every span: (N, deg + 1, dim)
+        ctrl_pnts = self.ctrl_pnts[indices[:, None] + np.arange(-deg, 1)]
+        h_ders = np.einsum('nkj,njd->nkd', ders, ctrl_pnts)
+
+        # quotient rule for the homogeneous control points; the derivatives
+        # have the precision of the control points unless dtype is given
+        ders = fdn.get_cartesian_ders(h_ders) if cartesian else h_ders
+        return ders.astype(fdn.get_precision(self.ctrl_pnts.dtype, dtype),
+                           copy=False)
+
+    def tangents(self, us):
+        ders = self.derivatives_many(us, 1, cartesian=True)[:, 1]
+        return ders / np.sqrt(np.sum(ders * ders, -1))[:, None]
+
+    def get_arclength_table(self):
+
+        # rebuild the table if the curve was modified in place
+        table = self._arclength_table
+        if table is None or table.key != arclength.get_key(self):
+            table = self._arclength_table = arclength.ArcLengthTable(self)
+        return table
+
+    def length(self):
+        return self.get_arclength_table().length
+
+    def get_params_by_arclength(self, lengths):
+        return self.get_arclength_table().get_params(lengths)
+
+    def sample_by_arclength(self, n=None, spacing=None):
+
+        table = self.get_arclength_table()
+        if n is not None:
+            lengths = np.linspace(0, table.length, n)
+        elif spacing is not None:
+            lengths = np.arange(0, table.length, spacing)
+        else:
+            raise ValueError('either n or spacing is required')
+        return self.evaluate_many(table.get_params(lengths))
+
+    def intersect_lines(self, origins, dirs):
+        return intersection.intersect_curve_lines(self, origins, dirs)
+
+    def intersect_curves(self, curves):
+        return intersection.intersect_curves(self, curves)
+
+    def closest_points(self, pnts, seed_index=None):
+        return projection.project_points_to_curve(self, pnts, seed_index)
+
+    def insert_knot(self, u, r=1):
+        ctrl_pnts, knots = rfn.insert_knot(
+            self.ctrl_pnts, self.knots, self.deg, u, r)
+        return fdn.hand_over(self.__class__(ctrl_pnts, knots))
+
+    def refine_knots(self, new_knots):
+        ctrl_pnts, knots = rfn.refine_knots(
+            self.ctrl_pnts, self.knots, self.deg, new_knots)
+        return fdn.hand_over(self.__class__(ctrl_pnts, knots))
+
+    def decompose(self):
+        return rfn.decompose(self.ctrl_pnts, self.knots, self.deg)
+
+    def astype(self, dtype):
+        return fdn.hand_over(self.__class__(
+            self.ctrl_pnts.astype(dtype), self.knots.copy(), dtype))
 
     def transform(self, matrix):
-        self.ctrl_pnts = np.dot(matrix, self.ctrl_pnts.transpose()).transpose()
+
+        # control points of the caller or of a memory map are copied once,
+        # owned ones are transformed in place
+        if self.ctrl_pnts is not self._owned_ctrl_pnts:
+            self.ctrl_pnts = self._owned_ctrl_pnts = np.array(self.ctrl_pnts)
+        matrices.apply(matrix, self.ctrl_pnts)
 
     def export(self, file_like_obj, indent=None):
 
@@ -91,3 +215,7 @@ class Curve(object):
 
         obj_to_serialize = dict(ctrl_pnts=ctrl_pnts, knots=knots)
         json.dump(obj_to_serialize, file_like_obj, indent=indent)
+
+    def export_binary(self, file_like_obj):
+        arrays = [('ctrl_pnts', self.ctrl_pnts), ('knots', self.knots)]
+        binary.dump(file_like_obj, 'curve', arrays)
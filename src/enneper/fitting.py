@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+from __future__ import division
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import foundation as fdn
+import cfoundation as cfdn
+
+
+def _get_chords(pnts, method):
+    chords = np.sqrt(np.sum(np.diff(pnts, axis=0)**2, -1))
+    if method == 'centripetal':
+        return np.sqrt(chords)
+    elif method != 'chord':
+        raise ValueError('unknown parametrization {0}'.format(method))
+    return chords
+
+
+def get_params(pnts, method='chord'):
+
+    # see "The NURBS Book" 2nd edition: equation 9.5 and 9.6
+    chords = _get_chords(pnts, method)
+    params = np.append(0, np.cumsum(chords))
+    if params[-1] == 0:
+        raise ValueError('all points coincide')
+
+    # repeated parameters would make the linear systems singular
+    indices = np.flatnonzero(chords == 0)
+    if len(indices):
+        pairs = ', '.join('{0} and {1}'.format(i, i + 1) for i in indices)
+        raise ValueError('consecutive points coincide: {0}'.format(pairs))
+    params /= params[-1]
+    params[-1] = 1
+    return params
+
+
+def get_grid_params(pnts, method='chord'):
+
+    # see "The NURBS Book" 2nd edition: algorithm A9.3, params of the columns
+    # along the first axis are averaged, degenerate columns are skipped
+    chords = _get_chords(pnts, method)
+    totals = np.sum(chords, 0)
+    is_valid = totals > 0
+    if not np.any(is_valid):
+        raise ValueError('all points coincide')
+    params = np.cumsum(chords[:, is_valid] / totals[is_valid], 0)
+    params = np.append(0, np.mean(params, 1))
+    params[-1] = 1
+    return params
+
+
+def get_plane_params(pnts):
+
+    # project scattered points onto their least squares plane and scale the
+    # projections to the unit square
+    pnts = pnts - np.mean(pnts, 0)
+    _, axes = np.linalg.eigh(np.dot(pnts.T, pnts))
+    params = np.dot(pnts, axes[:, :-3:-1])
+    params -= np.min(params, 0)
+    params /= np.max(params, 0)
+    return params
+
+
+def get_interpolation_knots(params, deg):
+
+    # see "The NURBS Book" 2nd edition: equation 9.8 (averaging)
+    sums = np.cumsum(np.append(0, params))
+    inner = (sums[deg + 1:-1] - sums[1:-deg - 1]) / deg
+    return np.concatenate((np.zeros(deg + 1), inner, np.ones(deg + 1)))
+
+
+def get_approximation_knots(params, deg, n_ctrl):
+
+    # see "The NURBS Book" 2nd edition: equation 9.68 and 9.69
+    d = len(params) / (n_ctrl - deg)
+    js = np.arange(1, n_ctrl - deg)
+    i = (js * d).astype(int)
+    alpha = js * d - i
+    inner = (1 - alpha) * params[i - 1] + alpha * params[i]
+    return np.concatenate((np.zeros(deg + 1), inner, np.ones(deg + 1)))
+
+
+def get_uniform_knots(deg, n_ctrl):
+    inner = np.linspace(0, 1, n_ctrl - deg + 1)[1:-1]
+    return np.concatenate((np.zeros(deg + 1), inner, np.ones(deg + 1)))
+
+
+def _solve(cols, basis_funs, rhs, n):
+
+    # the matrix has one row per point and at most deg + 1 nonzero entries
+    # in consecutive columns, only the band is ever stored
+    rows = np.arange(len(cols))[:, None]
+    l = max(0, np.max(rows[:, 0] - cols[:, 0]))
+    u = max(0, np.max(cols[:, -1] - rows[:, 0]))
+    ab = np.zeros((l + u + 1, n))
+    ab[u + rows - cols, cols] = basis_funs
+    rhs = np.array(rhs, dtype=np.double, order='C')
+    cfdn.solve_banded(l, u, ab, rhs)
+    return rhs
+
+
+def _group(cols):
+
+    # rows sorted by their first column and the start of every group
+    order = slice(None)
+    if np.any(cols[1:, 0] < cols[:-1, 0]):
+        order = np.argsort(cols[:, 0], kind='mergesort')
+    firsts = cols[order, 0]
+    starts = np.flatnonzero(np.diff(np.append(-1, firsts)))
+    return order, starts, firsts[starts]
+
+
+def _add_gram(ab, cols, weights, offsets):
+
+    # adds N^T N of a sparse matrix N to the symmetric band ab, the nonzero
+    # weights of every row of N are in the columns cols = first + offsets,
+    # so all products are summed per first column
+    bw = len(ab) // 2
+    order, starts, firsts = _group(cols)
+    weights = np.ascontiguousarray(weights[order].T)
+    offsets = offsets - offsets[:, None]
+    for a, b in zip(*np.nonzero(offsets >= 0)):
+        sums = np.add.reduceat(weights[a] * weights[b], starts)
+        ab[bw - offsets[a, b], firsts + offsets[0, b]] += sums
+
+    # mirror the upper band: a[j + k, j] = a[j, j + k]
+    n = ab.shape[1]
+    for k in xrange(1, bw + 1):
+        ab[bw + k, :max(n - k, 0)] = ab[bw - k, k:]
+
+
+def _get_normal_rhs(cols, weights, rhs, offsets, n):
+
+    # N^T R, summed per first column even for many right hand sides
+    order, starts, firsts = _group(cols)
+    weights, rhs = weights[order], rhs[order]
+    nt_rhs = np.zeros((n, rhs.shape[1]))
+    for a in xrange(cols.shape[1]):
+        nt_rhs[firsts + offsets[a]] += np.add.reduceat(
+            weights[:, a, None] * rhs, starts)
+    return nt_rhs
+
+
+def interpolate(pnts, deg, method='chord', params=None):
+
+    # see "The NURBS Book" 2nd edition: algorithm A9.1
+    pnts = np.asarray(pnts, dtype=np.double)
+    if params is None:
+        params = get_params(pnts, method)
+    knots = get_interpolation_knots(params, deg)
+    indices, basis_funs = fdn.get_basis_funs(params, deg, knots)
+    cols = indices[:, None] - deg + np.arange(deg + 1)
+    return _solve(cols, basis_funs, pnts, len(pnts)), knots, params
+
+
+def approximate(pnts, deg, n_ctrl, method='chord', params=None):
+
+    # see "The NURBS Book" 2nd edition: section 9.4.1, the end points are
+    # interpolated and the inner control points fitted in the least squares
+    # sense
+    pnts = np.asarray(pnts, dtype=np.double)
+    if params is None:
+        params = get_params(pnts, method)
+    knots = get_approximation_knots(params, deg, n_ctrl)
+    indices, basis_funs = fdn.get_basis_funs(params[1:-1], deg, knots)
+    cols = indices[:, None] - deg + np.arange(deg + 1)
+
+    # move the fixed end points to the right hand side
+    is_fixed = (cols == 0) | (cols == n_ctrl - 1)
+    rhs = pnts[1:-1] - \
+        np.sum(basis_funs * (cols == 0), 1)[:, None] * pnts[0] - \
+        np.sum(basis_funs * (cols == n_ctrl - 1), 1)[:, None] * pnts[-1]
+    basis_funs = np.where(is_fixed, 0, basis_funs)
+
+    # the rows and columns of the end points vanish, so the band of the
+    # inner control points is a slice of the full band
+    offsets = np.arange(deg + 1)
+    ab = np.zeros((2 * deg + 1, n_ctrl))
+    _add_gram(ab, cols, basis_funs, offsets)
+    ctrl_pnts = _get_normal_rhs(cols, basis_funs, rhs, offsets, n_ctrl)
+    ctrl_pnts[0], ctrl_pnts[-1] = pnts[0], pnts[-1]
+    if n_ctrl > 2:
+        ab = np.ascontiguousarray(ab[:, 1:-1])
+        cfdn.solve_banded(deg, deg, ab, ctrl_pnts[1:-1])
+    return ctrl_pnts, knots, params
+
+
+def get_errors(ctrl_pnts, knots, deg, params, pnts):
+    fitted = np.empty_like(pnts)
+    cfdn.evaluate_curve(params, deg, knots, ctrl_pnts, fitted)
+    return np.sqrt(np.sum((fitted - pnts)**2, -1))
+
+
+def _to_homogeneous(ctrl_pnts):
+    h_ctrl_pnts = np.ones(ctrl_pnts.shape[:-1] + (ctrl_pnts.shape[-1] + 1,))
+    h_ctrl_pnts[..., :-1] = ctrl_pnts
+    return h_ctrl_pnts
+
+
+def fit_curve(pnts, deg, n_ctrl=None, tol=None, method='chord'):
+
+    # returns homogeneous control points and knots of a non-rational curve
+    pnts = np.asarray(pnts, dtype=np.double)
+    deg = min(deg, len(pnts) - 1)
+
+    if n_ctrl is None and tol is not None:
+        # double the control points until the errors at the parameters
+        # are below tol, at worst the points are interpolated
+        params = get_params(pnts, method)
+        n_ctrl = deg + 1
+        while n_ctrl < len(pnts):
+            ctrl_pnts, knots, _ = approximate(pnts, deg, n_ctrl,
+                                              params=params)
+            if np.max(get_errors(ctrl_pnts, knots, deg, params, pnts)) <= tol:
+                break
+            n_ctrl = min(2 * n_ctrl, len(pnts))
+        else:
+            ctrl_pnts, knots, _ = interpolate(pnts, deg, params=params)
+    elif n_ctrl is None or n_ctrl >= len(pnts):
+        ctrl_pnts, knots, _ = interpolate(pnts, deg, method)
+    else:
+        ctrl_pnts, knots, _ = approximate(pnts, deg, max(n_ctrl, deg + 1),
+                                          method)
+
+    return _to_homogeneous(ctrl_pnts), knots
+
+
+def _fit_columns(pnts, deg, n_ctrl, params):
+
+    # fits all columns of pnts at once, they share one banded matrix
+    deg = min(deg, len(pnts) - 1)
+    flat = pnts.reshape(len(pnts), -1)
+    if n_ctrl is None or n_ctrl >= len(pnts):
+        ctrl_pnts, knots, _ = interpolate(flat, deg, params=params)
+    else:
+        ctrl_pnts, knots, _ = approximate(flat, deg, max(n_ctrl, deg + 1),
+                                          params=params)
+    return ctrl_pnts.reshape((-1,) + pnts.shape[1:]), knots
+
+
+def fit_grid(pnts, deg_u, deg_v, n_ctrl_u=None, n_ctrl_v=None,
+             method='chord'):
+
+    # see "The NURBS Book" 2nd edition: algorithm A9.4 and section 9.4.3,
+    # the grid is fitted along u first and the result along v
+    pnts = np.asarray(pnts, dtype=np.double)
+    params_u = get_grid_params(pnts, method)
+    params_v = get_grid_params(pnts.swapaxes(0, 1), method)
+    ctrl_pnts, knots_u = _fit_columns(pnts, deg_u, n_ctrl_u, params_u)
+    ctrl_pnts, knots_v = _fit_columns(ctrl_pnts.swapaxes(0, 1), deg_v,
+                                      n_ctrl_v, params_v)
+    return _to_homogeneous(ctrl_pnts.swapaxes(0, 1)), knots_u, knots_v
+
+
+def fit_scattered(pnts, deg_u, deg_v, n_ctrl_u, n_ctrl_v, params=None,
+                  smoothing=0.):
+
+    # least squares fit with uniform knots, the control points are numbered
+    # row by row so that the normal equations are banded
+    pnts = np.asarray(pnts, dtype=np.double)
+    if params is None:
+        params = get_plane_params(pnts)
+    params = np.asarray(params, dtype=np.double)
+    knots_u = get_uniform_knots(deg_u, n_ctrl_u)
+    knots_v = get_uniform_knots(deg_v, n_ctrl_v)
+    indices_u, basis_funs_u = fdn.get_basis_funs(params[:, 0], deg_u, knots_u)
+    indices_v, basis_funs_v = fdn.get_basis_funs(params[:, 1], deg_v, knots_v)
+
+    # nonzero entries of every row of the collocation matrix
+    cols_u = indices_u[:, None] - deg_u + np.arange(deg_u + 1)
+    cols_v = indices_v[:, None] - deg_v + np.arange(deg_v + 1)
+    cols = (cols_u[:, :, None] * n_ctrl_v + cols_v[:, None]).reshape(
+        len(pnts), -1)
+    weights = (basis_funs_u[:, :, None] * basis_funs_v[:, None]).reshape(
+        len(pnts), -1)
+
+    n = n_ctrl_u * n_ctrl_v
+    bw = max(deg_u, 2) * n_ctrl_v + max(deg_v, 2)
+    ab = np.zeros((2 * bw + 1, n))
+    offsets = np.ravel(np.arange(deg_u + 1)[:, None] * n_ctrl_v +
+                       np.arange(deg_v + 1))
+    _add_gram(ab, cols, weights, offsets)
+
+    # penalize second differences of the control net, the weight is scaled
+    # by the number of points per control point
+    if smoothing > 0:
+        ids = np.arange(n).reshape(n_ctrl_u, n_ctrl_v)
+        weight = np.sqrt(smoothing * len(pnts) / n)
+        for stencil, step in [(ids[:-2], n_ctrl_v), (ids[:, :-2], 1)]:
+            stencil_offsets = np.arange(3) * step
+            stencil_cols = stencil.reshape(-1, 1) + stencil_offsets
+            stencil_weights = np.empty(stencil_cols.shape)
+            stencil_weights[:] = np.multiply(weight, [1, -2, 1])
+            _add_gram(ab, stencil_cols, stencil_weights, stencil_offsets)
+
+    ctrl_pnts = _get_normal_rhs(cols, weights, pnts, offsets, n)
+    cfdn.solve_banded(bw, bw, ab, ctrl_pnts)
+    ctrl_pnts = ctrl_pnts.reshape(n_ctrl_u, n_ctrl_v, -1)
+    return _to_homogeneous(ctrl_pnts), knots_u, knots_v
+
+
+def fit_surface(pnts, deg_u, deg_v, n_ctrl_u=None, n_ctrl_v=None,
+                params=None, smoothing=0., method='chord'):
+
+    # grids of points (M, N, dim) or scattered points (M, dim)
+    pnts = np.asarray(pnts, dtype=np.double)
+    if pnts.ndim == 3:
+        return fit_grid(pnts, deg_u, deg_v, n_ctrl_u, n_ctrl_v, method)
+    if n_ctrl_u is None or n_ctrl_v is None:
+        raise ValueError('scattered points need n_ctrl_u and n_ctrl_v')
+    return fit_scattered(pnts, deg_u, deg_v, n_ctrl_u, n_ctrl_v, params,
+                         smoothing)
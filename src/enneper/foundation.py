@@ -25,6 +25,8 @@ import textwrap
 
 import numpy as np
 
+import cfoundation as cfdn
+
 
 class NURBSError(Exception):
     
@@ -48,6 +50,78 @@ def check_nurbs_condition(ctrl_pnts_count, knots_count, deg):
         raise NURBSError(ctrl_pnts_count, knots_count, deg)
 
 
+def get_indices(us, deg, knots):
+    us = np.ascontiguousarray(us, dtype=np.double)
+    indices = np.empty(us.size, dtype=np.intc)
+    knots = np.ascontiguousarray(knots, dtype=np.double)
+    cfdn.get_indices(us, deg, knots, indices)
+    return indices
+
+
+def get_basis_funs(us, deg, knots):
+    us = np.ascontiguousarray(us, dtype=np.double)
+    indices = np.empty(us.size, dtype=np.intc)
+    basis_funs = np.empty((us.size, deg + 1), dtype=np.double)
+    knots = np.ascontiguousarray(knots, dtype=np.double)
+    cfdn.calc_basis_funs_many(us, deg, knots, indices, basis_funs)
+    return indices, basis_funs
+
+
+def get_ders_basis_funs(us, deg, n_ders, knots):
+    us = np.ascontiguousarray(us, dtype=np.double)
+    indices = np.empty(us.size, dtype=np.intc)
+    ders = np.empty((us.size, n_ders + 1, deg + 1), dtype=np.double)
+    knots = np.ascontiguousarray(knots, dtype=np.double)
+    cfdn.calc_ders_basis_funs_many(us, deg, n_ders, knots, indices, ders)
+    return indices, ders
+
+
+def get_binomial_coefficients(n):
+    bin_coeffs = np.zeros((n + 1, n + 1), dtype=np.double)
+    bin_coeffs[:, 0] = 1
+    for i in range(1, n + 1):
+        bin_coeffs[i, 1:] = bin_coeffs[i - 1, 1:] + bin_coeffs[i - 1, :-1]
+    return bin_coeffs
+
+
+def get_cartesian_ders(h_ders):
+
+    # see "The NURBS Book" 2nd edition: algorithm A4.2
+    a_ders, w_ders = h_ders[..., :-1], h_ders[..., -1:]
+    bin_coeffs = get_binomial_coefficients(h_ders.shape[-2] - 1)
+    ders = np.empty_like(a_ders)
+    for k in range(ders.shape[-2]):
+        v = a_ders[..., k, :].copy()
+        for i in range(1, k + 1):
+            v -= bin_coeffs[k, i] * w_ders[..., i, :] * ders[..., k - i, :]
+        ders[..., k, :] = v / w_ders[..., 0, :]
+    return ders
+
+
+def get_cartesian_surface_ders(h_ders):
+
+    # see "The NURBS Book" 2nd edition: algorithm A4.4
+    a_ders, w_ders = h_ders[..., :-1], h_ders[..., -1:]
+    bin_coeffs = get_binomial_coefficients(h_ders.shape[-2] - 1)
+    ders = np.empty_like(a_ders)
+    for k in range(ders.shape[-3]):
+        for l in range(ders.shape[-2]):
+            v = a_ders[..., k, l, :].copy()
+            for j in range(1, l + 1):
+                v -= bin_coeffs[l, j] * w_ders[..., 0, j, :] * \
+                    ders[..., k, l - j, :]
+            for i in range(1, k + 1):
+                v -= bin_coeffs[k, i] * w_ders[..., i, 0, :] * \
+                    ders[..., k - i, l, :]
+                v2 = np.zeros_like(v)
+                for j in range(1, l + 1):
+                    v2 += bin_coeffs[l, j] * w_ders[..., i, j, :] * \
+                        ders[..., k - i, l - j, :]
+                v -= bin_coeffs[k, i] * v2
+            ders[..., k, l, :] = v / w_ders[..., 0, 0, :]
+    return ders
+
+
 def get_cartesian_points(h_pnts):
     shape = list(h_pnts.shape)
     h_coords = h_pnts.reshape(-1, shape[-1]).transpose()
@@ -56,22 +130,68 @@ def get_cartesian_points(h_pnts):
     return coords.transpose().reshape(*shape)
 
 
+def get_precision(dtype, precision=None):
+
+    # control points stay in single precision if they are or if asked for,
+    # everything else is double; knots are always double
+    if precision is None:
+        precision = np.float32 if dtype == np.float32 else np.double
+    precision = np.dtype(precision)
+    if precision not in (np.dtype(np.float32), np.dtype(np.double)):
+        raise ValueError('precision must be float32 or float64')
+    return precision
+
+
+def get_ctrl_pnts(ctrl_pnts, precision=None, order=None):
+
+    # arrays of the caller are used as they are if precision and order fit;
+    # the flag tells if a new array was made, which the caller then owns
+    array = np.asarray(ctrl_pnts)
+    array = np.asarray(array, get_precision(array.dtype, precision), order)
+    is_new = not isinstance(ctrl_pnts, np.ndarray) or \
+        not np.may_share_memory(array, ctrl_pnts)
+    return array, is_new
+
+
+def hand_over(obj):
+
+    # the control points of obj were made for it only, so it owns them and
+    # transforms them in place
+    obj._owned_ctrl_pnts = obj.ctrl_pnts
+    return obj
+
+
+def check_out(out, shape, dtype):
+
+    # the compiled kernels write into out directly, so its layout must match
+    # exactly; mismatches are reported here instead of as buffer errors
+    dtype = np.dtype(dtype)
+    if not isinstance(out, np.ndarray) or out.shape != shape or \
+            out.dtype != dtype or not out.flags.c_contiguous:
+        raise ValueError('out must be a C-contiguous {0} array of shape '
+                         '{1}'.format(dtype.name, shape))
+    return out
+
+
 def get_h_pnt(pnts, weights):
     return np.hstack((pnts * weights[:, None], weights))
  
 
 
 def intersect_lines(pos_v, dir_v):
+
+    # closest point on the first line to the second one and its parameter;
+    # pairs of lines may be stacked along the leading axes
     p13 = pos_v[0] - pos_v[1]
-    d1343 = np.dot(p13, dir_v[1])
-    d4321 = np.dot(dir_v[1], dir_v[0])
-    d1321 = np.dot(p13, dir_v[0])
-    d4343 = np.dot(dir_v[1], dir_v[1])
-    d2121 = np.dot(dir_v[0], dir_v[0])
+    d1343 = np.sum(p13 * dir_v[1], -1)
+    d4321 = np.sum(dir_v[1] * dir_v[0], -1)
+    d1321 = np.sum(p13 * dir_v[0], -1)
+    d4343 = np.sum(dir_v[1] * dir_v[1], -1)
+    d2121 = np.sum(dir_v[0] * dir_v[0], -1)
     denom = d2121 * d4343 - d4321 * d4321
     numer = d1343 * d4321 - d1321 * d4343
     mua = numer / denom
-    return pos_v[0] + mua * dir_v[0], 1
+    return pos_v[0] + np.multiply(mua[..., None], dir_v[0]), mua
 
 
 def p_norm(v, p):
@@ -79,4 +199,5 @@ def p_norm(v, p):
 
 
 def project_point_to_line(pnt, pos_v, dir_v):
-    return pos_v + np.dot(pnt - pos_v, dir_v) / np.dot(dir_v, dir_v) * dir_v
+    ts = np.dot(pnt - pos_v, dir_v) / np.dot(dir_v, dir_v)
+    return pos_v + np.multiply.outer(ts, dir_v)
@@ -26,8 +26,73 @@
 ###############################################################################
 
 cimport cython
+from cython cimport floating
+from cython.parallel cimport prange
 from libc.stdlib cimport malloc, free
-from numpy cimport ndarray
+
+
+###############################################################################
+# Python imports
+###############################################################################
+
+import multiprocessing
+import os
+
+import numpy as np
+
+
+###############################################################################
+# threads
+###############################################################################
+
+# batched kernels are split into chunks of parameters which are scheduled
+# across the threads; a degree up to _MAX_DEG needs no heap buffers in the
+# scalar kernels
+cdef enum:
+    _CHUNK_SIZE = 1024
+    _MAX_DEG = 31
+
+def _get_default_threads():
+
+    # OpenMP accepts a list of counts per nesting level, e.g. "4,2"; values
+    # that aren't a positive count fall back to all cores
+    try:
+        n_threads = int(os.environ.get('OMP_NUM_THREADS', '').split(',')[0])
+    except ValueError:
+        n_threads = 0
+    return n_threads if n_threads > 0 else multiprocessing.cpu_count()
+
+
+cdef int _n_threads = _get_default_threads()
+
+
+def set_num_threads(n_threads=None):
+
+    """Sets the number of threads of the batched kernels (None: all cores)."""
+
+    global _n_threads
+    if n_threads is None:
+        n_threads = multiprocessing.cpu_count()
+    if n_threads < 1:
+        raise ValueError('n_threads must be positive')
+    _n_threads = n_threads
+
+
+def get_num_threads():
+
+    """Returns the number of threads of the batched kernels."""
+
+    return _n_threads
+
+
+cdef inline Py_ssize_t _get_n_chunks(Py_ssize_t n_items) nogil:
+    return (n_items + _CHUNK_SIZE - 1) / _CHUNK_SIZE
+
+
+cdef inline int _get_n_threads(Py_ssize_t n_chunks) nogil:
+    if n_chunks < _n_threads:
+        return n_chunks if n_chunks > 0 else 1
+    return _n_threads
 
 
 ###############################################################################
@@ -35,11 +100,12 @@ from numpy cimport ndarray
 ###############################################################################
 
 @cython.boundscheck(False)
+@cython.wraparound(False)
 @cython.cdivision(True)
 def get_index(
     double u,
     int deg,
-    ndarray[double] knots,
+    const double[:] knots,
     ):
 
     """Determine the knot span index."""
@@ -48,11 +114,13 @@ def get_index(
         int low, high, mid, n
 
     # number of control points
-    n = knots.size - deg - 1
+    n = knots.shape[0] - deg - 1
 
-    # handle special case
-    if u == knots[n]:
+    # handle special cases (parameters outside the domain are clamped)
+    if u >= knots[n]:
         return n - 1
+    if u < knots[deg]:
+        return deg
 
     # do binary search
     low, high = deg, n
@@ -67,13 +135,14 @@ def get_index(
 
 
 @cython.boundscheck(False)
+@cython.wraparound(False)
 @cython.cdivision(True)
 def calc_basis_funs(
     int index,
     double u,
     int deg,
-    ndarray[double] konts,
-    ndarray[double] basis_funs,
+    const double[:] knots,
+    double[:] basis_funs,
     ):
 
     """Computes the nonvanishing basis functions."""
@@ -81,14 +150,24 @@ def calc_basis_funs(
     cdef:
         int i, j
         double saved, temp
-        double *left = <double *> malloc((deg + 1) * cython.sizeof(double))
-        double *right = <double *> malloc((deg + 1) * cython.sizeof(double))
+        double left_buffer[_MAX_DEG + 1]
+        double right_buffer[_MAX_DEG + 1]
+        double *left = left_buffer
+        double *right = right_buffer
+
+    if deg > _MAX_DEG:
+        left = <double *> malloc((deg + 1) * cython.sizeof(double))
+        right = <double *> malloc((deg + 1) * cython.sizeof(double))
+        if left == NULL or right == NULL:
+            free(left)
+            free(right)
+            raise MemoryError()
 
     # calculate basis functions
     basis_funs[0] = 1
     for i in xrange(1, deg + 1):
-        left[i] = u - konts[index + 1 - i]
-        right[i] = konts[index + i] - u
+        left[i] = u - knots[index + 1 - i]
+        right[i] = knots[index + i] - u
         saved = 0
         for j in xrange(i):
             temp = basis_funs[j] / (right[j + 1] + left[i - j])
@@ -97,5 +176,921 @@ def calc_basis_funs(
         basis_funs[i] = saved
 
     # release memory
+    if deg > _MAX_DEG:
+        free(left)
+        free(right)
+
+
+###############################################################################
+# c functions
+###############################################################################
+
+@cython.boundscheck(False)
+@cython.cdivision(True)
+cdef inline int _get_index(
+    double u,
+    int deg,
+    int n,
+    const double *knots,
+    ) nogil:
+
+    cdef:
+        int low, high, mid
+
+    # handle special cases (parameters outside the domain are clamped)
+    if u >= knots[n]:
+        return n - 1
+    if u < knots[deg]:
+        return deg
+
+    # do binary search
+    low, high = deg, n
+    mid = (low + high) / 2
+    while u < knots[mid] or u >= knots[mid + 1]:
+        if u < knots[mid]:
+            high = mid
+        else:
+            low = mid
+        mid = (low + high) / 2
+    return mid
+
+
+cdef inline int _next_index(
+    double u,
+    int index,
+    int deg,
+    int n,
+    const double *knots,
+    ) nogil:
+
+    cdef:
+        int k
+
+    # walk on from the span of the previous parameter, which is O(1) for
+    # sorted parameters; fall back to a binary search for jumps
+    if u >= knots[index]:
+        for k in xrange(8):
+            if index >= n - 1 or u < knots[index + 1]:
+                return index
+            index += 1
+    return _get_index(u, deg, n, knots)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _get_indices(
+    Py_ssize_t start,
+    Py_ssize_t end,
+    const double[:] us,
+    int deg,
+    int n,
+    const double *knots,
+    int[:] indices,
+    ) nogil:
+
+    cdef:
+        Py_ssize_t i
+        int index = deg
+
+    for i in xrange(start, end):
+        index = _next_index(us[i], index, deg, n, knots)
+        indices[i] = index
+
+
+@cython.boundscheck(False)
+@cython.cdivision(True)
+cdef inline void _calc_basis_funs(
+    int index,
+    double u,
+    int deg,
+    const double *knots,
+    double *basis_funs,
+    double *left,
+    double *right,
+    ) nogil:
+
+    cdef:
+        int i, j
+        double saved, temp
+
+    basis_funs[0] = 1
+    for i in xrange(1, deg + 1):
+        left[i] = u - knots[index + 1 - i]
+        right[i] = knots[index + i] - u
+        saved = 0
+        for j in xrange(i):
+            temp = basis_funs[j] / (right[j + 1] + left[i - j])
+            basis_funs[j] = saved + right[j + 1] * temp
+            saved = left[i - j] * temp
+        basis_funs[i] = saved
+
+
+@cython.boundscheck(False)
+@cython.cdivision(True)
+cdef void _calc_ders_basis_funs(
+    int index,
+    double u,
+    int deg,
+    int n_ders,
+    const double *knots,
+    double *ders,
+    double *ndu,
+    double *a,
+    double *left,
+    double *right,
+    ) nogil:
+
+    cdef:
+        int i, j, k, r, s1, s2, rk, pk, j1, j2, n, m
+        double saved, temp, d
+
+    # rows of ndu and ders are (deg + 1) wide, a is a (2, deg + 1) array
+    m = deg + 1
+    n = n_ders if n_ders < deg else deg
+
+    # basis functions and knot differences
+    ndu[0] = 1
+    for j in xrange(1, deg + 1):
+        left[j] = u - knots[index + 1 - j]
+        right[j] = knots[index + j] - u
+        saved = 0
+        for r in xrange(j):
+            ndu[j * m + r] = right[r + 1] + left[j - r]
+            temp = ndu[r * m + j - 1] / ndu[j * m + r]
+            ndu[r * m + j] = saved + right[r + 1] * temp
+            saved = left[j - r] * temp
+        ndu[j * m + j] = saved
+
+    for j in xrange(deg + 1):
+        ders[j] = ndu[j * m + deg]
+
+    # derivatives (vanish above the degree)
+    for k in xrange(n + 1, n_ders + 1):
+        for j in xrange(deg + 1):
+            ders[k * m + j] = 0
+
+    for r in xrange(deg + 1):
+        s1, s2 = 0, 1
+        a[0] = 1
+        for k in xrange(1, n + 1):
+            d = 0
+            rk, pk = r - k, deg - k
+            if r >= k:
+                a[s2 * m] = a[s1 * m] / ndu[(pk + 1) * m + rk]
+                d = a[s2 * m] * ndu[rk * m + pk]
+            j1 = 1 if rk >= -1 else -rk
+            j2 = k - 1 if r - 1 <= pk else deg - r
+            for j in xrange(j1, j2 + 1):
+                a[s2 * m + j] = (a[s1 * m + j] - a[s1 * m + j - 1]) / \
+                    ndu[(pk + 1) * m + rk + j]
+                d += a[s2 * m + j] * ndu[(rk + j) * m + pk]
+            if r <= pk:
+                a[s2 * m + k] = -a[s1 * m + k - 1] / ndu[(pk + 1) * m + r]
+                d += a[s2 * m + k] * ndu[r * m + pk]
+            ders[k * m + r] = d
+            s1, s2 = s2, s1
+
+    # multiply through by the correct factors
+    r = deg
+    for k in xrange(1, n + 1):
+        for j in xrange(deg + 1):
+            ders[k * m + j] *= r
+        r *= deg - k
+
+
+@cython.boundscheck(False)
+cdef inline void _contract_curve(
+    int lb,
+    int deg,
+    int dim,
+    const floating *ctrl_pnts,
+    const double *basis_funs,
+    floating *out,
+    ) nogil:
+
+    cdef:
+        int j, k
+
+    # same summation order as Curve.evaluate_at
+    for k in xrange(dim):
+        out[k] = ctrl_pnts[lb * dim + k] * basis_funs[0]
+    for j in xrange(1, deg + 1):
+        for k in xrange(dim):
+            out[k] += ctrl_pnts[(lb + j) * dim + k] * basis_funs[j]
+
+
+@cython.boundscheck(False)
+cdef inline void _contract_surface(
+    int lb_u,
+    int lb_v,
+    int deg_u,
+    int deg_v,
+    int n_v,
+    int dim,
+    const floating *ctrl_pnts,
+    const double *basis_funs_u,
+    const double *basis_funs_v,
+    double *tmp,
+    floating *out,
+    ) nogil:
+
+    cdef:
+        int j, k, l
+        const floating *row
+
+    # contract u-direction first (same order as Surface.evaluate_at)
+    for l in xrange(deg_v + 1):
+        row = ctrl_pnts + (lb_u * n_v + lb_v + l) * dim
+        for k in xrange(dim):
+            tmp[l * dim + k] = row[k] * basis_funs_u[0]
+        for j in xrange(1, deg_u + 1):
+            row = ctrl_pnts + ((lb_u + j) * n_v + lb_v + l) * dim
+            for k in xrange(dim):
+                tmp[l * dim + k] += row[k] * basis_funs_u[j]
+
+    # contract v-direction
+    for k in xrange(dim):
+        out[k] = tmp[k] * basis_funs_v[0]
+    for l in xrange(1, deg_v + 1):
+        for k in xrange(dim):
+            out[k] += tmp[l * dim + k] * basis_funs_v[l]
+
+
+@cython.cdivision(True)
+cdef inline void _project(
+    int dim,
+    const floating *h_pnt,
+    floating *out,
+    ) nogil:
+
+    cdef:
+        int k
+
+    # same division as foundation.get_cartesian_points
+    for k in xrange(dim - 1):
+        out[k] = h_pnt[k] / h_pnt[dim - 1]
+
+
+###############################################################################
+# chunks of the batch functions
+###############################################################################
+
+# the chunks allocate their own buffers and return 1 if that fails, the
+# batch functions count the failures and raise MemoryError afterwards
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _calc_basis_funs_chunk(
+    Py_ssize_t start,
+    Py_ssize_t end,
+    const double[:] us,
+    int deg,
+    int n,
+    const double *knots,
+    int[:] indices,
+    double[:, ::1] basis_funs,
+    ) nogil:
+
+    cdef:
+        Py_ssize_t i
+        int index = deg
+        double *left = <double *> malloc(2 * (deg + 1) * sizeof(double))
+        double *right = left + deg + 1
+
+    if left == NULL:
+        return 1
+    for i in xrange(start, end):
+        index = _next_index(us[i], index, deg, n, knots)
+        indices[i] = index
+        _calc_basis_funs(index, us[i], deg, knots, &basis_funs[i, 0], left,
+                         right)
     free(left)
-    free(right)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _calc_ders_basis_funs_chunk(
+    Py_ssize_t start,
+    Py_ssize_t end,
+    const double[:] us,
+    int deg,
+    int n_ders,
+    int n,
+    const double *knots,
+    int[:] indices,
+    double[:, :, ::1] ders,
+    ) nogil:
+
+    cdef:
+        Py_ssize_t i
+        int index = deg
+        int m = deg + 1
+        double *ndu = <double *> malloc((m * m + 4 * m) * sizeof(double))
+        double *a = ndu + m * m
+        double *left = a + 2 * m
+        double *right = left + m
+
+    if ndu == NULL:
+        return 1
+    for i in xrange(start, end):
+        index = _next_index(us[i], index, deg, n, knots)
+        indices[i] = index
+        _calc_ders_basis_funs(index, us[i], deg, n_ders, knots,
+                              &ders[i, 0, 0], ndu, a, left, right)
+    free(ndu)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _evaluate_curve_chunk(
+    Py_ssize_t start,
+    Py_ssize_t end,
+    const double[:] us,
+    int deg,
+    int n,
+    const double *knots,
+    int dim,
+    const floating *ctrl_pnts,
+    bint cartesian,
+    floating[:, ::1] out,
+    ) nogil:
+
+    cdef:
+        Py_ssize_t i
+        int index = deg
+        double *basis_funs = <double *> malloc(3 * (deg + 1) * sizeof(double))
+        double *left = basis_funs + deg + 1
+        double *right = left + deg + 1
+        floating *h_pnt = <floating *> malloc(dim * sizeof(floating))
+
+    if basis_funs == NULL or h_pnt == NULL:
+        free(basis_funs)
+        free(h_pnt)
+        return 1
+    for i in xrange(start, end):
+        index = _next_index(us[i], index, deg, n, knots)
+        _calc_basis_funs(index, us[i], deg, knots, basis_funs, left, right)
+        if cartesian:
+            _contract_curve(index - deg, deg, dim, ctrl_pnts, basis_funs,
+                            h_pnt)
+            _project(dim, h_pnt, &out[i, 0])
+        else:
+            _contract_curve(index - deg, deg, dim, ctrl_pnts, basis_funs,
+                            &out[i, 0])
+    free(basis_funs)
+    free(h_pnt)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _evaluate_surface_chunk(
+    Py_ssize_t start,
+    Py_ssize_t end,
+    const double[:] us,
+    const double[:] vs,
+    int deg_u,
+    int deg_v,
+    int n_u,
+    int n_v,
+    const double *knots_u,
+    const double *knots_v,
+    int row_length,
+    int dim,
+    const floating *ctrl_pnts,
+    bint cartesian,
+    floating[:, ::1] out,
+    ) nogil:
+
+    cdef:
+        Py_ssize_t i
+        int index_u = deg_u
+        int index_v = deg_v
+        int m = (deg_u if deg_u > deg_v else deg_v) + 1
+        double *basis_funs_u = <double *> malloc(
+            (deg_u + deg_v + 2 + 2 * m + (deg_v + 1) * dim) * sizeof(double))
+        double *basis_funs_v = basis_funs_u + deg_u + 1
+        double *left = basis_funs_v + deg_v + 1
+        double *right = left + m
+        double *tmp = right + m
+        floating *h_pnt = <floating *> malloc(dim * sizeof(floating))
+
+    if basis_funs_u == NULL or h_pnt == NULL:
+        free(basis_funs_u)
+        free(h_pnt)
+        return 1
+    for i in xrange(start, end):
+        index_u = _next_index(us[i], index_u, deg_u, n_u, knots_u)
+        _calc_basis_funs(
+            index_u, us[i], deg_u, knots_u, basis_funs_u, left, right)
+        index_v = _next_index(vs[i], index_v, deg_v, n_v, knots_v)
+        _calc_basis_funs(
+            index_v, vs[i], deg_v, knots_v, basis_funs_v, left, right)
+        if cartesian:
+            _contract_surface(index_u - deg_u, index_v - deg_v, deg_u, deg_v,
+                              row_length, dim, ctrl_pnts, basis_funs_u,
+                              basis_funs_v, tmp, h_pnt)
+            _project(dim, h_pnt, &out[i, 0])
+        else:
+            _contract_surface(index_u - deg_u, index_v - deg_v, deg_u, deg_v,
+                              row_length, dim, ctrl_pnts, basis_funs_u,
+                              basis_funs_v, tmp, &out[i, 0])
+    free(basis_funs_u)
+    free(h_pnt)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _contract_curve_chunk(
+    Py_ssize_t start,
+    Py_ssize_t end,
+    const int[:] indices,
+    const double[:, ::1] basis_funs,
+    int deg,
+    int dim,
+    const floating *ctrl_pnts,
+    bint cartesian,
+    floating[:, ::1] out,
+    ) nogil:
+
+    cdef:
+        Py_ssize_t i
+        floating *h_pnt = <floating *> malloc(dim * sizeof(floating))
+
+    if h_pnt == NULL:
+        return 1
+    for i in xrange(start, end):
+        if cartesian:
+            _contract_curve(indices[i] - deg, deg, dim, ctrl_pnts,
+                            &basis_funs[i, 0], h_pnt)
+            _project(dim, h_pnt, &out[i, 0])
+        else:
+            _contract_curve(indices[i] - deg, deg, dim, ctrl_pnts,
+                            &basis_funs[i, 0], &out[i, 0])
+    free(h_pnt)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _contract_surface_chunk(
+    Py_ssize_t start,
+    Py_ssize_t end,
+    const int[:] indices_u,
+    const double[:, ::1] basis_funs_u,
+    const int[:] indices_v,
+    const double[:, ::1] basis_funs_v,
+    int deg_u,
+    int deg_v,
+    int row_length,
+    int dim,
+    const floating *ctrl_pnts,
+    bint cartesian,
+    floating[:, ::1] out,
+    ) nogil:
+
+    cdef:
+        Py_ssize_t i
+        double *tmp = <double *> malloc((deg_v + 1) * dim * sizeof(double))
+        floating *h_pnt = <floating *> malloc(dim * sizeof(floating))
+
+    if tmp == NULL or h_pnt == NULL:
+        free(tmp)
+        free(h_pnt)
+        return 1
+    for i in xrange(start, end):
+        if cartesian:
+            _contract_surface(indices_u[i] - deg_u, indices_v[i] - deg_v,
+                              deg_u, deg_v, row_length, dim, ctrl_pnts,
+                              &basis_funs_u[i, 0], &basis_funs_v[i, 0], tmp,
+                              h_pnt)
+            _project(dim, h_pnt, &out[i, 0])
+        else:
+            _contract_surface(indices_u[i] - deg_u, indices_v[i] - deg_v,
+                              deg_u, deg_v, row_length, dim, ctrl_pnts,
+                              &basis_funs_u[i, 0], &basis_funs_v[i, 0], tmp,
+                              &out[i, 0])
+    free(tmp)
+    free(h_pnt)
+    return 0
+
+
+###############################################################################
+# batch functions
+###############################################################################
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def get_indices(
+    const double[:] us,
+    int deg,
+    const double[::1] knots,
+    int[:] indices,
+    ):
+
+    """Determine the knot span indices of many parameters."""
+
+    cdef:
+        Py_ssize_t c, n_items, n_chunks
+        int n, n_threads
+
+    if indices.shape[0] != us.shape[0]:
+        raise ValueError('indices has the wrong shape')
+
+    n = knots.shape[0] - deg - 1
+    n_items = us.shape[0]
+    n_chunks = _get_n_chunks(n_items)
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        _get_indices(c * _CHUNK_SIZE, min((c + 1) * _CHUNK_SIZE, n_items),
+                     us, deg, n, &knots[0], indices)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def evaluate_curve(
+    const double[:] us,
+    int deg,
+    const double[::1] knots,
+    const floating[:, ::1] ctrl_pnts,
+    floating[:, ::1] out,
+    bint cartesian=False,
+    ):
+
+    """Evaluates a curve at many parameters (see algorithm A4.1)."""
+
+    cdef:
+        Py_ssize_t c, n_items, n_chunks, n_failed = 0
+        int n, dim, n_threads
+
+    # number of control points and dimension of the homogeneous space
+    n = knots.shape[0] - deg - 1
+    dim = ctrl_pnts.shape[1]
+    if out.shape[0] != us.shape[0] or out.shape[1] != dim - cartesian:
+        raise ValueError('out has the wrong shape')
+
+    n_items = us.shape[0]
+    n_chunks = _get_n_chunks(n_items)
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        n_failed += _evaluate_curve_chunk(
+            c * _CHUNK_SIZE, min((c + 1) * _CHUNK_SIZE, n_items), us, deg, n,
+            &knots[0], dim, &ctrl_pnts[0, 0], cartesian, out)
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def evaluate_surface(
+    const double[:] us,
+    const double[:] vs,
+    int deg_u,
+    int deg_v,
+    const double[::1] knots_u,
+    const double[::1] knots_v,
+    const floating[:, :, ::1] ctrl_pnts,
+    floating[:, ::1] out,
+    bint cartesian=False,
+    ):
+
+    """Evaluates a surface at many parameter pairs (see algorithm A4.3)."""
+
+    cdef:
+        Py_ssize_t c, n_items, n_chunks, n_failed = 0
+        int n_u, n_v, dim, n_threads
+
+    # number of control points and dimension of the homogeneous space
+    n_u = knots_u.shape[0] - deg_u - 1
+    n_v = knots_v.shape[0] - deg_v - 1
+    dim = ctrl_pnts.shape[2]
+    if vs.shape[0] != us.shape[0]:
+        raise ValueError('us and vs must have the same length')
+    if out.shape[0] != us.shape[0] or out.shape[1] != dim - cartesian:
+        raise ValueError('out has the wrong shape')
+
+    n_items = us.shape[0]
+    n_chunks = _get_n_chunks(n_items)
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        n_failed += _evaluate_surface_chunk(
+            c * _CHUNK_SIZE, min((c + 1) * _CHUNK_SIZE, n_items), us, vs,
+            deg_u, deg_v, n_u, n_v, &knots_u[0], &knots_v[0], n_v, dim,
+            &ctrl_pnts[0, 0, 0], cartesian, out)
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def contract_curve(
+    const int[:] indices,
+    const double[:, ::1] basis_funs,
+    const floating[:, ::1] ctrl_pnts,
+    floating[:, ::1] out,
+    bint cartesian=False,
+    ):
+
+    """Contracts precomputed basis functions with the control points."""
+
+    cdef:
+        Py_ssize_t c, n_items, n_chunks, n_failed = 0
+        int deg, dim, n_threads
+
+    deg = basis_funs.shape[1] - 1
+    dim = ctrl_pnts.shape[1]
+    if basis_funs.shape[0] != indices.shape[0]:
+        raise ValueError('basis_funs has the wrong shape')
+    if out.shape[0] != indices.shape[0] or out.shape[1] != dim - cartesian:
+        raise ValueError('out has the wrong shape')
+
+    n_items = indices.shape[0]
+    n_chunks = _get_n_chunks(n_items)
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        n_failed += _contract_curve_chunk(
+            c * _CHUNK_SIZE, min((c + 1) * _CHUNK_SIZE, n_items), indices,
+            basis_funs, deg, dim, &ctrl_pnts[0, 0], cartesian, out)
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def contract_surface(
+    const int[:] indices_u,
+    const double[:, ::1] basis_funs_u,
+    const int[:] indices_v,
+    const double[:, ::1] basis_funs_v,
+    const floating[:, :, ::1] ctrl_pnts,
+    floating[:, ::1] out,
+    bint cartesian=False,
+    ):
+
+    """Contracts precomputed basis functions with the control net."""
+
+    cdef:
+        Py_ssize_t c, n_items, n_chunks, n_failed = 0
+        int deg_u, deg_v, dim, n_threads
+
+    deg_u = basis_funs_u.shape[1] - 1
+    deg_v = basis_funs_v.shape[1] - 1
+    dim = ctrl_pnts.shape[2]
+    if indices_v.shape[0] != indices_u.shape[0]:
+        raise ValueError('indices_u and indices_v must have the same length')
+    if basis_funs_u.shape[0] != indices_u.shape[0] or \
+            basis_funs_v.shape[0] != indices_v.shape[0]:
+        raise ValueError('basis_funs has the wrong shape')
+    if out.shape[0] != indices_u.shape[0] or \
+            out.shape[1] != dim - cartesian:
+        raise ValueError('out has the wrong shape')
+
+    n_items = indices_u.shape[0]
+    n_chunks = _get_n_chunks(n_items)
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        n_failed += _contract_surface_chunk(
+            c * _CHUNK_SIZE, min((c + 1) * _CHUNK_SIZE, n_items), indices_u,
+            basis_funs_u, indices_v, basis_funs_v, deg_u, deg_v,
+            ctrl_pnts.shape[1], dim, &ctrl_pnts[0, 0, 0], cartesian, out)
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def calc_basis_funs_many(
+    const double[:] us,
+    int deg,
+    const double[::1] knots,
+    int[:] indices,
+    double[:, ::1] basis_funs,
+    ):
+
+    """Determines the knot span indices and nonvanishing basis functions."""
+
+    cdef:
+        Py_ssize_t c, n_items, n_chunks, n_failed = 0
+        int n, n_threads
+
+    # number of control points
+    n = knots.shape[0] - deg - 1
+    if indices.shape[0] != us.shape[0]:
+        raise ValueError('indices has the wrong shape')
+    if basis_funs.shape[0] != us.shape[0] or basis_funs.shape[1] != deg + 1:
+        raise ValueError('basis_funs has the wrong shape')
+
+    n_items = us.shape[0]
+    n_chunks = _get_n_chunks(n_items)
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        n_failed += _calc_basis_funs_chunk(
+            c * _CHUNK_SIZE, min((c + 1) * _CHUNK_SIZE, n_items), us, deg, n,
+            &knots[0], indices, basis_funs)
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def calc_ders_basis_funs_many(
+    const double[:] us,
+    int deg,
+    int n_ders,
+    const double[::1] knots,
+    int[:] indices,
+    double[:, :, ::1] ders,
+    ):
+
+    """Computes the nonvanishing basis functions and their derivatives."""
+
+    cdef:
+        Py_ssize_t c, n_items, n_chunks, n_failed = 0
+        int n, n_threads
+
+    # number of control points
+    n = knots.shape[0] - deg - 1
+    if indices.shape[0] != us.shape[0]:
+        raise ValueError('indices has the wrong shape')
+    if ders.shape[0] != us.shape[0] or ders.shape[1] != n_ders + 1 or \
+            ders.shape[2] != deg + 1:
+        raise ValueError('ders has the wrong shape')
+
+    n_items = us.shape[0]
+    n_chunks = _get_n_chunks(n_items)
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        n_failed += _calc_ders_basis_funs_chunk(
+            c * _CHUNK_SIZE, min((c + 1) * _CHUNK_SIZE, n_items), us, deg,
+            n_ders, n, &knots[0], indices, ders)
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def evaluate_curve_batch(
+    const double[:, :] us,
+    int deg,
+    const double[:, ::1] knots,
+    const int[:] counts,
+    const floating[:, :, ::1] ctrl_pnts,
+    floating[:, :, ::1] out,
+    bint cartesian=False,
+    ):
+
+    """Evaluates many curves of the same degree at many parameters."""
+
+    cdef:
+        Py_ssize_t b, c, n_items, n_chunks, n_curve_chunks, n_failed = 0
+        int dim, n_threads
+
+    dim = ctrl_pnts.shape[2]
+    if knots.shape[0] != us.shape[0] or counts.shape[0] != us.shape[0] or \
+            ctrl_pnts.shape[0] != us.shape[0]:
+        raise ValueError('all arrays must have the same batch size')
+    if out.shape[0] != us.shape[0] or out.shape[1] != us.shape[1] or \
+            out.shape[2] != dim - cartesian:
+        raise ValueError('out has the wrong shape')
+    for b in xrange(us.shape[0]):
+        if counts[b] > ctrl_pnts.shape[1] or \
+                counts[b] + deg + 1 > knots.shape[1]:
+            raise ValueError('counts exceed the padded arrays')
+
+    # chunks of all curves are scheduled together
+    n_items = us.shape[1]
+    n_curve_chunks = _get_n_chunks(n_items)
+    n_chunks = us.shape[0] * n_curve_chunks
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        b = c / n_curve_chunks
+        n_failed += _evaluate_curve_chunk(
+            (c % n_curve_chunks) * _CHUNK_SIZE,
+            min((c % n_curve_chunks + 1) * _CHUNK_SIZE, n_items), us[b], deg,
+            counts[b], &knots[b, 0], dim, &ctrl_pnts[b, 0, 0], cartesian,
+            out[b])
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def evaluate_surface_batch(
+    const double[:, :] us,
+    const double[:, :] vs,
+    int deg_u,
+    int deg_v,
+    const double[:, ::1] knots_u,
+    const double[:, ::1] knots_v,
+    const int[:, :] counts,
+    const floating[:, :, :, ::1] ctrl_pnts,
+    floating[:, :, ::1] out,
+    bint cartesian=False,
+    ):
+
+    """Evaluates many surfaces of the same degrees at many parameters."""
+
+    cdef:
+        Py_ssize_t b, c, n_items, n_chunks, n_surface_chunks
+        Py_ssize_t n_failed = 0
+        int dim, n_v, n_threads
+
+    n_v, dim = ctrl_pnts.shape[2], ctrl_pnts.shape[3]
+    if vs.shape[0] != us.shape[0] or vs.shape[1] != us.shape[1]:
+        raise ValueError('us and vs must have the same shape')
+    if knots_u.shape[0] != us.shape[0] or knots_v.shape[0] != us.shape[0] \
+            or counts.shape[0] != us.shape[0] or \
+            ctrl_pnts.shape[0] != us.shape[0]:
+        raise ValueError('all arrays must have the same batch size')
+    if out.shape[0] != us.shape[0] or out.shape[1] != us.shape[1] or \
+            out.shape[2] != dim - cartesian:
+        raise ValueError('out has the wrong shape')
+    for b in xrange(us.shape[0]):
+        if counts[b, 0] > ctrl_pnts.shape[1] or counts[b, 1] > n_v or \
+                counts[b, 0] + deg_u + 1 > knots_u.shape[1] or \
+                counts[b, 1] + deg_v + 1 > knots_v.shape[1]:
+            raise ValueError('counts exceed the padded arrays')
+
+    # chunks of all surfaces are scheduled together; the padded control
+    # nets keep the row length n_v
+    n_items = us.shape[1]
+    n_surface_chunks = _get_n_chunks(n_items)
+    n_chunks = us.shape[0] * n_surface_chunks
+    n_threads = _get_n_threads(n_chunks)
+    for c in prange(n_chunks, nogil=True, num_threads=n_threads,
+                    schedule='dynamic'):
+        b = c / n_surface_chunks
+        n_failed += _evaluate_surface_chunk(
+            (c % n_surface_chunks) * _CHUNK_SIZE,
+            min((c % n_surface_chunks + 1) * _CHUNK_SIZE, n_items), us[b],
+            vs[b], deg_u, deg_v, counts[b, 0], counts[b, 1], &knots_u[b, 0],
+            &knots_v[b, 0], n_v, dim, &ctrl_pnts[b, 0, 0, 0], cartesian,
+            out[b])
+    if n_failed:
+        raise MemoryError()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def solve_banded(
+    int l,
+    int u,
+    double[:, ::1] ab,
+    double[:, ::1] rhs,
+    ):
+
+    """Solves a banded system in place by elimination without pivoting."""
+
+    cdef:
+        int i, j, k, d, n, dim
+        double pivot, factor
+
+    # element a[i, j] of the matrix is stored in ab[u + i - j, j]
+    n, dim = ab.shape[1], rhs.shape[1]
+    if ab.shape[0] != l + u + 1:
+        raise ValueError('ab must have l + u + 1 rows')
+    if rhs.shape[0] != n:
+        raise ValueError('rhs must have as many rows as the matrix')
+
+    # forward elimination, the band doesn't fill in without pivoting
+    for k in xrange(n):
+        pivot = ab[u, k]
+        if pivot == 0:
+            raise ValueError('singular matrix')
+        for i in xrange(k + 1, min(k + l + 1, n)):
+            factor = ab[u + i - k, k] / pivot
+            if factor == 0:
+                continue
+            for j in xrange(k + 1, min(k + u + 1, n)):
+                ab[u + i - j, j] -= factor * ab[u + k - j, j]
+            for d in xrange(dim):
+                rhs[i, d] -= factor * rhs[k, d]
+
+    # back substitution
+    for k in xrange(n - 1, -1, -1):
+        for j in xrange(k + 1, min(k + u + 1, n)):
+            for d in xrange(dim):
+                rhs[k, d] -= ab[u + k - j, j] * rhs[j, d]
+        for d in xrange(dim):
+            rhs[k, d] /= ab[u, k]
@@ -0,0 +1,508 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import bvh
+import foundation as fdn
+
+
+def split_bezier(coeffs, axis):
+
+    # de Casteljau subdivision at the parameter 1/2 along axis, which is
+    # swapped with the last axis and back
+    coeffs = coeffs.swapaxes(axis, -1)
+    deg = coeffs.shape[-1] - 1
+    left, right = np.empty_like(coeffs), np.empty_like(coeffs)
+    tmp = coeffs.copy()
+    left[..., 0], right[..., deg] = tmp[..., 0], tmp[..., deg]
+    for k in xrange(1, deg + 1):
+        tmp[..., :deg - k + 1] = .5 * (tmp[..., :deg - k + 1] +
+                                       tmp[..., 1:deg - k + 2])
+        left[..., k], right[..., deg - k] = tmp[..., 0], tmp[..., deg - k]
+    return left.swapaxes(axis, -1), right.swapaxes(axis, -1)
+
+
+def _straddles(coeffs, axes):
+
+    # the zero set of a Bezier function lies in the convex hull of its
+    # coefficients, the last axis holds independent functions
+    lows, highs = coeffs.min(axes), coeffs.max(axes)
+    return np.all((lows <= 0) & (highs >= 0), -1)
+
+
+def subdivide(coeffs, ranges, owners, n_levels):
+
+    # coeffs: (K, deg_0 + 1, ..., n_funs) Bezier coefficients of functions
+    # with a common zero over one or two parameters, ranges: (K, 2) or (K, 4)
+    # parameter intervals; splits the parameters in turn and keeps the
+    # pieces that may contain a common zero of all functions
+    n_params = ranges.shape[1] // 2
+    axes = tuple(xrange(1, n_params + 1))
+    keep = _straddles(coeffs, axes)
+    coeffs, ranges, owners = coeffs[keep], ranges[keep], owners[keep]
+    for level in xrange(n_params * n_levels):
+        axis = 1 + level % n_params
+        lb, ub = 2 * axis - 2, 2 * axis - 1
+        left, right = split_bezier(coeffs, axis)
+        mids = .5 * (ranges[:, lb] + ranges[:, ub])
+        left_ranges, right_ranges = ranges.copy(), ranges.copy()
+        left_ranges[:, ub], right_ranges[:, lb] = mids, mids
+
+        coeffs = np.concatenate((left, right))
+        ranges = np.concatenate((left_ranges, right_ranges))
+        owners = np.concatenate((owners, owners))
+        keep = _straddles(coeffs, axes)
+        coeffs, ranges, owners = coeffs[keep], ranges[keep], owners[keep]
+    return ranges, owners
+
+
+def get_ray_planes(origins, dirs):
+
+    # every ray is the intersection of two orthogonal planes n * x = d
+    axes = np.identity(3)[np.argmin(np.abs(dirs), 1)]
+    normals_0 = np.cross(dirs, axes)
+    normals_0 /= np.sqrt(np.sum(normals_0**2, -1))[:, None]
+    normals_1 = np.cross(dirs, normals_0)
+    normals_1 /= np.sqrt(np.sum(normals_1**2, -1))[:, None]
+    normals = np.stack((normals_0, normals_1), 1)
+    return normals, np.einsum('rkd,rd->rk', normals, origins)
+
+
+def _get_domain(surface):
+    deg_u, deg_v = surface.deg_u, surface.deg_v
+    return (surface.knots_u[deg_u], surface.knots_u[-deg_u - 1],
+            surface.knots_v[deg_v], surface.knots_v[-deg_v - 1])
+
+
+def intersect_rays(surface, origins, dirs, n_levels=4, tol=1e-10,
+                   max_iter=16):
+
+    # nearest hit of every ray: params (N, 2), points (N, 3) and distances
+    # along the rays (N,), NaN and inf for rays that miss the surface
+    origins = np.atleast_2d(np.asarray(origins, dtype=np.double))
+    dirs = np.atleast_2d(np.asarray(dirs, dtype=np.double))
+    normals, offsets = get_ray_planes(origins, dirs)
+
+    # cull Bezier patches with their bounding boxes
+    patches, bp_u, bp_v = surface.decompose()
+    tree = bvh.BoundingVolumeHierarchy(*bvh.get_patch_boxes(surface)[:2])
+    rays, leaves, _ = tree.query_rays(origins, dirs)
+    ranges = np.empty(patches.shape[:2] + (4,))
+    ranges[..., 0], ranges[..., 1] = bp_u[:-1, None], bp_u[1:, None]
+    ranges[..., 2], ranges[..., 3] = bp_v[:-1], bp_v[1:]
+    ranges = ranges.reshape(-1, 4)[leaves]
+    patches = patches.reshape((-1,) + patches.shape[2:])
+
+    # signed distances to both planes of the ray as Bezier coefficients
+    coeffs = np.einsum('kijd,kld->kijl', patches[leaves, ..., :-1],
+                       normals[rays]) - \
+        patches[leaves, ..., -1:] * offsets[rays, None, None]
+    ranges, rays = subdivide(coeffs, ranges, rays, n_levels)
+
+    # Newton iteration from the centers of the remaining sub-patches
+    params = np.column_stack((ranges[:, :2].mean(1), ranges[:, 2:].mean(1)))
+    params, pnts, is_converged = _newton(
+        surface, params, normals[rays], offsets[rays], tol, max_iter)
+
+    # keep the nearest converged hit in front of every ray
+    ts = np.einsum('kd,kd->k', pnts - origins[rays], dirs[rays]) / \
+        np.einsum('kd,kd->k', dirs[rays], dirs[rays])
+    is_hit = is_converged & (ts >= -tol)
+    rays, params, pnts, ts = rays[is_hit], params[is_hit], pnts[is_hit], \
+        ts[is_hit]
+    order = np.lexsort((ts, rays))
+    first = order[np.diff(np.append(-1, rays[order])) > 0]
+
+    hit_params = np.full((len(origins), 2), np.nan)
+    hit_pnts = np.full((len(origins), 3), np.nan)
+    hit_ts = np.full(len(origins), np.inf)
+    hit_params[rays[first]] = params[first]
+    hit_pnts[rays[first]] = pnts[first]
+    hit_ts[rays[first]] = ts[first]
+    return hit_params, hit_pnts, hit_ts
+
+
+def _newton(surface, params, normals, offsets, tol, max_iter):
+
+    # solves n_k * S(u, v) = d_k for two planes per parameter pair, only
+    # pairs that haven't converged yet are iterated
+    u0, u1, v0, v1 = _get_domain(surface)
+    scale = max(1., np.max(np.abs(offsets))) if len(offsets) else 1.
+    params = params.copy()
+    pnts = np.empty((len(params), 3))
+    is_converged = np.zeros(len(params), dtype=bool)
+    active = np.arange(len(params))
+    for i in xrange(max_iter + 1):
+        ders = surface.derivatives_many(params[active, 0], params[active, 1],
+                                        1, cartesian=True, dtype=np.double)
+        pnts[active] = ders[:, 0, 0]
+        residuals = np.einsum('kld,kd->kl', normals[active],
+                              ders[:, 0, 0]) - offsets[active]
+        is_converged[active] = np.all(np.abs(residuals) <= tol * scale, 1)
+        mask = ~is_converged[active]
+        if i == max_iter or not np.any(mask):
+            break
+        active, ders, residuals = active[mask], ders[mask], residuals[mask]
+
+        # 2 x 2 systems, singular ones stay where they are
+        jacobians = np.einsum('kld,kdm->klm', normals[active],
+                              np.stack((ders[:, 1, 0], ders[:, 0, 1]), 2))
+        a, b = jacobians[:, 0, 0], jacobians[:, 0, 1]
+        c, d = jacobians[:, 1, 0], jacobians[:, 1, 1]
+        dets = a * d - b * c
+        dets = np.where(dets == 0, np.inf, dets)
+        steps = np.column_stack((d * residuals[:, 0] - b * residuals[:, 1],
+                                 a * residuals[:, 1] - c * residuals[:, 0]))
+        params[active] -= steps / dets[:, None]
+        params[active, 0] = np.clip(params[active, 0], u0, u1)
+        params[active, 1] = np.clip(params[active, 1], v0, v1)
+    return params, pnts, is_converged
+
+
+def _get_heights(surface, params, normal):
+    ders = surface.derivatives_many(params[:, 0], params[:, 1], 1,
+                                    cartesian=True, dtype=np.double)
+    return np.dot(ders[:, 0, 0], normal), np.dot(ders[:, 1, 0], normal), \
+        np.dot(ders[:, 0, 1], normal), ders[:, 0, 0]
+
+
+def _solve_iso_lines(surface, params, lbs, ubs, axis, normal, offsets, tol,
+                     max_iter):
+
+    # safeguarded Newton iteration along iso-parameter lines: the free
+    # parameter (axis) is kept inside a bracket of a sign change
+    lo_params, hi_params = params.copy(), params.copy()
+    lo_params[:, axis], hi_params[:, axis] = lbs, ubs
+    lo_heights = _get_heights(surface, lo_params, normal)[0] - offsets
+    hi_heights = _get_heights(surface, hi_params, normal)[0] - offsets
+    is_bracketed = lo_heights * hi_heights <= 0
+    params, lbs, ubs = params[is_bracketed], lbs[is_bracketed], \
+        ubs[is_bracketed]
+    lo_heights, offsets = lo_heights[is_bracketed], offsets[is_bracketed]
+    scale = max(1., np.max(np.abs(offsets))) if len(offsets) else 1.
+
+    params[:, axis] = .5 * (lbs + ubs)
+    for i in xrange(max_iter + 1):
+        heights, ders_u, ders_v, pnts = _get_heights(surface, params, normal)
+        heights -= offsets
+        is_converged = np.abs(heights) <= tol * scale
+        if i == max_iter or np.all(is_converged):
+            break
+
+        # shrink the brackets, bisect where Newton leaves them
+        is_lower = np.sign(heights) == np.sign(lo_heights)
+        lbs = np.where(is_lower, params[:, axis], lbs)
+        lo_heights = np.where(is_lower, heights, lo_heights)
+        ubs = np.where(is_lower, ubs, params[:, axis])
+        slopes = ders_u if axis == 0 else ders_v
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xs = params[:, axis] - heights / slopes
+        is_outside = ~((xs > lbs) & (xs < ubs))
+        params[:, axis] = np.where(is_outside, .5 * (lbs + ubs), xs)
+    return is_bracketed, params, pnts, is_converged
+
+
+def slice_surface(surface, normal, offsets, n_levels=3, n_samples=4,
+                  tol=1e-10, max_iter=32):
+
+    # points on the intersection curves with the planes normal * x = offset;
+    # returns the offset index, the parameters and the point of every sample
+    normal = np.asarray(normal, dtype=np.double)
+    normal = normal / np.sqrt(np.dot(normal, normal))
+    offsets = np.atleast_1d(np.asarray(offsets, dtype=np.double))
+    order = np.argsort(offsets)
+    sorted_offsets = offsets[order]
+
+    # cull pairs of Bezier patches and planes with the height intervals
+    patches, bp_u, bp_v = surface.decompose()
+    patches = patches.reshape((-1,) + patches.shape[2:])
+    heights = np.dot(patches[..., :-1] / patches[..., -1:], normal)
+    lbs = np.searchsorted(sorted_offsets, heights.min((1, 2)), 'left')
+    ubs = np.searchsorted(sorted_offsets, heights.max((1, 2)), 'right')
+    counts = ubs - lbs
+    leaves = np.repeat(np.arange(len(patches)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    planes = order[lbs[leaves] + np.arange(len(leaves)) - starts]
+
+    ranges = np.empty((len(bp_u) - 1, len(bp_v) - 1, 4))
+    ranges[..., 0], ranges[..., 1] = bp_u[:-1, None], bp_u[1:, None]
+    ranges[..., 2], ranges[..., 3] = bp_v[:-1], bp_v[1:]
+    ranges = ranges.reshape(-1, 4)[leaves]
+
+    # signed heights over the planes as Bezier coefficients
+    coeffs = np.dot(patches[leaves, ..., :-1], normal) - \
+        patches[leaves, ..., -1] * offsets[planes, None, None]
+    ranges, planes = subdivide(coeffs[..., None], ranges, planes,
+                               n_levels)
+
+    # n_samples iso-lines in both directions through every sub-patch
+    ts = (np.arange(n_samples) + .5) / n_samples
+    results = list()
+    for axis, fixed in [(1, 0), (0, 1)]:
+        lb, ub = ranges[:, 2 * fixed], ranges[:, 2 * fixed + 1]
+        params = np.empty((len(ranges), n_samples, 2))
+        params[..., fixed] = lb[:, None] + (ub - lb)[:, None] * ts
+        params = params.reshape(-1, 2)
+        lbs = np.repeat(ranges[:, 2 * axis], n_samples)
+        ubs = np.repeat(ranges[:, 2 * axis + 1], n_samples)
+        line_planes = np.repeat(planes, n_samples)
+        is_bracketed, params, pnts, is_converged = _solve_iso_lines(
+            surface, params, lbs, ubs, axis, normal, offsets[line_planes],
+            tol, max_iter)
+        line_planes = line_planes[is_bracketed]
+        results.append((line_planes[is_converged], params[is_converged],
+                        pnts[is_converged]))
+
+    planes, params, pnts = [np.concatenate(r) for r in zip(*results)]
+    order = np.argsort(planes, kind='mergesort')
+    return planes[order], params[order], pnts[order]
+
+
+###############################################################################
+# curves
+###############################################################################
+
+def get_line_planes(origins, dirs):
+
+    # every line is the intersection of dim - 1 hyperplanes n * x = d
+    if dirs.shape[1] != 2:
+        return get_ray_planes(origins, dirs)
+    normals = np.column_stack((-dirs[:, 1], dirs[:, 0]))
+    normals /= np.sqrt(np.sum(normals**2, -1))[:, None]
+    return normals[:, None], np.sum(normals * origins, -1)[:, None]
+
+
+def evaluate_bezier(segments, ts):
+
+    # Cartesian points and first derivatives of rational Bezier segments
+    # (K, deg + 1, dim + 1) at the local parameters ts (K,)
+    deg = segments.shape[1] - 1
+    ts = ts[:, None]
+    ks = np.arange(deg + 1)
+    basis = fdn.get_binomial_coefficients(deg)[deg] * ts**ks * \
+        (1 - ts)**(deg - ks)
+    h_pnts = np.einsum('ki,kid->kd', basis, segments)
+    h_ders = np.zeros_like(h_pnts)
+    if deg > 0:
+        basis = fdn.get_binomial_coefficients(deg - 1)[deg - 1] * \
+            ts**ks[:-1] * (1 - ts)**(deg - 1 - ks[:-1])
+        h_ders = deg * np.einsum('ki,kid->kd', basis,
+                                 np.diff(segments, axis=1))
+
+    # quotient rule
+    pnts = h_pnts[:, :-1] / h_pnts[:, -1:]
+    ders = (h_ders[:, :-1] - h_ders[:, -1:] * pnts) / h_pnts[:, -1:]
+    return pnts, ders
+
+
+def _get_hull_boxes(segments):
+    pnts = segments[..., :-1] / segments[..., -1:]
+    return pnts.min(1), pnts.max(1)
+
+
+def _to_global(ts, segment_indices, breakpoints):
+    lbs = breakpoints[segment_indices]
+    return lbs + ts * (breakpoints[segment_indices + 1] - lbs)
+
+
+def _get_merge_distance(segments, tol):
+
+    # tangential contacts are only resolved to about sqrt(tol), so roots of
+    # the same contact may lie that far apart
+    lows, highs = _get_hull_boxes(segments)
+    return 4 * np.sqrt(tol) * max(1., np.max(np.abs(lows)),
+                                  np.max(np.abs(highs)))
+
+
+def _is_closed(curve):
+
+    # clamped curves start and end at their first and last control points
+    return np.allclose(curve.ctrl_pnts[0], curve.ctrl_pnts[-1])
+
+
+def _unique_roots(owners, params, pnts, eps, is_closed):
+
+    # indices of the roots left after merging those of neighbouring pieces
+    # or segments whose points are closer than eps; on closed curves the
+    # last roots of every owner are compared with the first across the seam
+    order = np.lexsort(tuple(params.T[::-1]) + (owners,))
+    owners, pnts = owners[order], pnts[order]
+    is_first = np.ones(len(owners), dtype=bool)
+    is_first[1:] = np.diff(owners) != 0
+    is_new = is_first.copy()
+    is_new[1:] |= np.sqrt(np.sum(np.diff(pnts, axis=0)**2, -1)) > eps
+    if is_closed and len(owners):
+        firsts = np.flatnonzero(is_first)
+        lasts = np.maximum.reduceat(
+            np.where(is_new, np.arange(len(owners)), -1), firsts)
+        is_seam = (lasts > firsts) & (np.sqrt(np.sum(
+            (pnts[lasts] - pnts[firsts])**2, -1)) <= eps)
+        ends = np.append(firsts[1:], len(owners))
+        for last, end in zip(lasts[is_seam], ends[is_seam]):
+            is_new[last:end] = False
+    return order[is_new]
+
+
+def _gauss_newton(evaluate, params, tol, max_iter):
+
+    # minimizes |F|^2 for residuals F (K, dim) with Jacobians J (K, dim, m)
+    # in the unit box; only pairs that haven't converged are iterated
+    is_converged = np.zeros(len(params), dtype=bool)
+    active = np.arange(len(params))
+    for i in xrange(max_iter + 1):
+        residuals, jacobians = evaluate(active, params[active])
+        is_converged[active] = np.all(np.abs(residuals) <= tol, 1)
+        mask = ~is_converged[active]
+        if i == max_iter or not np.any(mask):
+            break
+        active = active[mask]
+        residuals, jacobians = residuals[mask], jacobians[mask]
+
+        # normal equations J^T J * step = J^T F, singular ones stay put
+        jtj = np.einsum('kdi,kdj->kij', jacobians, jacobians)
+        jtf = np.einsum('kdi,kd->ki', jacobians, residuals)
+        if params.shape[1] == 1:
+            dets = np.where(jtj[:, 0, 0] == 0, np.inf, jtj[:, 0, 0])
+            steps = jtf / dets[:, None]
+        else:
+            a, b, d = jtj[:, 0, 0], jtj[:, 0, 1], jtj[:, 1, 1]
+            dets = a * d - b * b
+            dets = np.where(dets == 0, np.inf, dets)
+            steps = np.column_stack((d * jtf[:, 0] - b * jtf[:, 1],
+                                     a * jtf[:, 1] - b * jtf[:, 0]))
+            steps /= dets[:, None]
+        params[active] = np.clip(params[active] - steps, 0, 1)
+    return params, is_converged
+
+
+def intersect_curve_lines(curve, origins, dirs, n_levels=6, tol=1e-10,
+                          max_iter=16):
+
+    # all intersections of the curve with infinite lines: line indices,
+    # curve parameters and line parameters
+    origins = np.atleast_2d(np.asarray(origins, dtype=np.double))
+    dirs = np.atleast_2d(np.asarray(dirs, dtype=np.double))
+    normals, offsets = get_line_planes(origins, dirs)
+    segments, breakpoints = curve.decompose()
+
+    # signed distances of all (segment, line) pairs as Bezier coefficients
+    coeffs = np.einsum('sid,nkd->snik', segments[..., :-1], normals) - \
+        segments[:, None, :, -1:] * offsets[None, :, None]
+    n_pairs = coeffs.shape[0] * coeffs.shape[1]
+    coeffs = coeffs.reshape((n_pairs,) + coeffs.shape[2:])
+    ranges = np.tile([0., 1.], (n_pairs, 1))
+    ranges, pairs = subdivide(coeffs, ranges, np.arange(n_pairs), n_levels)
+    seg_indices, lines = pairs // len(origins), pairs % len(origins)
+
+    scale = tol * max(1., np.max(np.abs(offsets)))
+
+    def evaluate(active, ts):
+        pnts, ders = evaluate_bezier(segments[seg_indices[active]], ts[:, 0])
+        residuals = np.einsum('kld,kd->kl', normals[lines[active]], pnts) - \
+            offsets[lines[active]]
+        jacobians = np.einsum('kld,kd->kl', normals[lines[active]], ders)
+        return residuals, jacobians[..., None]
+
+    ts, is_converged = _gauss_newton(evaluate, ranges.mean(1)[:, None],
+                                     scale, max_iter)
+    us = _to_global(ts[:, 0], seg_indices, breakpoints)[is_converged]
+    lines = lines[is_converged]
+    pnts = curve.evaluate_many(us, cartesian=True)
+    order = _unique_roots(lines, us[:, None], pnts,
+                          _get_merge_distance(segments, tol),
+                          _is_closed(curve))
+    lines, us, pnts = lines[order], us[order], pnts[order]
+
+    # parameters along the lines
+    line_ts = np.sum((pnts - origins[lines]) * dirs[lines], -1) / \
+        np.sum(dirs[lines]**2, -1)
+    return lines, us, line_ts
+
+
+def intersect_curves(curve, others, n_levels=6, tol=1e-10, max_iter=16):
+
+    # all intersections of the curve with every other curve: indices of the
+    # other curves, parameters on the curve and on the other curves
+    segments_a, breakpoints_a = curve.decompose()
+    lows_a, highs_a = _get_hull_boxes(segments_a)
+    scale = tol * max(1., np.max(np.abs(highs_a)), np.max(np.abs(lows_a)))
+
+    # Bezier segments of the other curves, grouped by degree
+    groups = dict()
+    for index, other in enumerate(others):
+        segments, breakpoints = other.decompose()
+        group = groups.setdefault(other.deg, ([], [], [], []))
+        group[0].append(segments)
+        group[1].append(np.repeat(index, len(segments)))
+        group[2].append(breakpoints[:-1])
+        group[3].append(breakpoints[1:])
+
+    results = list()
+    for segments_b, owners, lbs_b, ubs_b in groups.values():
+        segments_b, owners = np.concatenate(segments_b), np.concatenate(owners)
+        lbs_b, ubs_b = np.concatenate(lbs_b), np.concatenate(ubs_b)
+
+        # cull segment pairs with the boxes of their convex hulls
+        tree = bvh.BoundingVolumeHierarchy(*_get_hull_boxes(segments_b))
+        indices_a, indices_b = tree.query_boxes(lows_a, highs_a)
+
+        # the difference w_b * A - w_a * B is a tensor product Bezier
+        # function whose zeros are the intersections
+        sa, sb = segments_a[indices_a], segments_b[indices_b]
+        coeffs = sa[:, :, None, :-1] * sb[:, None, :, -1:] - \
+            sa[:, :, None, -1:] * sb[:, None, :, :-1]
+        ranges = np.tile([0., 1., 0., 1.], (len(coeffs), 1))
+        ranges, pairs = subdivide(coeffs, ranges, np.arange(len(coeffs)),
+                                  n_levels)
+        indices_a, indices_b = indices_a[pairs], indices_b[pairs]
+
+        def evaluate(active, params):
+            pnts_a, ders_a = evaluate_bezier(segments_a[indices_a[active]],
+                                             params[:, 0])
+            pnts_b, ders_b = evaluate_bezier(segments_b[indices_b[active]],
+                                             params[:, 1])
+            return pnts_a - pnts_b, np.stack((ders_a, -ders_b), 2)
+
+        params = np.column_stack((ranges[:, :2].mean(1),
+                                  ranges[:, 2:].mean(1)))
+        params, is_converged = _gauss_newton(evaluate, params, scale,
+                                             max_iter)
+        params, indices_a = params[is_converged], indices_a[is_converged]
+        indices_b = indices_b[is_converged]
+        us = _to_global(params[:, 0], indices_a, breakpoints_a)
+        lbs, ubs = lbs_b[indices_b], ubs_b[indices_b]
+        vs = lbs + params[:, 1] * (ubs - lbs)
+        results.append((owners[indices_b], np.column_stack((us, vs))))
+
+    if not results:
+        return np.empty(0, int), np.empty(0), np.empty(0)
+    owners, params = [np.concatenate(r) for r in zip(*results)]
+    order = _unique_roots(owners, params,
+                          curve.evaluate_many(params[:, 0], cartesian=True),
+                          _get_merge_distance(segments_a, tol),
+                          _is_closed(curve))
+    owners, params = owners[order], params[order]
+    return owners, params[:, 0], params[:, 1]
@@ -21,9 +21,17 @@
 # ***************************************************************************
 
 
+# standard packages
+import functools
+
+# 3rd party packages
 import numpy as np
 
 
+###############################################################################
+# transform builders
+###############################################################################
+
 def translate(vector):
 
     dim = len(vector) + 1
@@ -31,3 +39,161 @@ def translate(vector):
     matrix[:-1, -1] = vector
 
     return matrix
+
+
+def scale(factors, center=None, dim=None):
+
+    # a single factor scales uniformly, the dimension comes from dim or center
+    if np.ndim(factors) == 0:
+        if dim is None and center is None:
+            raise ValueError('uniform scaling needs dim or center')
+        dim = len(center) if dim is None else dim
+        factors = [factors] * dim
+
+    dim = len(factors) + 1
+    matrix = np.identity(dim)
+    matrix[:-1, :-1] *= factors
+
+    if center is None:
+        return matrix
+    return compose(translate(-np.asarray(center, dtype=np.double)), matrix,
+                   translate(center))
+
+
+def rotate(angle, axis=None, center=None):
+
+    cos, sin = np.cos(angle), np.sin(angle)
+
+    # planar rotation about the origin
+    if axis is None:
+        matrix = np.identity(3)
+        matrix[:2, :2] = [[cos, -sin], [sin, cos]]
+
+    # Rodrigues' rotation formula
+    else:
+        axis = np.asarray(axis, dtype=np.double)
+        x, y, z = axis / np.sqrt(np.dot(axis, axis))
+        cross = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+        matrix = np.identity(4)
+        matrix[:3, :3] += sin * cross + (1 - cos) * np.dot(cross, cross)
+
+    if center is None:
+        return matrix
+    return compose(translate(-np.asarray(center, dtype=np.double)), matrix,
+                   translate(center))
+
+
+def mirror(normal, pnt=None):
+
+    # Householder reflection at the hyperplane through pnt
+    normal = np.asarray(normal, dtype=np.double)
+    normal = normal / np.sqrt(np.dot(normal, normal))
+    matrix = np.identity(len(normal) + 1)
+    matrix[:-1, :-1] -= 2 * np.outer(normal, normal)
+
+    if pnt is None:
+        return matrix
+    return compose(translate(-np.asarray(pnt, dtype=np.double)), matrix,
+                   translate(pnt))
+
+
+def compose(*matrices):
+
+    # the first matrix is applied first
+    return functools.reduce(lambda a, b: np.dot(b, a), matrices)
+
+
+###############################################################################
+# transform stacks
+###############################################################################
+
+class TransformStack(object):
+
+    # Transforms are only recorded, the stack collapses into one matrix the
+    # first time it is needed. The first pushed transform is applied first.
+
+    def __init__(self, dim=3):
+        self.dim = dim
+        self._matrices = list()
+        self._matrix = None
+
+    def __len__(self):
+        return len(self._matrices)
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.matrix, dtype=dtype)
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            self._matrix = compose(np.identity(self.dim + 1), *self._matrices)
+        return self._matrix
+
+    def push(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.double)
+        if matrix.shape != (self.dim + 1, self.dim + 1):
+            raise ValueError('matrix has the wrong shape')
+        self._matrices.append(matrix)
+        self._matrix = None
+        return self
+
+    def pop(self):
+        self._matrix = None
+        return self._matrices.pop()
+
+    def translate(self, vector):
+        return self.push(translate(vector))
+
+    def scale(self, factors, center=None):
+        return self.push(scale(factors, center, self.dim))
+
+    def rotate(self, angle, axis=None, center=None):
+        return self.push(rotate(angle, axis, center))
+
+    def mirror(self, normal, pnt=None):
+        return self.push(mirror(normal, pnt))
+
+    def apply(self, obj):
+        obj.transform(self.matrix)
+        return obj
+
+
+###############################################################################
+# application
+###############################################################################
+
+def apply(matrix, pnts, chunk_size=2**12):
+
+    # transforms homogeneous points (last axis) in place, chunk by chunk, so
+    # only a small buffer is allocated; read-only points, e.g. memory maps,
+    # are transformed into a copy that is returned instead
+    matrix = np.asarray(matrix, dtype=np.double)
+    if not pnts.flags.writeable:
+        pnts = pnts.copy()
+    if len(pnts) == 0:
+        return pnts
+
+    # one matrix per entity along the first axis
+    if matrix.ndim == 3:
+        if len(matrix) != len(pnts):
+            raise ValueError('need one matrix per entity')
+        step = max(1, chunk_size * pnts.shape[-1] // pnts[0].size)
+        for lb in xrange(0, len(pnts), step):
+            ub = lb + step
+            pnts[lb:ub] = np.einsum('bij,b...j->b...i', matrix[lb:ub],
+                                    pnts[lb:ub])
+        return pnts
+
+    # arrays that can't be flattened without a copy are transformed at once
+    flat = pnts.reshape(-1, pnts.shape[-1])
+    if not np.may_share_memory(flat, pnts):
+        pnts[...] = np.dot(pnts, matrix.T)
+        return pnts
+
+    buf = np.empty((min(chunk_size, len(flat)), flat.shape[1]))
+    for lb in xrange(0, len(flat), chunk_size):
+        chunk = flat[lb:lb + chunk_size]
+        out = buf[:len(chunk)]
+        np.dot(chunk, matrix.T, out)
+        chunk[...] = out
+    return pnts
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import mmap
+import multiprocessing
+import os
+import tempfile
+import traceback
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import cfoundation as cfdn
+import surface
+import tessellation
+
+
+# columns of the layout of packed surfaces
+_CTRL_OFFSET, _N_U, _N_V, _KNOTS_U_OFFSET, _N_KNOTS_U, _KNOTS_V_OFFSET, \
+    _N_KNOTS_V = range(7)
+
+
+def share(shape, dtype):
+
+    # anonymous shared mapping, inherited by forked worker processes
+    dtype = np.dtype(dtype)
+    n_items = int(np.prod(shape))
+    buf = mmap.mmap(-1, max(n_items * dtype.itemsize, 1))
+    return np.frombuffer(buf, dtype, n_items).reshape(shape)
+
+
+def pack_surfaces(surfaces):
+
+    # control nets and knot vectors of all surfaces are concatenated into
+    # shared arrays once; a surface is then described by offsets only
+    dims = set(s.ctrl_pnts.shape[-1] for s in surfaces)
+    if len(dims) > 1:
+        raise ValueError('surfaces must have the same dimension')
+    dim = dims.pop() if dims else 4
+
+    layout = np.zeros((len(surfaces), 7), dtype=np.int64)
+    layout[:, _N_U] = [s.ctrl_pnts.shape[0] for s in surfaces]
+    layout[:, _N_V] = [s.ctrl_pnts.shape[1] for s in surfaces]
+    layout[:, _N_KNOTS_U] = [len(s.knots_u) for s in surfaces]
+    layout[:, _N_KNOTS_V] = [len(s.knots_v) for s in surfaces]
+    n_ctrl_pnts = layout[:, _N_U] * layout[:, _N_V]
+    layout[1:, _CTRL_OFFSET] = np.cumsum(n_ctrl_pnts)[:-1]
+    n_knots = layout[:, _N_KNOTS_U] + layout[:, _N_KNOTS_V]
+    layout[1:, _KNOTS_U_OFFSET] = np.cumsum(n_knots)[:-1]
+    layout[:, _KNOTS_V_OFFSET] = layout[:, _KNOTS_U_OFFSET] + \
+        layout[:, _N_KNOTS_U]
+
+    ctrl_pnts = share((n_ctrl_pnts.sum(), dim), np.double)
+    knots = share((n_knots.sum(),), np.double)
+    for s, row in zip(surfaces, layout):
+        lb = row[_CTRL_OFFSET]
+        ctrl_pnts[lb:lb + row[_N_U] * row[_N_V]] = s.ctrl_pnts.reshape(-1, dim)
+        lb = row[_KNOTS_U_OFFSET]
+        knots[lb:lb + row[_N_KNOTS_U]] = s.knots_u
+        lb = row[_KNOTS_V_OFFSET]
+        knots[lb:lb + row[_N_KNOTS_V]] = s.knots_v
+    return layout, ctrl_pnts, knots
+
+
+def unpack_surface(layout, ctrl_pnts, knots, index):
+
+    # views into the packed arrays, nothing is copied
+    row = layout[index]
+    lb, n_u, n_v = row[_CTRL_OFFSET], row[_N_U], row[_N_V]
+    net = ctrl_pnts[lb:lb + n_u * n_v].reshape(n_u, n_v, -1)
+    lb = row[_KNOTS_U_OFFSET]
+    knots_u = knots[lb:lb + row[_N_KNOTS_U]]
+    lb = row[_KNOTS_V_OFFSET]
+    knots_v = knots[lb:lb + row[_N_KNOTS_V]]
+    return surface.Surface(net, knots_u, knots_v)
+
+
+def get_offsets(sizes):
+    offsets = np.zeros((len(sizes) + 1, 2), dtype=np.int64)
+    np.cumsum(sizes, 0, out=offsets[1:])
+    return offsets[:, 0], offsets[:, 1]
+
+
+def _get_sections(n_vertices, n_triangles, dim):
+
+    # vertices, parameters and triangles one after another in the output
+    sections, offset = list(), 0
+    for dtype, shape in ((np.double, (n_vertices, dim)),
+                         (np.double, (n_vertices, 2)),
+                         (np.intc, (n_triangles, 3))):
+        sections.append((dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return sections, offset
+
+
+def _map_buffers(file_like_obj, sizes, dim):
+    sections, _ = _get_sections(sizes[:, 0].sum(), sizes[:, 1].sum(), dim)
+    buffers = list()
+    for dtype, shape, offset in sections:
+        if 0 in shape:
+            buffers.append(np.empty(shape, dtype))
+        else:
+            buffers.append(np.memmap(file_like_obj, dtype, 'r+', offset,
+                                     shape).view(np.ndarray))
+    return buffers
+
+
+def _write_meshes(meshes, sizes, buffers):
+    vertex_offsets, triangle_offsets = get_offsets(sizes)
+    for index, (vertices, triangles, params) in meshes.items():
+        lb, ub = vertex_offsets[index], vertex_offsets[index + 1]
+        buffers[0][lb:ub] = vertices
+        buffers[1][lb:ub] = params
+        lb, ub = triangle_offsets[index], triangle_offsets[index + 1]
+        buffers[2][lb:ub] = triangles
+
+
+def _tessellate_claimed(packed, order, counter, chunk_size, sizes, tol,
+                        max_level):
+
+    # self-scheduling: every worker claims the next chunk of surfaces until
+    # none are left, so uneven surfaces balance out
+    meshes = dict()
+    while True:
+        with counter.get_lock():
+            start = counter.value
+            counter.value += chunk_size
+        if start >= len(order):
+            return meshes
+        for index in order[start:start + chunk_size]:
+            mesh = tessellation.tessellate(
+                unpack_surface(*(packed + (index,))), tol, max_level)
+            meshes[index] = mesh
+            sizes[index] = len(mesh[0]), len(mesh[1])
+
+
+def _work(packed, order, counter, chunk_size, sizes, tol, max_level, dim,
+          connection):
+
+    # the kernels would oversubscribe the cores otherwise
+    cfdn.set_num_threads(1)
+    try:
+        meshes = _tessellate_claimed(packed, order, counter, chunk_size,
+                                     sizes, tol, max_level)
+
+        # the parent allocates the output once all sizes are known
+        connection.send(None)
+        path = connection.recv()
+        with open(path, 'r+b') as f:
+            _write_meshes(meshes, sizes, _map_buffers(f, sizes, dim))
+        connection.send(None)
+    except Exception:
+        connection.send(traceback.format_exc())
+    finally:
+        connection.close()
+
+
+def _wait(connections):
+    for connection in connections:
+        try:
+            message = connection.recv()
+        except EOFError:
+            message = 'worker process died'
+        if message is not None:
+            raise RuntimeError(message)
+
+
+def _get_result(buffers, sizes):
+    vertices, params, triangles = buffers
+    return (vertices, triangles, params) + get_offsets(sizes)
+
+
+def tessellate_surfaces(surfaces, tol, max_level=10, n_processes=None,
+                        chunk_size=16):
+
+    # meshes of all surfaces in the order of the surfaces; triangles index
+    # the vertices of their own surface, see the offsets
+    packed = pack_surfaces(surfaces)
+    dim = packed[1].shape[1] - 1
+    sizes = share((len(surfaces), 2), np.int64)
+    counter = multiprocessing.Value('l', 0)
+
+    # largest surfaces first, the small ones fill the gaps at the end
+    layout = packed[0]
+    costs = (layout[:, _N_KNOTS_U] - 1) * (layout[:, _N_KNOTS_V] - 1)
+    order = np.argsort(-costs, kind='mergesort')
+
+    if n_processes is None:
+        n_processes = multiprocessing.cpu_count()
+    n_processes = min(n_processes, len(surfaces))
+    if n_processes <= 1:
+        meshes = _tessellate_claimed(packed, order, counter, chunk_size,
+                                     sizes, tol, max_level)
+        sections, _ = _get_sections(sizes[:, 0].sum(), sizes[:, 1].sum(),
+                                    dim)
+        buffers = [np.empty(shape, dtype) for dtype, shape, _ in sections]
+        _write_meshes(meshes, sizes, buffers)
+        return _get_result(buffers, sizes)
+
+    # the workers inherit the shared arrays, only offsets are exchanged
+    workers, connections = list(), list()
+    for _ in xrange(n_processes):
+        connection, child_connection = multiprocessing.Pipe()
+        worker = multiprocessing.Process(
+            target=_work, args=(packed, order, counter, chunk_size, sizes,
+                                tol, max_level, dim, child_connection))
+        worker.daemon = True
+        worker.start()
+        child_connection.close()
+        workers.append(worker)
+        connections.append(connection)
+
+    # the output is a file in memory every worker maps; it stays mapped by
+    # the parent after the file is removed
+    fd, path = tempfile.mkstemp(
+        dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+    try:
+        with os.fdopen(fd, 'w+b') as f:
+            _wait(connections)
+            _, n_bytes = _get_sections(sizes[:, 0].sum(), sizes[:, 1].sum(),
+                                       dim)
+            f.truncate(n_bytes)
+            for connection in connections:
+                connection.send(path)
+            _wait(connections)
+            buffers = _map_buffers(f, sizes, dim)
+    except BaseException:
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        os.unlink(path)
+        for worker in workers:
+            worker.join()
+    return _get_result(buffers, sizes)
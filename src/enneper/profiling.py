@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import contextlib
+import functools
+import timeit
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import batch
+import cfoundation as cfdn
+import curve
+import matrices
+import surface
+
+
+# profiling is opt-in, see enable_profiling; the instrumented functions are
+# only patched in while it is enabled, so it costs nothing otherwise
+_profiler = None
+_originals = dict()
+
+
+# call counters, cumulative timers and histograms of the number of
+# parameters (or points) per call
+class Profiler(object):
+
+    def __init__(self):
+        self._stats = dict()
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def record(self, name, seconds, n_params=None):
+        try:
+            stats = self._stats[name]
+        except KeyError:
+            stats = self._stats[name] = [0, 0., 0., dict()]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        if n_params is not None:
+
+            # buckets are the powers of two bounding the counts from above
+            bucket = 1 << int(n_params - 1).bit_length() if n_params else 0
+            histogram = stats[3]
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def snapshot(self):
+        snapshot = dict()
+        for name, (calls, seconds, max_seconds, histogram) in \
+                self._stats.items():
+            snapshot[name] = dict(calls=calls, seconds=seconds,
+                                  mean_seconds=seconds / calls,
+                                  max_seconds=max_seconds,
+                                  histogram=dict(histogram))
+        return snapshot
+
+    def merge(self, other):
+        for name, (calls, seconds, max_seconds, histogram) in \
+                other._stats.items():
+            try:
+                stats = self._stats[name]
+            except KeyError:
+                stats = self._stats[name] = [0, 0., 0., dict()]
+            stats[0] += calls
+            stats[1] += seconds
+            stats[2] = max(stats[2], max_seconds)
+            for bucket, count in histogram.items():
+                stats[3][bucket] = stats[3].get(bucket, 0) + count
+
+    def reset(self):
+        self._stats.clear()
+
+    def report(self, sort_by='seconds'):
+        snapshot = self.snapshot()
+        names = sorted(snapshot, key=lambda n: snapshot[n][sort_by],
+                       reverse=True)
+        lines = ['%-36s %10s %12s %12s' % ('function', 'calls', 'seconds',
+                                           'mean')]
+        for name in names:
+            stats = snapshot[name]
+            lines.append('%-36s %10d %12.6f %12.3e' % (
+                name, stats['calls'], stats['seconds'],
+                stats['mean_seconds']))
+        return '\n'.join(lines)
+
+
+###############################################################################
+# instrumented functions
+###############################################################################
+
+def _count_one(args):
+    return 1
+
+
+def _count_params(args):
+    return np.size(args[0])
+
+
+def _count_method_params(args):
+    return np.size(args[1])
+
+
+def _count_grid_params(args):
+    return np.size(args[1]) * np.size(args[2])
+
+
+def _count_pnts(args):
+    pnts = np.asarray(args[1])
+    return pnts.size // pnts.shape[-1]
+
+
+def _count_ctrl_pnts(args):
+    ctrl_pnts = args[0].ctrl_pnts
+    return ctrl_pnts.size // ctrl_pnts.shape[-1]
+
+
+def _get_targets():
+
+    # (owner, attribute, name, parameter counter)
+    targets = list()
+    for attribute, count in (
+            ('get_index', _count_one),
+            ('calc_basis_funs', _count_one),
+            ('get_indices', _count_params),
+            ('calc_basis_funs_many', _count_params),
+            ('calc_ders_basis_funs_many', _count_params),
+            ('evaluate_curve', _count_params),
+            ('evaluate_surface', _count_params),
+            ('contract_curve', _count_params),
+            ('contract_surface', _count_params),
+            ('evaluate_curve_batch', _count_params),
+            ('evaluate_surface_batch', _count_params),
+            ('solve_banded', None)):
+        targets.append((cfdn, attribute, 'cfoundation.' + attribute, count))
+    targets.append((matrices, 'apply', 'matrices.apply', _count_pnts))
+
+    for cls, methods in (
+            (curve.Curve, (('evaluate_at', _count_one),
+                           ('evaluate_many', _count_method_params),
+                           ('derivatives_many', _count_method_params))),
+            (surface.Surface, (('evaluate_at', _count_one),
+                               ('evaluate_many', _count_method_params),
+                               ('evaluate_grid', _count_grid_params),
+                               ('derivatives_many', _count_method_params))),
+            (batch.CurveBatch, (('evaluate_many', _count_method_params),)),
+            (batch.SurfaceBatch, (('evaluate_many', _count_method_params),))):
+        methods += (('transform', _count_ctrl_pnts),
+                    ('export', _count_ctrl_pnts),
+                    ('export_binary', _count_ctrl_pnts),
+                    ('from_json', None),
+                    ('from_binary', None))
+        for attribute, count in methods:
+            name = '%s.%s' % (cls.__name__, attribute)
+            targets.append((cls, attribute, name, count))
+    return targets
+
+
+def _wrap(func, name, count):
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _profiler
+        if profiler is None:
+            return func(*args, **kwargs)
+        start = timeit.default_timer()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = timeit.default_timer() - start
+            profiler.record(name, seconds,
+                            None if count is None else count(args))
+    return wrapper
+
+
+def _install():
+    for owner, attribute, name, count in _get_targets():
+        original = owner.__dict__[attribute]
+        _originals[owner, attribute] = original
+        if isinstance(original, classmethod):
+            wrapper = classmethod(_wrap(original.__func__, name, count))
+        else:
+            wrapper = _wrap(original, name, count)
+        setattr(owner, attribute, wrapper)
+
+
+def _uninstall():
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+
+
+###############################################################################
+# public interface
+###############################################################################
+
+def enable_profiling():
+    global _profiler
+    if not _originals:
+        _install()
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable_profiling():
+    global _profiler
+    _uninstall()
+    _profiler = None
+
+
+def get_profiler():
+    return _profiler
+
+
+@contextlib.contextmanager
+def collect():
+
+    # scoped collection into a fresh profiler; an enclosing profiler is
+    # restored afterwards and gets the calls of the scope merged in
+    global _profiler
+    previous = _profiler
+    profiler = enable_profiling()
+    try:
+        yield profiler
+    finally:
+        if previous is None:
+            disable_profiling()
+        else:
+            previous.merge(profiler)
+            _profiler = previous
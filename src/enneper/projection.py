@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# 3rd party packages
+import numpy as np
+
+# optional 3rd party packages
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# project packages
+import foundation as fdn
+
+
+class SeedIndex(object):
+
+    # Nearest neighbour index over sampled points of a curve or surface. The
+    # index can be reused for any number of query batches. Without scipy the
+    # samples are hashed into a uniform grid of cells of size cell_size.
+
+    def __init__(self, params, pnts, cell_size=None, chunk_size=2**16):
+        self.params = np.asarray(params, dtype=np.double)
+        self.pnts = np.ascontiguousarray(pnts, dtype=np.double)
+        self.chunk_size = chunk_size
+
+        if cKDTree is not None:
+            self._tree = cKDTree(self.pnts)
+            return
+        self._tree = None
+
+        # cells big enough to hold a few samples
+        lb, ub = self.pnts.min(0), self.pnts.max(0)
+        if cell_size is None:
+            cell_size = np.max(ub - lb) / len(self.pnts)**.5
+        self.cell_size = max(cell_size, 1e-12)
+
+        # one cell of padding on every side for the neighbour lookup
+        self._origin = lb - self.cell_size
+        self._shape = ((ub - lb) / self.cell_size).astype(np.int64) + 3
+        keys = self._get_keys(self._get_cells(self.pnts))
+        self._order = np.argsort(keys, kind='mergesort')
+        self._keys = keys[self._order]
+
+        # offsets of the 3**dim neighbouring cells
+        dim = self.pnts.shape[1]
+        offsets = np.indices((3,) * dim).reshape(dim, -1).T - 1
+        self._offsets = offsets
+
+###############################################################################
+# constructors
+###############################################################################
+
+    @classmethod
+    def from_curve(cls, curve, n_samples=None):
+        if n_samples is None:
+            n_samples = 10 * len(curve.ctrl_pnts)
+        knots, deg = curve.knots, curve.deg
+        us = np.linspace(knots[deg], knots[-deg - 1], n_samples)
+        pnts = fdn.get_cartesian_points(curve.evaluate_many(us))
+
+        # twice the mean distance of two samples
+        cell_size = 2 * np.mean(np.sqrt(np.sum(np.diff(pnts, 1, 0)**2, 1)))
+        return cls(us, pnts, cell_size)
+
+    @classmethod
+    def from_surface(cls, surface, n_samples_u=None, n_samples_v=None):
+        if n_samples_u is None:
+            n_samples_u = 10 * surface.ctrl_pnts.shape[0]
+        if n_samples_v is None:
+            n_samples_v = 10 * surface.ctrl_pnts.shape[1]
+        knots_u, deg_u = surface.knots_u, surface.deg_u
+        knots_v, deg_v = surface.knots_v, surface.deg_v
+        us = np.linspace(knots_u[deg_u], knots_u[-deg_u - 1], n_samples_u)
+        vs = np.linspace(knots_v[deg_v], knots_v[-deg_v - 1], n_samples_v)
+        pnts = fdn.get_cartesian_points(surface.evaluate_grid(us, vs))
+        params = np.empty((n_samples_u, n_samples_v, 2), dtype=np.double)
+        params[..., 0], params[..., 1] = us[:, None], vs
+
+        # twice the mean distance of two samples along u or v
+        cell_size = 2 * max(
+            np.mean(np.sqrt(np.sum(np.diff(pnts, 1, 0)**2, -1))),
+            np.mean(np.sqrt(np.sum(np.diff(pnts, 1, 1)**2, -1))))
+        pnts = pnts.reshape(n_samples_u * n_samples_v, -1)
+        return cls(params.reshape(-1, 2), pnts, cell_size)
+
+###############################################################################
+# miscellaneous methods
+###############################################################################
+
+    def query(self, pnts):
+        pnts = np.asarray(pnts, dtype=np.double)
+        if self._tree is not None:
+            return self.params[self._tree.query(pnts)[1]]
+
+        indices = np.empty(len(pnts), dtype=np.intp)
+        for i in range(0, len(pnts), self.chunk_size):
+            indices[i:i + self.chunk_size] = \
+                self._query_grid(pnts[i:i + self.chunk_size])
+        return self.params[indices]
+
+    def _get_cells(self, pnts):
+        cells = np.floor((pnts - self._origin) / self.cell_size)
+        return np.clip(cells, 0, self._shape - 1).astype(np.int64)
+
+    def _get_keys(self, cells):
+        keys = cells[..., 0].copy()
+        for i in range(1, cells.shape[-1]):
+            keys *= self._shape[i]
+            keys += cells[..., i]
+        return keys
+
+    def _query_grid(self, pnts):
+
+        # sample ranges of the neighbouring cells: (N, 3**dim)
+        cells = self._get_cells(pnts)[:, None] + self._offsets
+        cells = np.clip(cells, 0, self._shape - 1)
+        keys = self._get_keys(cells).ravel()
+        starts = np.searchsorted(self._keys, keys, 'left')
+        counts = np.searchsorted(self._keys, keys, 'right') - starts
+
+        # flatten all candidates, they are grouped by query point
+        n_candidates = counts.sum()
+        owners = np.repeat(np.arange(keys.size) // len(self._offsets), counts)
+        firsts = np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = np.repeat(starts, counts) + np.arange(n_candidates) - \
+            firsts
+        candidates = self._order[candidates]
+        sq_dists = np.sum((self.pnts[candidates] - pnts[owners])**2, 1)
+
+        # nearest candidate of every query point (first one on ties)
+        indices = np.zeros(len(pnts), dtype=np.intp)
+        nearest = np.full(len(pnts), np.inf)
+        if n_candidates:
+            starts = np.flatnonzero(np.diff(owners)) + 1
+            starts = np.concatenate(([0], starts))
+            mins = np.minimum.reduceat(sq_dists, starts)
+            counts = np.diff(np.concatenate((starts, [n_candidates])))
+            hits = np.flatnonzero(sq_dists == np.repeat(mins, counts))
+            first = np.concatenate(([True], np.diff(owners[hits]) != 0))
+            hits = hits[first]
+            indices[owners[hits]] = candidates[hits]
+            nearest[owners[hits]] = sq_dists[hits]
+
+        # the neighbouring cells contain the nearest sample only if it is
+        # closer than the cell size, search the other ones exhaustively
+        remaining = np.flatnonzero(nearest > self.cell_size**2)
+        if remaining.size:
+            indices[remaining] = self._query_brute_force(pnts[remaining])
+        return indices
+
+    def _query_brute_force(self, pnts):
+        indices = np.empty(len(pnts), dtype=np.intp)
+        step = max(1, 2**22 // len(self.pnts))
+        sq_norms = np.sum(self.pnts * self.pnts, 1)
+        for i in range(0, len(pnts), step):
+            sq_dists = sq_norms - 2 * np.dot(pnts[i:i + step], self.pnts.T)
+            indices[i:i + step] = np.argmin(sq_dists, 1)
+        return indices
+
+
+def _is_closed(ctrl_pnts):
+    return np.allclose(ctrl_pnts[0], ctrl_pnts[-1])
+
+
+def _clip_params(params, lb, ub, closed):
+
+    # parameters of closed directions wrap around
+    wrapped = lb + np.mod(params - lb, ub - lb)
+    return np.where(closed, wrapped, np.clip(params, lb, ub))
+
+
+def project_points_to_curve(curve, pnts, seed_index=None, max_iter=20,
+                            tol=1e-12):
+
+    # see "The NURBS Book" 2nd edition: section 6.1 (point inversion)
+    pnts = np.asarray(pnts, dtype=np.double)
+    if seed_index is None:
+        seed_index = SeedIndex.from_curve(curve)
+    us = seed_index.query(pnts)
+    lb, ub = curve.knots[curve.deg], curve.knots[-curve.deg - 1]
+    closed = _is_closed(curve.ctrl_pnts)
+
+    # Newton iteration for all points which haven't converged yet
+    active = np.arange(len(pnts))
+    for _ in range(max_iter):
+        if not active.size:
+            break
+        ders = curve.derivatives_many(us[active], 2, cartesian=True,
+                                      dtype=np.double)
+        diff = ders[:, 0] - pnts[active]
+        f = np.sum(ders[:, 1] * diff, 1)
+        df = np.sum(ders[:, 2] * diff, 1) + np.sum(ders[:, 1] * ders[:, 1], 1)
+        df[df == 0] = np.inf
+        new_us = _clip_params(us[active] - f / df, lb, ub, closed)
+        converged = np.abs(f / df) <= tol * max(1., ub - lb)
+        us[active] = new_us
+        active = active[~converged]
+
+    foot_pnts = fdn.get_cartesian_points(curve.evaluate_many(us))
+    dists = np.sqrt(np.sum((foot_pnts - pnts)**2, 1))
+    return us, foot_pnts, dists
+
+
+def project_points_to_surface(surface, pnts, seed_index=None, max_iter=20,
+                              tol=1e-12):
+
+    # see "The NURBS Book" 2nd edition: section 6.1 (point inversion)
+    pnts = np.asarray(pnts, dtype=np.double)
+    if seed_index is None:
+        seed_index = SeedIndex.from_surface(surface)
+    params = seed_index.query(pnts)
+    knots_u, deg_u = surface.knots_u, surface.deg_u
+    knots_v, deg_v = surface.knots_v, surface.deg_v
+    lb = np.array([knots_u[deg_u], knots_v[deg_v]])
+    ub = np.array([knots_u[-deg_u - 1], knots_v[-deg_v - 1]])
+    closed = np.array([_is_closed(surface.ctrl_pnts),
+                       _is_closed(surface.ctrl_pnts.swapaxes(0, 1))])
+
+    # Newton iteration for all points which haven't converged yet
+    active = np.arange(len(pnts))
+    for _ in range(max_iter):
+        if not active.size:
+            break
+        us, vs = params[active, 0], params[active, 1]
+        ders = surface.derivatives_many(us, vs, 2, cartesian=True,
+                                        dtype=np.double)
+        diff = ders[:, 0, 0] - pnts[active]
+        s_u, s_v = ders[:, 1, 0], ders[:, 0, 1]
+
+        # gradient and Jacobian of (S - P) . S_u = 0, (S - P) . S_v = 0
+        f = np.sum(s_u * diff, 1)
+        g = np.sum(s_v * diff, 1)
+        j00 = np.sum(s_u * s_u, 1) + np.sum(ders[:, 2, 0] * diff, 1)
+        j01 = np.sum(s_u * s_v, 1) + np.sum(ders[:, 1, 1] * diff, 1)
+        j11 = np.sum(s_v * s_v, 1) + np.sum(ders[:, 0, 2] * diff, 1)
+        det = j00 * j11 - j01 * j01
+        det[det == 0] = np.inf
+
+        delta = np.empty((active.size, 2), dtype=np.double)
+        delta[:, 0] = (j11 * f - j01 * g) / det
+        delta[:, 1] = (j00 * g - j01 * f) / det
+        new_params = _clip_params(params[active] - delta, lb, ub, closed)
+        converged = np.all(
+            np.abs(delta) <= tol * np.maximum(1., ub - lb), 1)
+        params[active] = new_params
+        active = active[~converged]
+
+    h_pnts = surface.evaluate_many(params[:, 0], params[:, 1])
+    foot_pnts = fdn.get_cartesian_points(h_pnts)
+    dists = np.sqrt(np.sum((foot_pnts - pnts)**2, 1))
+    return params, foot_pnts, dists
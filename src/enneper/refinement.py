@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import cfoundation as cfdn
+
+
+# All functions work on axis 0 of ctrl_pnts, so any trailing axes (e.g. the
+# v-direction of a surface control net) are processed in one go.
+
+
+def get_multiplicity(u, knots):
+    return int(np.sum(knots == u))
+
+
+def insert_knot(ctrl_pnts, knots, deg, u, r=1):
+
+    # see "The NURBS Book" 2nd edition: algorithm A5.1
+    knots = np.asarray(knots, dtype=np.double)
+    index = cfdn.get_index(u, deg, knots)
+    s = get_multiplicity(u, knots)
+    r = min(r, deg - s)
+    if r <= 0:
+        return ctrl_pnts.copy(), knots.copy()
+
+    # load new knot vector
+    new_knots = np.insert(knots, index + 1, [u] * r)
+
+    # save unaltered control points
+    n = len(ctrl_pnts)
+    new_ctrl_pnts = np.empty((n + r,) + ctrl_pnts.shape[1:], np.double)
+    new_ctrl_pnts[:index - deg + 1] = ctrl_pnts[:index - deg + 1]
+    new_ctrl_pnts[index - s + r:] = ctrl_pnts[index - s:]
+    tmp = ctrl_pnts[index - deg:index - s + 1].copy()
+
+    # insert the knot r times
+    for j in range(1, r + 1):
+        lb = index - deg + j
+        for i in range(deg - j - s + 1):
+            alpha = (u - knots[lb + i]) / \
+                (knots[i + index + 1] - knots[lb + i])
+            tmp[i] = alpha * tmp[i + 1] + (1. - alpha) * tmp[i]
+        new_ctrl_pnts[lb] = tmp[0]
+        new_ctrl_pnts[index + r - j - s] = tmp[deg - j - s]
+
+    # load remaining control points
+    new_ctrl_pnts[lb + 1:index - s] = tmp[1:index - s - lb]
+    return new_ctrl_pnts, new_knots
+
+
+def refine_knots(ctrl_pnts, knots, deg, new_knots):
+
+    # see "The NURBS Book" 2nd edition: algorithm A5.4
+    knots = np.asarray(knots, dtype=np.double)
+    xs = np.sort(np.asarray(new_knots, dtype=np.double))
+
+    # the end knots already have full multiplicity
+    xs = xs[(xs > knots[deg]) & (xs < knots[len(knots) - deg - 1])]
+    if xs.size == 0:
+        return ctrl_pnts.copy(), knots.copy()
+
+    n, m, r = len(ctrl_pnts) - 1, len(knots) - 1, xs.size - 1
+    a = cfdn.get_index(xs[0], deg, knots)
+    b = cfdn.get_index(xs[r], deg, knots) + 1
+
+    # save unaltered control points and knots
+    q_pnts = np.empty((n + r + 2,) + ctrl_pnts.shape[1:], np.double)
+    q_pnts[:a - deg + 1] = ctrl_pnts[:a - deg + 1]
+    q_pnts[b + r:] = ctrl_pnts[b - 1:]
+    q_knots = np.empty(m + r + 2, np.double)
+    q_knots[:a + 1] = knots[:a + 1]
+    q_knots[b + deg + r + 1:] = knots[b + deg:]
+
+    i, k = b + deg - 1, b + deg + r
+    for j in range(r, -1, -1):
+        while xs[j] <= knots[i] and i > a:
+            q_pnts[k - deg - 1] = ctrl_pnts[i - deg - 1]
+            q_knots[k] = knots[i]
+            k -= 1
+            i -= 1
+        q_pnts[k - deg - 1] = q_pnts[k - deg]
+        for l in range(1, deg + 1):
+            ind = k - deg + l
+            alpha = q_knots[k + l] - xs[j]
+            if alpha == 0.:
+                q_pnts[ind - 1] = q_pnts[ind]
+            else:
+                alpha /= q_knots[k + l] - knots[i - deg + l]
+                q_pnts[ind - 1] = alpha * q_pnts[ind - 1] + \
+                    (1. - alpha) * q_pnts[ind]
+        q_knots[k] = xs[j]
+        k -= 1
+    return q_pnts, q_knots
+
+
+def get_breakpoints(knots, deg):
+    knots = np.asarray(knots, dtype=np.double)
+    return np.unique(knots[deg:len(knots) - deg])
+
+
+def decompose(ctrl_pnts, knots, deg):
+
+    # see "The NURBS Book" 2nd edition: algorithm A5.6
+    knots = np.asarray(knots, dtype=np.double)
+    m = len(knots) - 1
+    breakpoints = get_breakpoints(knots, deg)
+    segments = np.empty((len(breakpoints) - 1, deg + 1) + ctrl_pnts.shape[1:],
+                        np.double)
+    alphas = np.empty(deg, np.double)
+
+    a, b, nb = deg, deg + 1, 0
+    segments[0] = ctrl_pnts[:deg + 1]
+    while b < m:
+        i = b
+        while b < m and knots[b + 1] == knots[b]:
+            b += 1
+        mult = b - i + 1
+        if mult < deg:
+
+            # insert knot u_b r times
+            numer = knots[b] - knots[a]
+            for j in range(deg, mult, -1):
+                alphas[j - mult - 1] = numer / (knots[a + j] - knots[a])
+            r = deg - mult
+            for j in range(1, r + 1):
+                save, s = r - j, mult + j
+                for k in range(deg, s - 1, -1):
+                    alpha = alphas[k - s]
+                    segments[nb, k] = alpha * segments[nb, k] + \
+                        (1. - alpha) * segments[nb, k - 1]
+                if b < m:
+                    segments[nb + 1, save] = segments[nb, deg]
+
+        # initialize the next segment
+        nb += 1
+        if b < m:
+            segments[nb, deg - mult:] = ctrl_pnts[b - mult:b + 1]
+            a, b = b, b + 1
+    return segments, breakpoints
+
+
+def merge_knots(knots_seq, tol=1e-12):
+
+    # union of the normalized knot vectors, knots closer than tol are
+    # merged; returns the distinct knots and their multiplicity in every
+    # knot vector
+    knots_seq = [np.asarray(knots, dtype=np.double) for knots in knots_seq]
+    knots_seq = [(k - k[0]) / (k[-1] - k[0]) for k in knots_seq]
+    values = np.unique(np.concatenate(knots_seq))
+    values = values[np.append(True, np.diff(values) > tol)]
+
+    mults = np.empty((len(knots_seq), len(values)), dtype=int)
+    for mult, knots in zip(mults, knots_seq):
+        indices = np.searchsorted(values, knots + tol, 'right') - 1
+        mult[:] = np.bincount(indices, minlength=len(values))
+    return values, mults
+
+
+def make_compatible(ctrl_pnts_seq, knots_seq, deg, tol=1e-12):
+
+    # refines curves of the same degree to a common knot vector in which
+    # every knot has its maximum multiplicity, curves with the same knots
+    # are refined together as one stacked array
+    values, mults = merge_knots(knots_seq, tol)
+    max_mults = np.max(mults, 0)
+    groups = dict()
+    for i, mult in enumerate(mults):
+        groups.setdefault(mult.tobytes(), list()).append(i)
+
+    result = [None] * len(ctrl_pnts_seq)
+    for indices in groups.values():
+        mult = mults[indices[0]]
+        stacked = np.stack([ctrl_pnts_seq[i] for i in indices], 1)
+        stacked, _ = refine_knots(stacked, np.repeat(values, mult), deg,
+                                  np.repeat(values, max_mults - mult))
+        for i, ctrl_pnts in zip(indices, stacked.swapaxes(0, 1)):
+            result[i] = ctrl_pnts
+    return result, np.repeat(values, max_mults)
@@ -28,9 +28,17 @@ import json
 import numpy as np
 
 # project packages
+import binary
+import cache
 import cfoundation as cfdn
+import construction
+import fitting
 import foundation as fdn
+import intersection
 import matrices
+import projection
+import refinement as rfn
+import tessellation
 
 
 __all__ = ['Surface']
@@ -38,8 +46,9 @@ __all__ = ['Surface']
 
 class Surface(object):
 
-    def __init__(self, ctrl_pnts, knots_u, knots_v):
-        self.ctrl_pnts = np.asarray(ctrl_pnts, dtype=np.double)
+    def __init__(self, ctrl_pnts, knots_u, knots_v, dtype=None):
+        self.ctrl_pnts, is_new = fdn.get_ctrl_pnts(ctrl_pnts, dtype)
+        self._owned_ctrl_pnts = self.ctrl_pnts if is_new else None
         self.knots_u = np.asarray(knots_u, dtype=np.double)
         self.knots_v = np.asarray(knots_v, dtype=np.double)
 
@@ -56,27 +65,62 @@ class Surface(object):
         knots_v = surface.knots_v.copy()
 
         # call designated initializer
-        return cls(ctrl_pnts, knots_u, knots_v)
+        return fdn.hand_over(cls(ctrl_pnts, knots_u, knots_v))
+
+    @classmethod
+    def fit(cls, pnts, deg_u, deg_v, n_ctrl_u=None, n_ctrl_v=None,
+            params=None, smoothing=0., method='chord'):
+        return fdn.hand_over(cls(*fitting.fit_surface(
+            pnts, deg_u, deg_v, n_ctrl_u, n_ctrl_v, params, smoothing,
+            method)))
 
     @classmethod
     def from_json(cls, file_like_obj):
         return cls(**json.load(file_like_obj))
 
+    @classmethod
+    def from_binary(cls, file_like_obj, mmap_mode=None):
+        _, arrays = binary.load(file_like_obj, 'surface', mmap_mode)
+        return cls(**arrays)
+
     @classmethod
     def from_extrude_curve(cls, curve, vector):
 
         i, j = curve.ctrl_pnts.shape
-        ctrl_pnt = np.zeros((i, 2, j), np.double)
+        ctrl_pnt = np.zeros((i, 2, j), curve.ctrl_pnts.dtype)
 
-        ctrl_pnt[:, 0] = curve.ctrl_pnts.copy()
+        ctrl_pnt[:, 0] = curve.ctrl_pnts
+        ctrl_pnt[:, 1] = curve.ctrl_pnts
 
-        matrix = matrices.translate(vector)
-        ctrl_pnt[:, 1] = np.dot(matrix, ctrl_pnt[:, 0].transpose()).transpose()
+        matrices.apply(matrices.translate(vector), ctrl_pnt[:, 1])
 
         knot_u = curve.knots.copy()
         knot_v = np.asarray([0, 0, 1, 1], dtype=np.double)
 
-        return cls(ctrl_pnt, knot_u, knot_v)
+        return fdn.hand_over(cls(ctrl_pnt, knot_u, knot_v))
+
+    @classmethod
+    def from_revolve_curve(cls, curve, pos_v, dir_v, angle=2 * np.pi):
+        ctrl_pnts, knots_u = construction.revolve(curve.ctrl_pnts, pos_v,
+                                                  dir_v, angle)
+        return fdn.hand_over(cls(ctrl_pnts, knots_u, curve.knots.copy(),
+                                 curve.ctrl_pnts.dtype))
+
+    @classmethod
+    def from_skin_curves(cls, curves, deg_v=3, params=None):
+        degs = set(curve.deg for curve in curves)
+        if len(degs) != 1:
+            raise ValueError('all curves must have the same degree')
+        ctrl_pnts = [curve.ctrl_pnts for curve in curves]
+        return fdn.hand_over(cls(*construction.skin(
+            ctrl_pnts, [curve.knots for curve in curves], degs.pop(), deg_v,
+            params), dtype=np.result_type(*ctrl_pnts)))
+
+    @classmethod
+    def from_sweep_curve(cls, profile, trajectory, n_sections=None):
+        dtype = np.result_type(profile.ctrl_pnts, trajectory.ctrl_pnts)
+        return fdn.hand_over(cls(
+            *construction.sweep(profile, trajectory, n_sections), dtype=dtype))
 
 ###############################################################################
 # properties
@@ -100,7 +144,8 @@ class Surface(object):
         knots_u, knots_v = self.knots_u, self.knots_v
         deg_u, deg_v = self.deg_u, self.deg_v
 
-        # low level nurbs function written in cython
+        # low level nurbs function written in cython, single parameters
+        # bypass the cache
         index_u = cfdn.get_index(u, deg_u, knots_u)
         basis_funs_u = np.empty((deg_u + 1, 1, 1), dtype=np.double)
         cfdn.calc_basis_funs(index_u, u, deg_u, knots_u, basis_funs_u[:, 0, 0])
@@ -114,7 +159,163 @@ class Surface(object):
         lb_u, ub_u = index_u - deg_u, index_u + 1
         lb_v, ub_v = index_v - deg_v, index_v + 1
         tmp = np.sum(self.ctrl_pnts[lb_u:ub_u, lb_v:ub_v] * basis_funs_u, 0)
-        return np.sum(tmp * basis_funs_v, 0)
+        pnt = np.sum(tmp * basis_funs_v, 0)
+        return pnt.astype(self.ctrl_pnts.dtype, copy=False)
+
+    def evaluate_many(self, us, vs, out=None, cartesian=False):
+
+        # the compiled kernel needs contiguous arrays, the points have the
+        # precision of the control points; cartesian points are divided by
+        # their weight in the same pass
+        us = np.ascontiguousarray(us, dtype=np.double)
+        vs = np.ascontiguousarray(vs, dtype=np.double)
+        ctrl_pnts = np.ascontiguousarray(self.ctrl_pnts)
+        knots_u = np.ascontiguousarray(self.knots_u)
+        knots_v = np.ascontiguousarray(self.knots_v)
+
+        shape = (us.size, ctrl_pnts.shape[2] - bool(cartesian))
+        if out is None:
+            out = np.empty(shape, ctrl_pnts.dtype)
+        else:
+            fdn.check_out(out, shape, ctrl_pnts.dtype)
+
+        # low level nurbs function written in cython
+        if cache.get_cache() is None:
+            cfdn.evaluate_surface(us, vs, self.deg_u, self.deg_v,
+                                  knots_u, knots_v, ctrl_pnts, out, cartesian)
+        else:
+            indices_u, basis_funs_u = cache.get_basis_funs(
+                us, self.deg_u, knots_u)
+            indices_v, basis_funs_v = cache.get_basis_funs(
+                vs, self.deg_v, knots_v)
+            cfdn.contract_surface(indices_u, basis_funs_u, indices_v,
+                                  basis_funs_v, ctrl_pnts, out, cartesian)
+        return out
+
+    def evaluate_grid(self, us, vs, out=None):
+
+        # save local to avoid looking up twice or more
+        ctrl_pnts = self.ctrl_pnts
+        deg_u, deg_v = self.deg_u, self.deg_v
+        n_v, dim = ctrl_pnts.shape[1:]
+
+        # every row and column of basis functions is computed only once
+        indices_u, basis_funs_u = cache.get_basis_funs(us, deg_u, self.knots_u)
+        indices_v, basis_funs_v = cache.get_basis_funs(vs, deg_v, self.knots_v)
+
+        # contract u-direction span by span: (M, n_v, dim)
+        rows = np.empty((indices_u.size, n_v, dim), dtype=ctrl_pnts.dtype)
+        for index in np.unique(indices_u):
+            mask = indices_u == index
+            block = ctrl_pnts[index - deg_u:index + 1].reshape(deg_u + 1, -1)
+            rows[mask] = np.dot(basis_funs_u[mask], block).reshape(
+                -1, n_v, dim)
+
+        if out is None:
+            out = np.empty((indices_u.size, indices_v.size, dim),
+                           ctrl_pnts.dtype)
+
+        # contract v-direction span by span: (M, N, dim)
+        for index in np.unique(indices_v):
+            mask = indices_v == index
+            block = rows[:, index - deg_v:index + 1].transpose(0, 2, 1)
+            out[:, mask] = np.dot(
+                block, basis_funs_v[mask].T).transpose(0, 2, 1)
+        return out
+
+    def derivatives_many(self, us, vs, n_ders, cartesian=False, dtype=None):
+
+        # see "The NURBS Book" 2nd edition: algorithm A2.3 and A3.6
+        deg_u, deg_v = self.deg_u, self.deg_v
+        indices_u, ders_u = fdn.get_ders_basis_funs(
+            us, deg_u, n_ders, self.knots_u)
+        indices_v, ders_v = fdn.get_ders_basis_funs(
+            vs, deg_v, n_ders, self.knots_v)
+
+        # control points of every span: (N, deg_u + 1, deg_v + 1, dim)
+        indices_u = indices_u[:, None, None] + np.arange(-deg_u, 1)[:, None]
+        indices_v = indices_v[:, None, None] + np.arange(-deg_v, 1)
+        ctrl_pnts = self.ctrl_pnts[indices_u, indices_v]
+
+        # contract u-direction first, then v-direction
+        tmp = np.einsum('nki,nijd->nkjd', ders_u, ctrl_pnts)
+        h_ders = np.einsum('nlj,nkjd->nkld', ders_v, tmp)
+
+        # quotient rule for the homogeneous control points; the derivatives
+        # have the precision of the control points unless dtype is given
+        ders = fdn.get_cartesian_surface_ders(h_ders) if cartesian else h_ders
+        return ders.astype(fdn.get_precision(self.ctrl_pnts.dtype, dtype),
+                           copy=False)
+
+    def normals(self, us, vs):
+        ders = self.derivatives_many(us, vs, 1, cartesian=True)
+        normals = np.cross(ders[:, 1, 0], ders[:, 0, 1])
+        return normals / np.sqrt(np.sum(normals * normals, -1))[:, None]
+
+    def closest_points(self, pnts, seed_index=None):
+        return projection.project_points_to_surface(self, pnts, seed_index)
+
+    def intersect_rays(self, origins, dirs):
+        return intersection.intersect_rays(self, origins, dirs)
+
+    def slice(self, plane_normal, offsets, n_samples=4):
+        return intersection.slice_surface(self, plane_normal, offsets,
+                                          n_samples=n_samples)
+
+    def tessellate(self, tol, max_level=10):
+        return tessellation.tessellate(self, tol, max_level)
+
+    def insert_knot_u(self, u, r=1):
+        ctrl_pnts, knots_u = rfn.insert_knot(
+            self.ctrl_pnts, self.knots_u, self.deg_u, u, r)
+        return fdn.hand_over(
+            self.__class__(ctrl_pnts, knots_u, self.knots_v.copy()))
+
+    def insert_knot_v(self, v, r=1):
+        ctrl_pnts, knots_v = rfn.insert_knot(
+            self.ctrl_pnts.swapaxes(0, 1), self.knots_v, self.deg_v, v, r)
+        return fdn.hand_over(self.__class__(
+            ctrl_pnts.swapaxes(0, 1).copy(), self.knots_u.copy(), knots_v))
+
+    def refine_knots(self, new_knots_u=(), new_knots_v=()):
+
+        # refine u-direction
+        ctrl_pnts, knots_u = rfn.refine_knots(
+            self.ctrl_pnts, self.knots_u, self.deg_u, new_knots_u)
+
+        # refine v-direction
+        ctrl_pnts, knots_v = rfn.refine_knots(
+            ctrl_pnts.swapaxes(0, 1), self.knots_v, self.deg_v, new_knots_v)
+
+        ctrl_pnts = ctrl_pnts.swapaxes(0, 1).copy()
+        return fdn.hand_over(self.__class__(ctrl_pnts, knots_u, knots_v))
+
+    def decompose(self):
+
+        # decompose u-direction: (n_seg_u, deg_u + 1, n_v, dim)
+        segments, breakpoints_u = rfn.decompose(
+            self.ctrl_pnts, self.knots_u, self.deg_u)
+
+        # decompose v-direction: (n_seg_v, deg_v + 1, n_seg_u, deg_u + 1, dim)
+        segments, breakpoints_v = rfn.decompose(
+            segments.transpose(2, 0, 1, 3), self.knots_v, self.deg_v)
+
+        # patches: (n_seg_u, n_seg_v, deg_u + 1, deg_v + 1, dim)
+        patches = segments.transpose(2, 0, 3, 1, 4).copy()
+        return patches, breakpoints_u, breakpoints_v
+
+    def astype(self, dtype):
+        return fdn.hand_over(self.__class__(
+            self.ctrl_pnts.astype(dtype), self.knots_u.copy(),
+            self.knots_v.copy(), dtype))
+
+    def transform(self, matrix):
+
+        # control points of the caller or of a memory map are copied once,
+        # owned ones are transformed in place
+        if self.ctrl_pnts is not self._owned_ctrl_pnts:
+            self.ctrl_pnts = self._owned_ctrl_pnts = np.array(self.ctrl_pnts)
+        matrices.apply(matrix, self.ctrl_pnts)
 
     def export(self, file_like_obj, indent=None):
 
@@ -126,3 +327,8 @@ class Surface(object):
 
         # export
         json.dump(obj_to_serialize, file_like_obj, indent=indent)
+
+    def export_binary(self, file_like_obj):
+        arrays = [('ctrl_pnts', self.ctrl_pnts), ('knots_u', self.knots_u),
+                  ('knots_v', self.knots_v)]
+        binary.dump(file_like_obj, 'surface', arrays)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import refinement as rfn
+
+
+def get_flatness_error(surface, u0, u1, v0, v1):
+
+    # corners, edge midpoints and center of every cell
+    um, vm = .5 * (u0 + u1), .5 * (v0 + v1)
+    us = np.concatenate((u0, u1, u0, u1, um, u1, um, u0, um))
+    vs = np.concatenate((v0, v0, v1, v1, v0, vm, v1, vm, vm))
+    pnts = surface.evaluate_many(us, vs, cartesian=True)
+    p00, p10, p01, p11, bottom, right, top, left, center = \
+        pnts.reshape(9, u0.size, -1)
+
+    # deviation of the surface from the chords and the bilinear patch
+    errors = [bottom - .5 * (p00 + p10), right - .5 * (p10 + p11),
+              top - .5 * (p01 + p11), left - .5 * (p00 + p01),
+              center - .25 * (p00 + p10 + p01 + p11)]
+    errors = np.sqrt(np.sum(np.square(errors), -1))
+    return np.max(errors, 0)
+
+
+def subdivide(surface, tol, max_level=10):
+
+    # initial cells are the knot spans
+    breakpoints_u = rfn.get_breakpoints(surface.knots_u, surface.deg_u)
+    breakpoints_v = rfn.get_breakpoints(surface.knots_v, surface.deg_v)
+    u0, v0 = np.meshgrid(breakpoints_u[:-1], breakpoints_v[:-1])
+    u1, v1 = np.meshgrid(breakpoints_u[1:], breakpoints_v[1:])
+    cells = [c.ravel() for c in (u0, u1, v0, v1)]
+
+    # split all cells of a level at once until they are flat enough
+    leaves = []
+    for level in range(max_level + 1):
+        if level == max_level:
+            leaves.append(cells)
+            break
+        split = get_flatness_error(surface, *cells) > tol
+        leaves.append([c[~split] for c in cells])
+        if not split.any():
+            break
+        u0, u1, v0, v1 = [c[split] for c in cells]
+        um, vm = .5 * (u0 + u1), .5 * (v0 + v1)
+        cells = [np.concatenate((u0, um, u0, um)),
+                 np.concatenate((um, u1, um, u1)),
+                 np.concatenate((v0, v0, vm, vm)),
+                 np.concatenate((vm, vm, v1, v1))]
+    return [np.concatenate(c) for c in zip(*leaves)]
+
+
+def _count_inner_pnts(keys, line, lb, ub):
+
+    # complex numbers sort lexicographically, i.e. by line first
+    return np.searchsorted(keys, line + 1j * ub, 'left') - \
+        np.searchsorted(keys, line + 1j * lb, 'right')
+
+
+def _get_inner_pnts(keys, line, lb, ub):
+    i0 = np.searchsorted(keys, line + 1j * lb, 'right')
+    i1 = np.searchsorted(keys, line + 1j * ub, 'left')
+    return keys[i0:i1].imag
+
+
+def triangulate(u0, u1, v0, v1):
+
+    # every corner of a cell is a vertex of the mesh
+    us = np.concatenate((u0, u1, u1, u0))
+    vs = np.concatenate((v0, v0, v1, v1))
+    vertices, ids = np.unique(us + 1j * vs, return_inverse=True)
+    ids = ids.reshape(4, -1)
+
+    # vertices sorted along the iso lines v = const and u = const
+    rows, cols = np.unique(vs + 1j * us), vertices
+    counts = _count_inner_pnts(rows, v0, u0, u1) + \
+        _count_inner_pnts(cols, u1, v0, v1) + \
+        _count_inner_pnts(rows, v1, u0, u1) + \
+        _count_inner_pnts(cols, u0, v0, v1)
+    simple = counts == 0
+
+    # cells without hanging vertices are split into two triangles
+    triangles = [ids[[0, 1, 2]][:, simple].T, ids[[0, 2, 3]][:, simple].T]
+
+    # the boundary polygon (counterclockwise) of all other cells includes
+    # the hanging vertices of smaller neighbours, so that no cracks arise
+    centers = list()
+    for a, b, c, d in zip(u0[~simple], u1[~simple], v0[~simple], v1[~simple]):
+        polygon = [a + 1j * c]
+        polygon.extend(_get_inner_pnts(rows, c, a, b) + 1j * c)
+        polygon.append(b + 1j * c)
+        polygon.extend(b + 1j * _get_inner_pnts(cols, b, c, d))
+        polygon.append(b + 1j * d)
+        polygon.extend(_get_inner_pnts(rows, d, a, b)[::-1] + 1j * d)
+        polygon.append(a + 1j * d)
+        polygon.extend(a + 1j * _get_inner_pnts(cols, a, c, d)[::-1])
+
+        # fan around the center of the cell
+        polygon = np.searchsorted(vertices, polygon)
+        fan = np.empty((len(polygon), 3), dtype=np.intp)
+        fan[:, 0] = len(vertices) + len(centers)
+        fan[:, 1] = polygon
+        fan[:, 2] = np.roll(polygon, -1)
+        triangles.append(fan)
+        centers.append(.5 * (a + b) + .5j * (c + d))
+
+    vertices = np.concatenate((vertices, centers))
+    params = np.column_stack((vertices.real, vertices.imag))
+    triangles = np.ascontiguousarray(np.concatenate(triangles), np.intc)
+    return params, triangles
+
+
+def tessellate(surface, tol, max_level=10):
+    params, triangles = triangulate(*subdivide(surface, tol, max_level))
+    vertices = surface.evaluate_many(params[:, 0], params[:, 1],
+                                     cartesian=True)
+    return vertices, triangles, params
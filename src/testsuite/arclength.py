@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.arclength as al
+import testsuite.curve as tc
+
+
+class TestArcLength(unittest.TestCase):
+
+    def test_length(self):
+
+        # test circular arcs
+        for angle in [.3, np.pi, 1.7 * np.pi]:
+            arc = enneper.primitives.CircularArc(angle)
+            self.assertAlmostEqual(arc.length(), angle, 12)
+
+    def test_get_params(self):
+
+        # construct test table
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        table = al.ArcLengthTable(curve)
+        lengths = np.linspace(0, table.length, 1001)
+
+        # test round trip
+        us = table.get_params(lengths)
+        self.assertTrue(np.all(np.diff(us) > 0))
+        self.assertEqual((us[0], us[-1]), (0, 3))
+        np.testing.assert_allclose(table.get_lengths(us), lengths,
+                                   atol=1e-12)
+
+    def test_sample_by_arclength(self):
+
+        # construct test curve
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        pnts = curve.sample_by_arclength(200)
+        self.assertEqual(pnts.shape, (200, 3))
+
+        # chords of equally spaced points are nearly equal
+        pnts = pnts[:, :-1] / pnts[:, -1:]
+        chords = np.sqrt(np.sum(np.diff(pnts, axis=0)**2, -1))
+        np.testing.assert_allclose(chords, curve.length() / 199, rtol=1e-3)
+
+        # test spacing
+        pnts = curve.sample_by_arclength(spacing=.5)
+        self.assertEqual(len(pnts), int(np.ceil(curve.length() / .5)))
+        with self.assertRaises(ValueError):
+            curve.sample_by_arclength()
+
+    def test_table_cache(self):
+
+        # construct test curve
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        table = curve.get_arclength_table()
+        self.assertIs(curve.get_arclength_table(), table)
+
+        # the table is rebuilt after in-place transforms
+        length = curve.length()
+        curve.transform(enneper.matrices.scale([2, 2]))
+        self.assertIsNot(curve.get_arclength_table(), table)
+        self.assertAlmostEqual(curve.length(), 2 * length, 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
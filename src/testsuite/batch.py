@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import cStringIO
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import testsuite.curve as tc
+import testsuite.surface as ts
+
+
+class TestCurveBatch(unittest.TestCase):
+
+    def setUp(self):
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        self.curves = [curve, curve.refine_knots([0.5, 1.5, 2.5]),
+                       curve.insert_knot(1.25)]
+        self.batch = enneper.batch.CurveBatch.from_curves(self.curves)
+
+    def test_from_curves_constructor(self):
+
+        # test
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch.deg, tc.DEG)
+        np.testing.assert_equal(self.batch.counts, [5, 8, 6])
+        for actual, desired in zip(self.batch.to_curves(), self.curves):
+            np.testing.assert_equal(actual.ctrl_pnts, desired.ctrl_pnts)
+            np.testing.assert_equal(actual.knots, desired.knots)
+
+    def test_mixed_degrees(self):
+
+        # test
+        line = enneper.Curve([[0, 0, 1], [1, 1, 1]], [0, 0, 1, 1])
+        with self.assertRaises(ValueError):
+            enneper.batch.CurveBatch.from_curves(self.curves + [line])
+
+    def test_evaluate_many(self):
+
+        # shared parameters
+        us = np.linspace(0, 3, 31)
+        actual = self.batch.evaluate_many(us)
+        self.assertEqual(actual.shape, (3, 31, 3))
+        for pnts, curve in zip(actual, self.curves):
+            np.testing.assert_equal(pnts, curve.evaluate_many(us))
+
+        # parameters per curve
+        us = np.random.RandomState(0).uniform(0, 3, (3, 17))
+        actual = self.batch.evaluate_many(us)
+        for pnts, curve, curve_us in zip(actual, self.curves, us):
+            np.testing.assert_equal(pnts, curve.evaluate_many(curve_us))
+
+        # cartesian points
+        actual = self.batch.evaluate_many(us, cartesian=True)
+        self.assertEqual(actual.shape, (3, 17, 2))
+        for pnts, curve, curve_us in zip(actual, self.curves, us):
+            np.testing.assert_equal(
+                pnts, curve.evaluate_many(curve_us, cartesian=True))
+
+    def test_transform(self):
+
+        # construct test matrix
+        matrix = enneper.matrices.translate([1, 2])
+        self.batch.transform(matrix)
+
+        # test
+        for actual, desired in zip(self.batch.to_curves(), self.curves):
+            desired.transform(matrix)
+            np.testing.assert_allclose(actual.ctrl_pnts, desired.ctrl_pnts)
+
+    def test_export(self):
+
+        # test json and binary round trip
+        for export, load in [('export', 'from_json'),
+                             ('export_binary', 'from_binary')]:
+            file_like_obj = cStringIO.StringIO()
+            getattr(self.batch, export)(file_like_obj)
+            file_like_obj.seek(0)
+            batch = getattr(enneper.batch.CurveBatch, load)(file_like_obj)
+            np.testing.assert_equal(batch.ctrl_pnts, self.batch.ctrl_pnts)
+            np.testing.assert_equal(batch.knots, self.batch.knots)
+            np.testing.assert_equal(batch.counts, self.batch.counts)
+            self.assertEqual(batch.deg, self.batch.deg)
+            file_like_obj.close()
+
+
+class TestSurfaceBatch(unittest.TestCase):
+
+    def setUp(self):
+        surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+        self.surfaces = [surface, surface.refine_knots([0.1], [0.3, 0.7])]
+        self.batch = enneper.batch.SurfaceBatch.from_surfaces(self.surfaces)
+
+    def test_from_surfaces_constructor(self):
+
+        # test
+        self.assertEqual(len(self.batch), 2)
+        for actual, desired in zip(self.batch.to_surfaces(), self.surfaces):
+            np.testing.assert_equal(actual.ctrl_pnts, desired.ctrl_pnts)
+            np.testing.assert_equal(actual.knots_u, desired.knots_u)
+            np.testing.assert_equal(actual.knots_v, desired.knots_v)
+
+    def test_evaluate_many(self):
+
+        # construct test parameters
+        random_state = np.random.RandomState(0)
+        us, vs = random_state.uniform(0, 1, (2, 2, 23))
+
+        # test
+        actual = self.batch.evaluate_many(us, vs)
+        self.assertEqual(actual.shape, (2, 23, 4))
+        for pnts, surface, u, v in zip(actual, self.surfaces, us, vs):
+            np.testing.assert_equal(pnts, surface.evaluate_many(u, v))
+
+        # cartesian points
+        actual = self.batch.evaluate_many(us, vs, cartesian=True)
+        self.assertEqual(actual.shape, (2, 23, 3))
+        for pnts, surface, u, v in zip(actual, self.surfaces, us, vs):
+            np.testing.assert_equal(
+                pnts, surface.evaluate_many(u, v, cartesian=True))
+
+    def test_evaluate_many_float32(self):
+
+        # test: single precision surfaces give single precision batches
+        surfaces = [surface.astype(np.float32) for surface in self.surfaces]
+        batch = enneper.batch.SurfaceBatch.from_surfaces(surfaces)
+        self.assertEqual(batch.ctrl_pnts.dtype, np.float32)
+        us = np.linspace(0, 1, 9)
+        actual = batch.evaluate_many(us, us[::-1])
+        self.assertEqual(actual.dtype, np.float32)
+        for pnts, surface in zip(actual, surfaces):
+            np.testing.assert_equal(pnts, surface.evaluate_many(us, us[::-1]))
+
+    def test_export_binary(self):
+
+        # test
+        file_like_obj = cStringIO.StringIO()
+        self.batch.export_binary(file_like_obj)
+        file_like_obj.seek(0)
+        batch = enneper.batch.SurfaceBatch.from_binary(file_like_obj)
+        np.testing.assert_equal(batch.ctrl_pnts, self.batch.ctrl_pnts)
+        np.testing.assert_equal(batch.counts, self.batch.counts)
+        self.assertEqual((batch.deg_u, batch.deg_v), (2, 2))
+        file_like_obj.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+from __future__ import absolute_import
+import cStringIO
+import unittest
+
+# project packages
+import benchmarks.cases as cases
+import benchmarks.harness as harness
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_get_cases(self):
+
+        # test: keys are unique and the quick suite is a subset
+        keys = [harness.get_key(c.name, c.params) for c in cases.get_cases()]
+        quick_keys = [harness.get_key(c.name, c.params)
+                      for c in cases.get_cases(quick=True)]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertTrue(set(quick_keys) < set(keys))
+        self.assertIn('Curve.evaluate_at[deg=7,n_knots=256,n_samples=1000]',
+                      keys)
+
+    def test_run(self):
+
+        # run the cheapest benchmarks
+        report = harness.run(cases.get_cases(quick=True), repeat=2,
+                             min_time=1e-3, pattern='primitives.*')
+
+        # test
+        self.assertEqual(len(report['results']), 4)
+        for result in report['results']:
+            self.assertTrue(0 < result['best'] <= result['median'])
+        file_like_obj = cStringIO.StringIO()
+        harness.dump(report, file_like_obj)
+        file_like_obj.seek(0)
+        self.assertEqual(harness.load(file_like_obj), report)
+
+    def test_compare(self):
+
+        # construct test data
+        def get_report(timings):
+            results = [dict(key=k, best=t) for k, t in timings.items()]
+            return dict(results=results)
+        baseline = get_report(dict(a=1., b=1., c=1., d=1.))
+        current = get_report(dict(a=1.05, b=1.5, c=.5, e=1.))
+
+        # test
+        rows = harness.compare(baseline, current, threshold=.1)
+        status = dict((row['key'], row['status']) for row in rows)
+        self.assertEqual(status, dict(a='same', b='slower', c='faster'))
+
+
+if __name__ == '__main__':
+    unittest.main()
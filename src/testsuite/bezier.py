@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import testsuite.curve as tc
+import testsuite.surface as ts
+
+
+class TestBezier(unittest.TestCase):
+
+    def test_power_basis_matrix(self):
+
+        # (1 - t)**2, 2 * t * (1 - t), t**2
+        matrix = enneper.bezier.get_power_basis_matrix(2)
+        np.testing.assert_equal(matrix, [[1, 0, 0], [-2, 2, 0], [1, -2, 1]])
+
+    def test_curve_engine(self):
+
+        # test against the B-spline evaluation
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        engine = enneper.bezier.BezierCurveEngine.from_curve(curve)
+        us = np.linspace(0, 3, 31)
+        np.testing.assert_almost_equal(
+            engine.evaluate_many(us), curve.evaluate_many(us))
+
+    def test_curve_engine_sample(self):
+
+        # test
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        engine = enneper.bezier.BezierCurveEngine.from_curve(curve)
+        pnts = engine.sample(4)
+        self.assertEqual(pnts.shape, (3, 4, 3))
+        np.testing.assert_almost_equal(
+            pnts[1], curve.evaluate_many(np.linspace(1, 2, 4)))
+
+    def test_surface_engine(self):
+
+        # test against the B-spline evaluation
+        surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+        engine = enneper.bezier.BezierSurfaceEngine.from_surface(surface)
+        us, vs = np.linspace(0, 1, 13), np.linspace(1, 0, 7)
+        np.testing.assert_almost_equal(
+            engine.evaluate_grid(us, vs), surface.evaluate_grid(us, vs))
+        np.testing.assert_almost_equal(
+            engine.evaluate_many(us[:7], vs),
+            surface.evaluate_many(us[:7], vs))
+
+
+if __name__ == '__main__':
+    unittest.main()
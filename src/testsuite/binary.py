@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import cStringIO
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper.binary as bny
+
+
+class TestBinary(unittest.TestCase):
+
+    def setUp(self):
+        self.file_like_obj = cStringIO.StringIO()
+
+    def tearDown(self):
+        self.file_like_obj.close()
+
+    def test_layout(self):
+
+        # blocks are aligned and the record size is part of the header
+        arrays = [('a', np.arange(3.)), ('b', np.ones((2, 5)))]
+        bny.dump(self.file_like_obj, 'test', arrays)
+        self.file_like_obj.seek(0)
+        header = bny.load_header(self.file_like_obj)
+        self.assertEqual(header['kind'], 'test')
+        self.assertEqual(header['size'], len(self.file_like_obj.getvalue()))
+        for entry in header['arrays']:
+            self.assertEqual(entry['offset'] % bny.ALIGNMENT, 0)
+
+    def test_consecutive_records(self):
+
+        # load leaves the file at the end of the record
+        bny.dump(self.file_like_obj, 'first', [('a', [1, 2])])
+        bny.dump(self.file_like_obj, 'second', [('a', [[3.5]])])
+        self.file_like_obj.seek(0)
+        kind, arrays = bny.load(self.file_like_obj)
+        self.assertEqual(kind, 'first')
+        np.testing.assert_equal(arrays['a'], [1, 2])
+        kind, arrays = bny.load(self.file_like_obj)
+        self.assertEqual(kind, 'second')
+        np.testing.assert_equal(arrays['a'], [[3.5]])
+        self.assertRaises(EOFError, bny.load, self.file_like_obj)
+
+    def test_wrong_kind(self):
+        bny.dump(self.file_like_obj, 'curve', [('a', [1, 2])])
+        self.file_like_obj.seek(0)
+        self.assertRaises(bny.BinaryFormatError, bny.load,
+                          self.file_like_obj, 'surface')
+
+    def test_no_record(self):
+        self.file_like_obj.write('{"ctrl_pnts": []}')
+        self.file_like_obj.seek(0)
+        self.assertRaises(bny.BinaryFormatError, bny.load, self.file_like_obj)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.bvh as bvh
+import testsuite.surface as ts
+
+
+class TestBoundingVolumeHierarchy(unittest.TestCase):
+
+    def setUp(self):
+
+        # three copies of the test surface along the x-axis
+        self.surfaces = list()
+        for x in [0, 3, 6]:
+            surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+            surface.transform(enneper.matrices.translate([x, 0, 0]))
+            self.surfaces.append(surface)
+        self.bvh = bvh.BoundingVolumeHierarchy.from_surfaces(self.surfaces)
+
+    def test_from_surfaces_constructor(self):
+
+        # test: one leaf per Bezier patch
+        self.assertEqual(len(self.bvh.lows), 3 * 4 * 2)
+        np.testing.assert_equal(self.bvh.offsets, [0, 8, 16, 24])
+        np.testing.assert_equal(self.bvh.ranges[1], [0, .25, .5, 1])
+        root_low, root_high = self.bvh.levels[0]
+        np.testing.assert_equal(root_low[0], np.min(self.bvh.lows, 0))
+        np.testing.assert_equal(root_high[0], np.max(self.bvh.highs, 0))
+
+    def test_query_boxes(self):
+
+        # construct test boxes
+        random_state = np.random.RandomState(0)
+        lows = random_state.uniform(-2, 8, (50, 3))
+        highs = lows + random_state.uniform(0, 1, (50, 3))
+
+        # test against brute force
+        queries, leaves = self.bvh.query_boxes(lows, highs)
+        for i in xrange(50):
+            hits = np.all((self.bvh.lows <= highs[i]) &
+                          (self.bvh.highs >= lows[i]), 1)
+            self.assertEqual(set(leaves[queries == i]),
+                             set(np.flatnonzero(hits)))
+
+    def test_query_rays(self):
+
+        # construct test rays through points of the surfaces
+        random_state = np.random.RandomState(0)
+        us, vs = random_state.uniform(0, 1, (2, 20))
+        pnts = self.surfaces[1].evaluate_many(us, vs)
+        pnts = pnts[:, :3] / pnts[:, 3:]
+        dirs = random_state.normal(size=(20, 3))
+        origins = pnts - 5 * dirs
+
+        # test: the hit patch is among the candidates
+        rays, leaves, nears = self.bvh.query_rays(origins, dirs)
+        for i, (u, v) in enumerate(zip(us, vs)):
+            ranges = self.bvh.ranges[leaves[rays == i]]
+            is_hit = (self.bvh.surface_indices[leaves[rays == i]] == 1) & \
+                (ranges[:, 0] <= u) & (u <= ranges[:, 1]) & \
+                (ranges[:, 2] <= v) & (v <= ranges[:, 3])
+            self.assertTrue(np.any(is_hit))
+            self.assertTrue(np.all(np.diff(nears[rays == i]) >= 0))
+
+    def test_refit_surfaces(self):
+
+        # move the last surface
+        self.surfaces[2].transform(enneper.matrices.translate([0, 0, 10]))
+        self.bvh.refit_surfaces(self.surfaces, [2])
+
+        # test
+        queries, leaves = self.bvh.query_boxes([-10, -10, 9], [10, 10, 20])
+        np.testing.assert_equal(np.sort(leaves), np.arange(16, 24))
+
+
+if __name__ == '__main__':
+    unittest.main()
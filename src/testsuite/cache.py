@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import testsuite.curve as tc
+import testsuite.surface as ts
+
+
+class TestBasisCache(unittest.TestCase):
+
+    def tearDown(self):
+        enneper.cache.disable_cache()
+
+    def test_hits_and_misses(self):
+
+        # test
+        basis_cache = enneper.cache.BasisCache()
+        us = np.linspace(0, 3, 7)
+        first = basis_cache.get_basis_funs(us, tc.DEG, tc.KNOTS)
+        second = basis_cache.get_basis_funs(us, tc.DEG, tc.KNOTS)
+        self.assertIs(first, second)
+        self.assertEqual(basis_cache.hits, 1)
+        self.assertEqual(basis_cache.misses, 1)
+        self.assertFalse(first[1].flags.writeable)
+
+    def test_lru_eviction(self):
+
+        # room for exactly two entries
+        basis_cache = enneper.cache.BasisCache()
+        us = [np.linspace(0, 3, 10), np.linspace(0, 2, 10), [1] * 10]
+        n_bytes = sum(array.nbytes for array in
+                      basis_cache.get_basis_funs(us[0], tc.DEG, tc.KNOTS))
+        basis_cache.clear()
+        basis_cache.max_bytes = 2 * n_bytes
+
+        # the second parameter set is the least recently used one
+        basis_cache.get_basis_funs(us[0], tc.DEG, tc.KNOTS)
+        basis_cache.get_basis_funs(us[1], tc.DEG, tc.KNOTS)
+        basis_cache.get_basis_funs(us[0], tc.DEG, tc.KNOTS)
+        basis_cache.get_basis_funs(us[2], tc.DEG, tc.KNOTS)
+        self.assertEqual(basis_cache.evictions, 1)
+        self.assertEqual(basis_cache.stats['entries'], 2)
+        self.assertEqual(basis_cache.n_bytes, 2 * n_bytes)
+        basis_cache.get_basis_funs(us[0], tc.DEG, tc.KNOTS)
+        self.assertEqual(basis_cache.hits, 2)
+
+    def test_cached_curve_evaluation(self):
+
+        # results don't change if the cache is enabled
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        us = np.linspace(0, 3, 31)
+        desired = curve.evaluate_many(us)
+        basis_cache = enneper.cache.enable_cache()
+        for _ in range(2):
+            np.testing.assert_equal(curve.evaluate_many(us), desired)
+            np.testing.assert_equal(curve.evaluate_at(us[3]), desired[3])
+        self.assertEqual(basis_cache.hits, 1)
+
+    def test_cached_surface_evaluation(self):
+
+        # results don't change if the cache is enabled
+        surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+        us, vs = np.linspace(0, 1, 9), np.linspace(1, 0, 9)
+        desired = surface.evaluate_many(us, vs)
+        desired_grid = surface.evaluate_grid(us, vs)
+        basis_cache = enneper.cache.enable_cache()
+        for _ in range(2):
+            np.testing.assert_equal(surface.evaluate_many(us, vs), desired)
+            np.testing.assert_equal(surface.evaluate_grid(us, vs), desired_grid)
+            np.testing.assert_equal(
+                surface.evaluate_at(us[2], vs[2]), desired[2])
+        self.assertEqual(basis_cache.hits, 6)
+
+    def test_scalar_evaluation_bypasses_cache(self):
+
+        # a sweep of single parameters must not fill the cache
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+        basis_cache = enneper.cache.enable_cache()
+        for u in np.linspace(0, 1, 11):
+            curve.evaluate_at(3 * u)
+            surface.evaluate_at(u, 1 - u)
+        self.assertEqual(basis_cache.stats['entries'], 0)
+        self.assertEqual(basis_cache.n_bytes, 0)
+        self.assertEqual(basis_cache.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
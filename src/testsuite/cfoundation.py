@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+import multiprocessing
+import os
+import unittest
+
+import numpy as np
+
+import enneper.cfoundation as cfdn
+
+
+# The NURBS Book 2nd edition: example 2.4 (page 71)
+KNOTS = np.array([0, 0, 0, 1, 2, 3, 4, 4, 5, 5, 5], dtype=np.double)
+DEG = 2
+
+
+class TestCFoundation(unittest.TestCase):
+
+    def test_get_index(self):
+        self.assertEqual(cfdn.get_index(2.5, DEG, KNOTS), 4)
+        self.assertEqual(cfdn.get_index(4, DEG, KNOTS), 7)
+        self.assertEqual(cfdn.get_index(5, DEG, KNOTS), 7)
+
+    def test_get_index_outside_domain(self):
+        self.assertEqual(cfdn.get_index(-1, DEG, KNOTS), 2)
+        self.assertEqual(cfdn.get_index(6, DEG, KNOTS), 7)
+
+    def test_calc_basis_funs(self):
+        basis_funs = np.empty(DEG + 1)
+        cfdn.calc_basis_funs(4, 2.5, DEG, KNOTS, basis_funs)
+        np.testing.assert_equal(basis_funs, [0.125, 0.75, 0.125])
+
+    def test_get_indices(self):
+
+        # sorted parameters take the linear walk, shuffled ones don't
+        us = np.linspace(-1, 6, 71)
+        shuffled = np.random.RandomState(0).permutation(us)
+        for params in (us, shuffled):
+            desired = [cfdn.get_index(u, DEG, KNOTS) for u in params]
+            indices = np.empty(params.size, dtype=np.intc)
+            cfdn.get_indices(params, DEG, KNOTS, indices)
+            np.testing.assert_equal(indices, desired)
+
+    def test_calc_basis_funs_many(self):
+        indices = np.empty(2, dtype=np.intc)
+        basis_funs = np.empty((2, DEG + 1))
+        us = np.array([2.5, 5])
+        cfdn.calc_basis_funs_many(us, DEG, KNOTS, indices, basis_funs)
+        np.testing.assert_equal(indices, [4, 7])
+        np.testing.assert_equal(basis_funs, [[0.125, 0.75, 0.125], [0, 0, 1]])
+
+    def test_calc_ders_basis_funs_many(self):
+
+        # The NURBS Book 2nd edition: example 2.4 (page 71 and page 92)
+        indices = np.empty(1, dtype=np.intc)
+        ders = np.empty((1, 4, DEG + 1))
+        us = np.array([2.5])
+        cfdn.calc_ders_basis_funs_many(us, DEG, 3, KNOTS, indices, ders)
+        np.testing.assert_equal(indices, [4])
+        np.testing.assert_equal(ders[0, 0], [0.125, 0.75, 0.125])
+        np.testing.assert_equal(ders[0, 1], [-0.5, 0, 0.5])
+        np.testing.assert_equal(ders[0, 2], [1, -2, 1])
+        np.testing.assert_equal(ders[0, 3], [0, 0, 0])
+
+    def test_threads(self):
+
+        # construct test data: several chunks of mostly sorted parameters
+        random_state = np.random.RandomState(0)
+        us = np.sort(random_state.uniform(-1, 6, 5000))
+        us[::7] = random_state.uniform(-1, 6, us[::7].size)
+        ctrl_pnts = random_state.uniform(-1, 1, (8, 4))
+
+        # test: the results don't depend on the number of threads
+        n_threads = cfdn.get_num_threads()
+        results = list()
+        try:
+            for n in (1, 3):
+                cfdn.set_num_threads(n)
+                self.assertEqual(cfdn.get_num_threads(), n)
+                indices = np.empty(us.size, dtype=np.intc)
+                basis_funs = np.empty((us.size, DEG + 1))
+                cfdn.calc_basis_funs_many(us, DEG, KNOTS, indices, basis_funs)
+                out = np.empty((us.size, 4))
+                cfdn.evaluate_curve(us, DEG, KNOTS, ctrl_pnts, out)
+                results.append((indices, basis_funs, out))
+        finally:
+            cfdn.set_num_threads(n_threads)
+        for desired, actual in zip(*results):
+            np.testing.assert_equal(actual, desired)
+        desired = [cfdn.get_index(u, DEG, KNOTS) for u in us]
+        np.testing.assert_equal(results[0][0], desired)
+        self.assertRaises(ValueError, cfdn.set_num_threads, 0)
+
+    def test_default_threads(self):
+
+        # test: OMP_NUM_THREADS is parsed like OpenMP does, bad values fall
+        # back to all cores
+        n_threads = os.environ.get('OMP_NUM_THREADS')
+        n_cores = multiprocessing.cpu_count()
+        try:
+            for value, desired in (('4,2', 4), ('3', 3), ('', n_cores),
+                                   ('x', n_cores), ('0', n_cores)):
+                os.environ['OMP_NUM_THREADS'] = value
+                self.assertEqual(cfdn._get_default_threads(), desired)
+        finally:
+            if n_threads is None:
+                del os.environ['OMP_NUM_THREADS']
+            else:
+                os.environ['OMP_NUM_THREADS'] = n_threads
+
+
+if __name__ == '__main__':
+    unittest.main()
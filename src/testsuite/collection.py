@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import os
+import shutil
+import tempfile
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import testsuite.curve as tc
+import testsuite.surface as ts
+
+
+class TestCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'collection.enb')
+        self.objs = [enneper.Curve(tc.CTRL_PNTS, tc.KNOTS),
+                     enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V),
+                     enneper.primitives.Line([0, 0, 0], [1, 2, 3])]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_objs_equal(self, actual, desired):
+        self.assertEqual(len(actual), len(desired))
+        for a, d in zip(actual, desired):
+            self.assertIs(type(a), type(d))
+            for name in vars(d):
+                if not name.startswith('_'):
+                    np.testing.assert_equal(getattr(a, name),
+                                            getattr(d, name))
+
+    def test_iterate(self):
+
+        # construct test file
+        with enneper.collection.CollectionWriter(self.filename) as writer:
+            writer.write_many(self.objs)
+
+        # test
+        with enneper.collection.CollectionReader(self.filename) as reader:
+            self.assert_objs_equal(list(reader), self.objs)
+
+    def test_append(self):
+
+        # the second writer appends to the existing file
+        with enneper.collection.CollectionWriter(self.filename) as writer:
+            writer.write(self.objs[0])
+        with enneper.collection.CollectionWriter(self.filename) as writer:
+            writer.write_many(self.objs[1:])
+
+        # test
+        with enneper.collection.CollectionReader(self.filename) as reader:
+            self.assert_objs_equal(list(reader), self.objs)
+
+    def test_random_access(self):
+
+        # construct test file
+        with enneper.collection.CollectionWriter(self.filename) as writer:
+            writer.write_many(self.objs)
+
+        # test
+        with enneper.collection.CollectionReader(self.filename, 'r') as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(reader.offsets[0], 0)
+            self.assert_objs_equal([reader[2], reader[0]], self.objs[::-2])
+            self.assert_objs_equal([reader[-2]], self.objs[1:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
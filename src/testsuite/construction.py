@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.refinement as rfn
+
+
+def get_random_params(n):
+    return np.random.RandomState(0).uniform(0, 1, (2, n))
+
+
+def get_cartesian(h_pnts):
+    return h_pnts[:, :-1] / h_pnts[:, -1:]
+
+
+class TestConstruction(unittest.TestCase):
+
+    def test_merge_knots(self):
+
+        # test
+        values, mults = rfn.merge_knots([[0, 0, 1, 1], [2, 2, 3, 4, 4],
+                                         [0, 0, .5, .5, 1, 1]])
+        np.testing.assert_equal(values, [0, .5, 1])
+        np.testing.assert_equal(mults, [[2, 0, 2], [2, 1, 2], [2, 2, 2]])
+
+    def test_from_revolve_curve(self):
+
+        # construct test surface: unit sphere from a half circle in xz-plane
+        arc = enneper.primitives.CircularArc(np.pi)
+        ctrl_pnts = np.zeros((len(arc.ctrl_pnts), 4))
+        ctrl_pnts[:, [2, 0, 3]] = arc.ctrl_pnts * [-1, 1, 1]
+        half_circle = enneper.Curve(ctrl_pnts, arc.knots)
+        sphere = enneper.Surface.from_revolve_curve(half_circle, [0, 0, 0],
+                                                    [0, 0, 1])
+
+        # test
+        self.assertEqual(sphere.ctrl_pnts.shape, (9, 5, 4))
+        pnts = get_cartesian(sphere.evaluate_many(*get_random_params(200)))
+        np.testing.assert_allclose(np.sum(pnts**2, -1), 1)
+
+    def test_from_skin_curves(self):
+
+        # construct test curves: arcs with different knots at z = 0, 1, 2
+        curves = list()
+        for z, angle in enumerate([np.pi, np.pi / 3, np.pi]):
+            arc = enneper.primitives.CircularArc(angle)
+            ctrl_pnts = np.insert(arc.ctrl_pnts, 2, z * arc.ctrl_pnts[:, 2], 1)
+            curves.append(enneper.Curve(ctrl_pnts, arc.knots))
+        surface = enneper.Surface.from_skin_curves(curves)
+
+        # test: the sections are interpolated
+        self.assertEqual(surface.deg_v, 2)
+        np.testing.assert_equal(surface.knots_u, [0, 0, 0, .5, .5, 1, 1, 1])
+        us, _ = get_random_params(50)
+        for v in [0, .5, 1]:
+            pnts = get_cartesian(surface.evaluate_many(us, np.full(50, v)))
+            np.testing.assert_allclose(np.sum(pnts[:, :2]**2, -1), 1)
+            np.testing.assert_allclose(pnts[:, 2], 2 * v)
+
+    def test_from_sweep_curve(self):
+
+        # construct test surface: unit circle swept along a planar curve
+        xs = np.linspace(0, 5, 20)
+        trajectory = enneper.Curve.fit(np.c_[xs, np.sin(xs), 0 * xs], 3)
+        circle = enneper.primitives.CircularArc(2 * np.pi)
+        tube = enneper.Surface.from_sweep_curve(circle, trajectory, 40)
+
+        # test: all points have distance 1 to the trajectory
+        pnts = get_cartesian(tube.evaluate_many(*get_random_params(200)))
+        _, _, dists = trajectory.closest_points(pnts)
+        np.testing.assert_allclose(dists, 1, atol=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
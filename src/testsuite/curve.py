@@ -24,6 +24,8 @@
 # standard packages
 import cStringIO
 import json
+import os
+import tempfile
 import unittest
 
 # 3rd party packages
@@ -88,6 +90,111 @@ class TestCurve(unittest.TestCase):
         curve = enneper.Curve(CTRL_PNTS, KNOTS)
         np.testing.assert_equal(curve.evaluate_at(1), [3.5, 3., 2.5])
 
+    def test_evaluate_many(self):
+
+        # test against the scalar path
+        curve = enneper.Curve(CTRL_PNTS, KNOTS)
+        us = np.linspace(0, 3, 31)
+        desired = [curve.evaluate_at(u) for u in us]
+        np.testing.assert_equal(curve.evaluate_many(us), desired)
+
+    def test_evaluate_many_out(self):
+
+        # test
+        curve = enneper.Curve(CTRL_PNTS, KNOTS)
+        out = np.empty((2, 3))
+        actual = curve.evaluate_many([1, 3], out=out)
+        self.assertIs(actual, out)
+        np.testing.assert_equal(out, [[3.5, 3., 2.5], [5, -1, 1]])
+
+    def test_evaluate_many_cartesian(self):
+
+        # test against the separate projection, with and without cache
+        curve = enneper.Curve(CTRL_PNTS, KNOTS)
+        us = np.linspace(0, 3, 31)
+        desired = enneper.foundation.get_cartesian_points(
+            curve.evaluate_many(us))
+        np.testing.assert_equal(curve.evaluate_many(us, cartesian=True),
+                                desired)
+        enneper.cache.enable_cache()
+        try:
+            out = np.empty((31, 2))
+            actual = curve.evaluate_many(us, out=out, cartesian=True)
+        finally:
+            enneper.cache.disable_cache()
+        self.assertIs(actual, out)
+        np.testing.assert_equal(out, desired)
+        self.assertRaises(ValueError, curve.evaluate_many, us,
+                          np.empty((31, 3)), True)
+
+    def test_evaluate_many_float32(self):
+
+        # test: single precision control points and points, double knots
+        curve = enneper.Curve(CTRL_PNTS, KNOTS).astype(np.float32)
+        self.assertEqual(curve.ctrl_pnts.dtype, np.float32)
+        self.assertEqual(curve.knots.dtype, np.double)
+        us = np.linspace(0, 3, 31)
+        actual = curve.evaluate_many(us)
+        self.assertEqual(actual.dtype, np.float32)
+        desired = enneper.Curve(CTRL_PNTS, KNOTS).evaluate_many(us)
+        np.testing.assert_allclose(actual, desired, rtol=1e-6)
+        self.assertEqual(enneper.Curve.from_curve(curve).ctrl_pnts.dtype,
+                         np.float32)
+        self.assertRaises(ValueError, enneper.Curve, CTRL_PNTS, KNOTS,
+                          np.int32)
+
+        # test: out must match the precision and layout of the kernels
+        with self.assertRaisesRegexp(ValueError, r'float32.*\(31, 3\)'):
+            curve.evaluate_many(us, out=np.empty((31, 3)))
+        with self.assertRaisesRegexp(ValueError, r'float64.*\(31, 3\)'):
+            enneper.Curve(CTRL_PNTS, KNOTS).evaluate_many(
+                us, out=np.empty((3, 31)).T)
+
+        # test: points and derivatives have the precision of the control
+        # points unless another one is asked for
+        self.assertEqual(curve.evaluate_at(1.5).dtype, np.float32)
+        self.assertEqual(curve.derivatives_many(us, 2).dtype, np.float32)
+        self.assertEqual(curve.derivatives_many(us, 2, True).dtype,
+                         np.float32)
+        self.assertEqual(curve.tangents(us).dtype, np.float32)
+        self.assertEqual(curve.derivatives_many(us, 2, dtype=np.double).dtype,
+                         np.double)
+
+    def test_derivatives_many(self):
+
+        # the zeroth derivative is the point itself
+        curve = enneper.Curve(CTRL_PNTS, KNOTS)
+        ders = curve.derivatives_many([1], 2)
+        np.testing.assert_almost_equal(ders[:, 0], curve.evaluate_many([1]))
+        self.assertEqual(ders.shape, (1, 3, 3))
+
+    def test_derivatives_many_cartesian(self):
+
+        # The NURBS Book 2nd edition: example 4.1 (page 126)
+        curve = enneper.Curve(CTRL_PNTS, KNOTS)
+        ders = curve.derivatives_many([0, 1], 1, cartesian=True)
+        np.testing.assert_almost_equal(ders[0], [[0, 0], [8, 8]])
+        np.testing.assert_almost_equal(ders[1, 0], [1.4, 1.2])
+
+    def test_tangents(self):
+
+        # test
+        curve = enneper.primitives.CircularArc(2 * np.pi)
+        tangents = curve.tangents([0, .25, .5, .75])
+        np.testing.assert_almost_equal(
+            tangents, [[0, 1], [-1, 0], [0, -1], [1, 0]])
+
+    def test_insert_knot(self):
+
+        # the shape of the curve doesn't change
+        curve = enneper.Curve(CTRL_PNTS, KNOTS)
+        refined = curve.insert_knot(.5, 2)
+        np.testing.assert_equal(
+            refined.knots, [0, 0, 0, .5, .5, 1, 2, 3, 3, 3])
+        us = np.linspace(0, 3, 31)
+        np.testing.assert_almost_equal(
+            refined.evaluate_many(us), curve.evaluate_many(us))
+
     def test_export(self):
 
         # construct test obj_to_serialize
@@ -102,6 +209,36 @@ class TestCurve(unittest.TestCase):
         np.testing.assert_equal(obj_to_serialize['ctrl_pnts'], CTRL_PNTS)
         np.testing.assert_equal(obj_to_serialize['knots'], KNOTS)
 
+    def test_export_binary(self):
+
+        # round trip
+        file_like_obj = cStringIO.StringIO()
+        curve = enneper.Curve(CTRL_PNTS, KNOTS)
+        curve.export_binary(file_like_obj)
+        file_like_obj.seek(0)
+        copy = enneper.Curve.from_binary(file_like_obj)
+        file_like_obj.close()
+
+        # test
+        np.testing.assert_equal(copy.ctrl_pnts, CTRL_PNTS)
+        np.testing.assert_equal(copy.knots, KNOTS)
+
+    def test_from_binary_mmap(self):
+
+        # construct test file
+        fd, filename = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as file_like_obj:
+            enneper.Curve(CTRL_PNTS, KNOTS).export_binary(file_like_obj)
+
+        # test
+        with open(filename, 'rb') as file_like_obj:
+            curve = enneper.Curve.from_binary(file_like_obj, mmap_mode='r')
+            np.testing.assert_equal(curve.ctrl_pnts, CTRL_PNTS)
+            np.testing.assert_equal(curve.knots, KNOTS)
+            self.assertFalse(curve.ctrl_pnts.flags.owndata)
+            del curve
+        os.remove(filename)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -25,29 +25,32 @@ import unittest
 
 import numpy as np
 
-import enneper.curves as ec
-import enneper.factory.nurbs as fcty
+import enneper
 
 
 class TestNURBSFactory(unittest.TestCase):
 
     def setUp(self):
         wm = 0.707106781185
-        kwargs = dict()
-        kwargs['ctrl_points'] = np.zeros((5, 4))
-        kwargs['ctrl_points'][0] = [0., 0., 1., 1.]
-        kwargs['ctrl_points'][1] = [-wm, 0., wm, wm]
-        kwargs['ctrl_points'][2] = [-1., 0., 0., 1.]
-        kwargs['ctrl_points'][3] = [-wm, 0., -wm, wm]
-        kwargs['ctrl_points'][4] = [0., 0., -1., 1.]
-        kwargs['knots'] = [0, 0, 0, .5, .5, 1, 1, 1]
-        kwargs['degree'] = 2
-        self.curve = ec.NURBSCurve(**kwargs)
+        ctrl_pnts = np.zeros((5, 4))
+        ctrl_pnts[0] = [0., 0., 1., 1.]
+        ctrl_pnts[1] = [-wm, 0., wm, wm]
+        ctrl_pnts[2] = [-1., 0., 0., 1.]
+        ctrl_pnts[3] = [-wm, 0., -wm, wm]
+        ctrl_pnts[4] = [0., 0., -1., 1.]
+        knots = [0, 0, 0, .5, .5, 1, 1, 1]
+        self.curve = enneper.Curve(ctrl_pnts, knots)
 
     def test_surface_of_revolution(self):
         pos_v = [0, 0, 0]
         dir_v = [0, 0, 1]
         phi = 2 * np.pi
-        sphere = fcty.get_surface_of_revolution(self.curve, pos_v, dir_v, phi)
-        opt = {'vertex_count_u': 50, 'vertex_count_v': 50}
-        sphere.export_as_vrml('spehre', **opt)
+        sphere = enneper.Surface.from_revolve_curve(self.curve, pos_v, dir_v,
+                                                    phi)
+        us, vs = np.meshgrid(np.linspace(0, 1, 50), np.linspace(0, 1, 50))
+        pnts = sphere.evaluate_many(us.ravel(), vs.ravel(), cartesian=True)
+        np.testing.assert_allclose(np.sum(pnts**2, -1), 1, rtol=1e-11)
+
+
+if __name__ == '__main__':
+    unittest.main()
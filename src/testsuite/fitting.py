@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.cfoundation as cfdn
+import enneper.fitting as fit
+
+
+# helix with noise
+T = np.linspace(0, 4 * np.pi, 5000)
+PNTS = np.c_[np.cos(T), np.sin(T), T / 5] + \
+    np.random.RandomState(0).normal(0, 1e-5, (len(T), 3))
+
+# height field on a grid
+U, V = np.meshgrid(np.linspace(0, 1, 60), np.linspace(0, 1, 40), indexing='ij')
+GRID = np.dstack((U, V, np.sin(3 * U) * np.cos(2 * V)))
+
+
+class TestFitting(unittest.TestCase):
+
+    def test_get_params(self):
+
+        # test
+        pnts = [[0, 0], [1, 0], [1, 4]]
+        np.testing.assert_allclose(fit.get_params(pnts), [0, .2, 1])
+        np.testing.assert_allclose(fit.get_params(pnts, 'centripetal'),
+                                   [0, 1 / 3., 1])
+        with self.assertRaises(ValueError):
+            fit.get_params(pnts, 'uniform')
+
+    def test_duplicate_points(self):
+
+        # test: the coincident points are named instead of a singular solve
+        pnts = [[0, 0], [0, 0], [1, 1], [2, 0]]
+        with self.assertRaisesRegexp(ValueError, '0 and 1'):
+            enneper.Curve.fit(pnts, 2)
+        with self.assertRaisesRegexp(ValueError, '0 and 1'):
+            enneper.Curve.fit(pnts, 1, n_ctrl=3)
+
+    def test_get_knots(self):
+
+        # see "The NURBS Book" 2nd edition: example 9.1
+        params = [0, 5 / 17., 9 / 17., 14 / 17., 1]
+        np.testing.assert_allclose(fit.get_interpolation_knots(params, 3),
+                                   [0, 0, 0, 0, 28 / 51., 1, 1, 1, 1])
+        knots = fit.get_approximation_knots(fit.get_params(PNTS), 3, 50)
+        self.assertEqual(len(knots), 54)
+        self.assertTrue(np.all(np.diff(knots) >= 0))
+
+    def test_solve_banded(self):
+
+        # construct test system
+        random_state = np.random.RandomState(0)
+        a = np.diag(random_state.uniform(4, 5, 7))
+        for k in [1, -1, -2]:
+            a += np.diag(random_state.uniform(-1, 1, 7 - abs(k)), k)
+        ab = np.zeros((4, 7))
+        for i, j in zip(*np.nonzero(a)):
+            ab[1 + i - j, j] = a[i, j]
+        rhs = random_state.uniform(-1, 1, (7, 2))
+
+        # test
+        x = rhs.copy()
+        cfdn.solve_banded(2, 1, ab, x)
+        np.testing.assert_allclose(np.dot(a, x), rhs)
+
+    def test_interpolate(self):
+
+        # test
+        curve = enneper.Curve.fit(PNTS[::50], 3)
+        pnts = curve.evaluate_many(fit.get_params(PNTS[::50]))
+        np.testing.assert_allclose(pnts[:, :3], PNTS[::50], atol=1e-12)
+        np.testing.assert_allclose(pnts[:, 3], 1)
+
+    def test_approximate(self):
+
+        # test
+        curve = enneper.Curve.fit(PNTS, 3, n_ctrl=40)
+        self.assertEqual(curve.ctrl_pnts.shape, (40, 4))
+        np.testing.assert_equal(curve.ctrl_pnts[[0, -1], :3], PNTS[[0, -1]])
+        pnts = curve.evaluate_many(fit.get_params(PNTS))
+        self.assertLess(np.max(np.abs(pnts[:, :3] - PNTS)), 1e-3)
+
+    def test_tolerance(self):
+
+        # test
+        curve = enneper.Curve.fit(PNTS, 3, tol=1e-4, method='centripetal')
+        params = fit.get_params(PNTS, 'centripetal')
+        pnts = curve.evaluate_many(params)
+        self.assertLessEqual(np.max(np.abs(pnts[:, :3] - PNTS)), 1e-4)
+        self.assertLess(len(curve.ctrl_pnts), len(PNTS))
+
+    def test_fit_grid(self):
+
+        # construct test parameters
+        params_u = fit.get_grid_params(GRID)
+        params_v = fit.get_grid_params(GRID.swapaxes(0, 1))
+        self.assertEqual((params_u[0], params_u[-1]), (0, 1))
+        self.assertTrue(np.all(np.diff(params_u) > 0))
+
+        # test interpolation
+        surface = enneper.Surface.fit(GRID, 3, 2)
+        self.assertEqual(surface.ctrl_pnts.shape, (60, 40, 4))
+        pnts = surface.evaluate_grid(params_u, params_v)
+        np.testing.assert_allclose(pnts[..., :3], GRID, atol=1e-12)
+
+        # test least squares
+        surface = enneper.Surface.fit(GRID, 3, 3, 12, 10)
+        self.assertEqual(surface.ctrl_pnts.shape, (12, 10, 4))
+        pnts = surface.evaluate_grid(params_u, params_v)
+        self.assertLess(np.max(np.abs(pnts[..., :3] - GRID)), 1e-3)
+
+    def test_fit_scattered(self):
+
+        # construct test points
+        random_state = np.random.RandomState(0)
+        params = random_state.uniform(0, 1, (20000, 2))
+        heights = np.sin(3 * params[:, 0]) * np.cos(2 * params[:, 1])
+        pnts = np.c_[params, heights]
+
+        # test: plane parameters span the unit square
+        plane_params = fit.get_plane_params(pnts)
+        np.testing.assert_allclose(np.min(plane_params, 0), 0)
+        np.testing.assert_allclose(np.max(plane_params, 0), 1)
+        surface = enneper.Surface.fit(pnts, 3, 3, 10, 10, params=params)
+        fitted = surface.evaluate_many(params[:, 0], params[:, 1])
+        self.assertLess(np.max(np.abs(fitted[:, :3] - pnts)), 1e-3)
+
+        # smoothing flattens the control net
+        smooth = enneper.Surface.fit(pnts, 3, 3, 10, 10, params=params,
+                                     smoothing=1.)
+
+        def roughness(surface):
+            return np.sum(np.diff(surface.ctrl_pnts[..., 2], 2, 0)**2)
+        self.assertLess(roughness(smooth), roughness(surface))
+        with self.assertRaises(ValueError):
+            enneper.Surface.fit(pnts, 3, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
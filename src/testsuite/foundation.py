@@ -85,3 +85,17 @@ class TestFoundation(unittest.TestCase):
         actual = fdn.nurbs.get_cartesian_points(ctrl_pnts)
         desired = np.array([[[1, 0], [1, 1]], [[0, 1], [-1, 1]]])
         np.testing.assert_equal(actual, desired)
+
+    def test_intersect_lines_of_a_pair(self):
+        pos_v = np.array([[1., 0, 0], [2, 1, 1]])
+        dir_v = np.array([[1, 1, 0], [0, 0, 1]])
+        pnt, mua = fdn.intersect_lines(pos_v, dir_v)
+        np.testing.assert_allclose(pnt, [2, 1, 0])
+        np.testing.assert_allclose(mua, 1)
+
+    def test_intersect_lines_of_stacked_pairs(self):
+        pos_v = np.array([[[1., 0, 0], [0, 0, 0]], [[2, 1, 1], [0, 0, 5]]])
+        dir_v = np.array([[[1, 1, 0], [2, 0, 0]], [[0, 0, 1], [0, 1, 0]]])
+        pnt, mua = fdn.intersect_lines(pos_v, dir_v)
+        np.testing.assert_allclose(pnt, [[2, 1, 0], [0, 0, 0]])
+        np.testing.assert_allclose(mua, [1, 0])
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.intersection as isc
+
+
+def get_unit_sphere():
+    arc = enneper.primitives.CircularArc(np.pi)
+    ctrl_pnts = np.zeros((len(arc.ctrl_pnts), 4))
+    ctrl_pnts[:, [2, 0, 3]] = arc.ctrl_pnts * [-1, 1, 1]
+    half_circle = enneper.Curve(ctrl_pnts, arc.knots)
+    return enneper.Surface.from_revolve_curve(half_circle, [0, 0, 0],
+                                              [0, 0, 1])
+
+
+class TestSurfaceIntersection(unittest.TestCase):
+
+    def test_split_bezier(self):
+
+        # test: both halves reproduce the curve
+        coeffs = np.array([[0., 1.], [2., 3.], [1., -1.], [4., 0.]])
+        left, right = isc.split_bezier(coeffs, 0)
+        np.testing.assert_equal(left[0], coeffs[0])
+        np.testing.assert_equal(right[-1], coeffs[-1])
+        np.testing.assert_allclose(left[-1], right[0])
+        np.testing.assert_allclose(left[-1], [1.625, .875])
+
+    def test_intersect_rays(self):
+
+        # construct test rays
+        random_state = np.random.RandomState(0)
+        origins = random_state.uniform(-3, 3, (300, 3))
+        dirs = random_state.uniform(-.8, .8, (300, 3)) - origins
+
+        # analytic nearest intersections with the unit sphere
+        a = np.sum(dirs * dirs, 1)
+        b = 2 * np.sum(origins * dirs, 1)
+        discs = b * b - 4 * a * (np.sum(origins * origins, 1) - 1)
+        roots = np.sqrt(np.maximum(discs, 0))
+        ts = np.where(-b - roots >= 0, -b - roots, -b + roots) / (2 * a)
+
+        # test
+        params, pnts, actual = get_unit_sphere().intersect_rays(origins, dirs)
+        is_hit = np.isfinite(actual)
+        np.testing.assert_equal(is_hit, discs > 0)
+        np.testing.assert_allclose(actual[is_hit], ts[is_hit], atol=1e-8)
+        np.testing.assert_allclose(
+            pnts[is_hit], origins[is_hit] + ts[is_hit, None] * dirs[is_hit],
+            atol=1e-8)
+        self.assertTrue(np.all(np.isnan(params[~is_hit])))
+
+    def test_slice(self):
+
+        # construct test planes
+        offsets = np.linspace(-.9, .9, 7)
+        sphere = get_unit_sphere()
+
+        # test
+        planes, params, pnts = sphere.slice([0, 0, 2], offsets)
+        np.testing.assert_equal(np.unique(planes), np.arange(7))
+        np.testing.assert_allclose(pnts[:, 2], offsets[planes], atol=1e-9)
+        np.testing.assert_allclose(np.sum(pnts**2, 1), 1)
+        h_pnts = sphere.evaluate_many(params[:, 0], params[:, 1])
+        np.testing.assert_allclose(h_pnts[:, :3] / h_pnts[:, 3:], pnts)
+
+        # planes missing the surface
+        planes, params, pnts = sphere.slice([0, 0, 1], [2.])
+        self.assertEqual(pnts.shape, (0, 3))
+
+
+class TestCurveIntersection(unittest.TestCase):
+
+    def setUp(self):
+        arc = enneper.primitives.CircularArc(2 * np.pi)
+        self.circle = enneper.Curve(arc.ctrl_pnts, arc.knots)
+
+    def test_intersect_lines(self):
+
+        # test: diagonal through the center and horizontal line y = 1/2
+        lines, us, ts = self.circle.intersect_lines([[0, 0], [0, .5]],
+                                                    [[1, 1], [1, 0]])
+        np.testing.assert_equal(lines, [0, 0, 1, 1])
+        np.testing.assert_allclose(us[:2], [.125, .625])
+        np.testing.assert_allclose(ts, [.5**.5, -.5**.5, .75**.5, -.75**.5])
+        h_pnts = self.circle.evaluate_many(us)
+        np.testing.assert_allclose(h_pnts[2:, 1] / h_pnts[2:, 2], .5)
+
+        # test: lines missing the curve
+        lines, us, ts = self.circle.intersect_lines([0, 2], [1, 0])
+        self.assertEqual(len(us), 0)
+
+        # test: tangents touch the curve once, also across its seam
+        lines, us, ts = self.circle.intersect_lines([[0, 1], [1, 0]],
+                                                    [[1, 0], [0, 1]])
+        np.testing.assert_equal(lines, [0, 1])
+        np.testing.assert_allclose(us, [.25, 0], atol=1e-4)
+
+    def test_intersect_lines_3d(self):
+
+        # construct test data
+        ctrl_pnts = np.insert(self.circle.ctrl_pnts, 2, 0, axis=1)
+        circle = enneper.Curve(ctrl_pnts, self.circle.knots)
+
+        # test
+        lines, us, ts = circle.intersect_lines([[0, 1, -1], [0, 0, 1]],
+                                               [[0, 0, 1], [1, 0, 0]])
+        np.testing.assert_equal(lines, [0])
+        np.testing.assert_allclose(us, [.25])
+        np.testing.assert_allclose(ts, [1])
+
+    def test_intersect_curves(self):
+
+        # construct test data
+        random_state = np.random.RandomState(0)
+        centers = random_state.uniform(-2, 2, (50, 2))
+        others = list()
+        for center in centers:
+            other = enneper.Curve.from_curve(self.circle)
+            other.transform(enneper.matrices.translate(center))
+            others.append(other)
+
+        # test: circles with centers closer than 2 intersect twice
+        indices, us, vs = self.circle.intersect_curves(others)
+        dists = np.sqrt(np.sum(centers**2, 1))
+        np.testing.assert_equal(np.bincount(indices, minlength=50),
+                                2 * (dists < 2))
+        h_pnts = self.circle.evaluate_many(us)
+        pnts = h_pnts[:, :2] / h_pnts[:, 2:]
+        for index, pnt, v in zip(indices, pnts, vs):
+            h_pnt = others[index].evaluate_many(np.array([v]))[0]
+            np.testing.assert_allclose(h_pnt[:2] / h_pnt[2], pnt, atol=1e-9)
+        np.testing.assert_allclose(np.sum(pnts**2, 1), 1)
+
+    def test_intersect_curves_touching(self):
+
+        # construct test data
+        others = list()
+        for center in ([2, 0], [0, 2]):
+            other = enneper.Curve.from_curve(self.circle)
+            other.transform(enneper.matrices.translate(center))
+            others.append(other)
+
+        # test: circles touching once, also across the seam of the curve
+        indices, us, vs = self.circle.intersect_curves(others)
+        np.testing.assert_equal(indices, [0, 1])
+        np.testing.assert_allclose(np.minimum(us, 1 - us), [0, .25],
+                                   atol=1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
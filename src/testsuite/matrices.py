@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import os
+import tempfile
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.matrices as mat
+import testsuite.curve as tc
+import testsuite.surface as ts
+
+
+class TestMatrices(unittest.TestCase):
+
+    def test_builders(self):
+
+        # test planar transforms
+        pnt = np.array([1., 2., 1.])
+        np.testing.assert_allclose(np.dot(mat.rotate(np.pi / 2), pnt),
+                                   [-2, 1, 1], atol=1e-15)
+        np.testing.assert_allclose(np.dot(mat.scale([2, 3], [1, 1]), pnt),
+                                   [1, 4, 1])
+        np.testing.assert_allclose(np.dot(mat.mirror([1, 0], [2, 0]), pnt),
+                                   [3, 2, 1])
+
+        # test spatial rotation about the z-axis through (1, 1, 0)
+        matrix = mat.rotate(np.pi, [0, 0, 2], [1, 1, 0])
+        np.testing.assert_allclose(np.dot(matrix, [2, 1, 5, 1]),
+                                   [0, 1, 5, 1], atol=1e-15)
+
+    def test_uniform_scale(self):
+
+        # test: a single factor needs the dimension
+        np.testing.assert_equal(mat.scale(2., dim=3), mat.scale([2, 2, 2]))
+        np.testing.assert_allclose(np.dot(mat.scale(2., [1, 1]), [1, 2, 1]),
+                                   [1, 3, 1])
+        np.testing.assert_equal(mat.TransformStack(2).scale(3).matrix,
+                                mat.scale([3, 3]))
+        self.assertRaises(ValueError, mat.scale, 2.)
+
+    def test_transform_stack(self):
+
+        # construct test stack
+        stack = mat.TransformStack(2).translate([1, 0]).rotate(np.pi / 2)
+        self.assertEqual(len(stack), 2)
+
+        # test: the first transform is applied first
+        desired = np.dot(mat.rotate(np.pi / 2), mat.translate([1, 0]))
+        np.testing.assert_allclose(np.asarray(stack), desired)
+        stack.pop()
+        np.testing.assert_allclose(stack.matrix, mat.translate([1, 0]))
+        with self.assertRaises(ValueError):
+            stack.push(np.identity(4))
+
+    def test_apply(self):
+
+        # construct test points
+        random_state = np.random.RandomState(0)
+        pnts = random_state.uniform(-1, 1, (100, 7, 4))
+        matrix = mat.compose(mat.rotate(1., [1, 2, 3]), mat.scale([1, 2, 3]))
+        desired = np.dot(pnts, matrix.T)
+
+        # test chunked in-place application
+        actual = mat.apply(matrix, pnts, chunk_size=64)
+        self.assertIs(actual, pnts)
+        np.testing.assert_allclose(pnts, desired)
+
+        # test one matrix per entity
+        matrices = random_state.uniform(-1, 1, (100, 4, 4))
+        desired = np.einsum('bij,bkj->bki', matrices, pnts)
+        mat.apply(matrices, pnts, chunk_size=64)
+        np.testing.assert_allclose(pnts, desired)
+
+    def test_transform_curve_and_surface(self):
+
+        # construct test objects
+        matrix = mat.TransformStack(2).rotate(.3).translate([1, 2])
+        curve = enneper.Curve(tc.CTRL_PNTS, tc.KNOTS)
+        surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+        ctrl_pnts = surface.ctrl_pnts
+
+        # test
+        desired = curve.evaluate_many([.5, 1.5])
+        matrix.apply(curve)
+        np.testing.assert_allclose(curve.evaluate_many([.5, 1.5]),
+                                   np.dot(desired, matrix.matrix.T))
+        desired = surface.evaluate_at(.3, .4)
+        surface.transform(mat.scale([2, 2, 2]))
+        self.assertIs(surface.ctrl_pnts, ctrl_pnts)
+        np.testing.assert_allclose(surface.evaluate_at(.3, .4),
+                                   desired * [2, 2, 2, 1])
+
+    def test_transform_keeps_caller_arrays(self):
+
+        # arrays of the caller are shared, but not transformed behind its
+        # back; the copy is made once
+        ctrl_pnts = np.array(tc.CTRL_PNTS, dtype=np.double)
+        curve = enneper.Curve(ctrl_pnts, tc.KNOTS)
+        self.assertIs(curve.ctrl_pnts, ctrl_pnts)
+        curve.transform(mat.translate([1, 2]))
+        np.testing.assert_equal(ctrl_pnts, tc.CTRL_PNTS)
+        self.assertFalse(np.may_share_memory(curve.ctrl_pnts, ctrl_pnts))
+        copy = curve.ctrl_pnts
+        curve.transform(mat.translate([-1, -2]))
+        self.assertIs(curve.ctrl_pnts, copy)
+        np.testing.assert_allclose(copy, tc.CTRL_PNTS)
+
+        # arrays made by the constructors are owned and not copied again
+        for obj in (enneper.Curve.from_curve(curve), curve.astype(np.float32),
+                    curve.insert_knot(1.5)):
+            ctrl_pnts = obj.ctrl_pnts
+            obj.transform(mat.translate([1, 2]))
+            self.assertIs(obj.ctrl_pnts, ctrl_pnts)
+        np.testing.assert_allclose(curve.ctrl_pnts, tc.CTRL_PNTS)
+
+        # read-only control points are replaced by transformed copies
+        ctrl_pnts = np.array(ts.CTRL_PNTS, dtype=np.double)
+        ctrl_pnts.flags.writeable = False
+        surface = enneper.Surface(ctrl_pnts, ts.KNOTS_U, ts.KNOTS_V)
+        self.assertIs(surface.ctrl_pnts, ctrl_pnts)
+        surface.transform(mat.scale([2, 2, 2]))
+        np.testing.assert_equal(ctrl_pnts, ts.CTRL_PNTS)
+        np.testing.assert_equal(surface.ctrl_pnts,
+                                ctrl_pnts * [2, 2, 2, 1])
+
+    def test_transform_memory_mapped_curve(self):
+
+        # construct test file
+        fd, filename = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as file_like_obj:
+            enneper.Curve(tc.CTRL_PNTS, tc.KNOTS).export_binary(file_like_obj)
+
+        # test: the mapped file is left untouched
+        with open(filename, 'rb') as file_like_obj:
+            curve = enneper.Curve.from_binary(file_like_obj, mmap_mode='r')
+            curve.transform(mat.translate([1, 2]))
+            desired = np.array(tc.CTRL_PNTS, dtype=np.double)
+            desired[:, :2] += [[1, 2]] * desired[:, 2:]
+            np.testing.assert_allclose(curve.ctrl_pnts, desired)
+            del curve
+        with open(filename, 'rb') as file_like_obj:
+            curve = enneper.Curve.from_binary(file_like_obj)
+        np.testing.assert_equal(curve.ctrl_pnts, tc.CTRL_PNTS)
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.parallel as parallel
+import testsuite.surface as ts
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+
+        # spheres dented at different control points, so that the meshes
+        # have different sizes
+        self.surfaces = list()
+        for i in range(7):
+            surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+            surface.ctrl_pnts[i % 5, i % 4, :3] *= 1 + .1 * i
+            self.surfaces.append(surface)
+
+    def test_pack_surfaces(self):
+
+        # test: unpacked surfaces are views of the packed arrays
+        packed = parallel.pack_surfaces(self.surfaces)
+        for i, surface in enumerate(self.surfaces):
+            actual = parallel.unpack_surface(*(packed + (i,)))
+            np.testing.assert_equal(actual.ctrl_pnts, surface.ctrl_pnts)
+            np.testing.assert_equal(actual.knots_u, surface.knots_u)
+            np.testing.assert_equal(actual.knots_v, surface.knots_v)
+            self.assertTrue(np.may_share_memory(actual.ctrl_pnts, packed[1]))
+
+    def test_tessellate_surfaces(self):
+
+        desired = [s.tessellate(1e-2, 6) for s in self.surfaces]
+        for n_processes in (1, 3):
+            result = parallel.tessellate_surfaces(
+                self.surfaces, 1e-2, 6, n_processes, chunk_size=2)
+            vertices, triangles, params, vertex_offsets, triangle_offsets = \
+                result
+
+            # test: meshes are in the order of the surfaces
+            for i, mesh in enumerate(desired):
+                lb, ub = vertex_offsets[i:i + 2]
+                np.testing.assert_equal(vertices[lb:ub], mesh[0])
+                np.testing.assert_equal(params[lb:ub], mesh[2])
+                lb, ub = triangle_offsets[i:i + 2]
+                np.testing.assert_equal(triangles[lb:ub], mesh[1])
+            self.assertEqual(len(vertices), vertex_offsets[-1])
+            self.assertEqual(len(triangles), triangle_offsets[-1])
+
+    def test_tessellate_surfaces_errors(self):
+
+        # test: a failing worker doesn't block the others
+        bad = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U[:3], ts.KNOTS_V)
+        self.assertRaises(RuntimeError, parallel.tessellate_surfaces,
+                          self.surfaces + [bad], 1e-2, 4, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
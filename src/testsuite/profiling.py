@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import cStringIO
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.profiling as profiling
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.curve = enneper.primitives.CircularArc(np.pi)
+
+    def tearDown(self):
+        profiling.disable_profiling()
+
+    def test_disabled(self):
+
+        # test: nothing is patched while profiling is disabled
+        evaluate_many = enneper.Curve.__dict__['evaluate_many']
+        from_json = enneper.Curve.__dict__['from_json']
+        with profiling.collect():
+            self.assertIsNot(enneper.Curve.__dict__['evaluate_many'],
+                             evaluate_many)
+        self.assertIs(enneper.Curve.__dict__['evaluate_many'], evaluate_many)
+        self.assertIs(enneper.Curve.__dict__['from_json'], from_json)
+        self.assertIsNone(profiling.get_profiler())
+
+    def test_collect(self):
+
+        # profile some calls
+        with profiling.collect() as profiler:
+            self.curve.evaluate_at(.3)
+            self.curve.evaluate_many(np.linspace(0, 1, 100))
+            self.curve.evaluate_many(np.linspace(0, 1, 3))
+            self.curve.transform(enneper.matrices.translate([1, 2]))
+            file_like_obj = cStringIO.StringIO()
+            self.curve.export(file_like_obj)
+            file_like_obj.seek(0)
+            enneper.Curve.from_json(file_like_obj)
+
+        # test
+        snapshot = profiler.snapshot()
+        self.assertEqual(snapshot['Curve.evaluate_at']['calls'], 1)
+        self.assertEqual(snapshot['cfoundation.get_index']['calls'], 1)
+        self.assertEqual(snapshot['Curve.evaluate_many']['histogram'],
+                         {4: 1, 128: 1})
+        self.assertEqual(snapshot['matrices.apply']['histogram'], {8: 1})
+        self.assertEqual(snapshot['Curve.export']['calls'], 1)
+        self.assertEqual(snapshot['Curve.from_json']['histogram'], {})
+        for stats in snapshot.values():
+            self.assertTrue(0 <= stats['mean_seconds'] <= stats['max_seconds'])
+        self.assertIn('Curve.evaluate_many', profiler.report())
+
+    def test_nested(self):
+
+        # test: the outer profiler includes the calls of the inner scope and
+        # keeps collecting after it
+        with profiling.collect() as outer:
+            with profiling.collect() as inner:
+                self.curve.evaluate_at(.5)
+                self.curve.evaluate_many(np.linspace(0, 1, 5))
+            self.curve.evaluate_at(.5)
+        self.assertEqual(inner.snapshot()['Curve.evaluate_at']['calls'], 1)
+        stats = outer.snapshot()
+        self.assertEqual(stats['Curve.evaluate_at']['calls'], 2)
+        self.assertEqual(stats['Curve.evaluate_many']['calls'], 1)
+        self.assertEqual(stats['Curve.evaluate_many']['histogram'], {8: 1})
+        self.assertIsNone(profiling.get_profiler())
+
+
+if __name__ == '__main__':
+    unittest.main()
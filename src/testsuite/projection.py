@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.projection as prj
+import testsuite.surface as ts
+
+
+class TestProjection(unittest.TestCase):
+
+    def setUp(self):
+        self.random = np.random.RandomState(0)
+
+    def test_seed_index(self):
+
+        # the grid finds the same nearest samples as a brute force search
+        pnts = self.random.rand(500, 3)
+        seed_index = prj.SeedIndex(np.arange(500.), pnts, .1)
+        queries = self.random.rand(200, 3) * 1.4 - .2
+        sq_dists = np.sum((queries[:, None] - pnts)**2, -1)
+        np.testing.assert_equal(
+            seed_index.query(queries), np.argmin(sq_dists, 1))
+
+    def test_curve_closest_points(self):
+
+        # the circle is closed, so parameters wrap around at u = 0
+        curve = enneper.primitives.CircularArc(2 * np.pi)
+        angles = self.random.rand(100) * 2 * np.pi
+        radii = self.random.rand(100) + .5
+        pnts = np.column_stack((radii * np.cos(angles),
+                                radii * np.sin(angles)))
+        us, foot_pnts, dists = curve.closest_points(pnts)
+        np.testing.assert_almost_equal(dists, np.abs(radii - 1))
+        np.testing.assert_almost_equal(foot_pnts, pnts / radii[:, None])
+        h_pnts = curve.evaluate_many(us)
+        np.testing.assert_almost_equal(
+            h_pnts[:, :2] / h_pnts[:, 2:], foot_pnts)
+
+    def test_surface_closest_points(self):
+
+        # points around the unit sphere (away from the degenerated poles)
+        surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+        seed_index = prj.SeedIndex.from_surface(surface)
+        pnts = self.random.randn(200, 3)
+        pnts[:, 2] *= .5
+
+        # the seed index is reused for a second batch
+        for batch in (pnts[:100], pnts[100:]):
+            params, foot_pnts, dists = surface.closest_points(
+                batch, seed_index)
+            r = np.sqrt(np.sum(batch * batch, 1))
+            np.testing.assert_almost_equal(dists, np.abs(r - 1))
+            np.testing.assert_almost_equal(foot_pnts, batch / r[:, None])
+        self.assertEqual(params.shape, (100, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
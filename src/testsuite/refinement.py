@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import enneper.refinement as rfn
+import testsuite.curve as tc
+
+
+class TestRefinement(unittest.TestCase):
+
+    def setUp(self):
+        self.ctrl_pnts = np.array(tc.CTRL_PNTS, dtype=np.double)
+        self.knots = np.array(tc.KNOTS, dtype=np.double)
+        self.us = np.linspace(0, 3, 31)
+        self.desired = self._evaluate(self.ctrl_pnts, self.knots)
+
+    def _evaluate(self, ctrl_pnts, knots):
+        return enneper.Curve(ctrl_pnts, knots).evaluate_many(self.us)
+
+    def test_insert_knot(self):
+
+        # shape is preserved, the knot is inserted up to the degree
+        ctrl_pnts, knots = rfn.insert_knot(
+            self.ctrl_pnts, self.knots, tc.DEG, 1.5, 5)
+        np.testing.assert_equal(knots, [0, 0, 0, 1, 1.5, 1.5, 2, 3, 3, 3])
+        self.assertEqual(len(ctrl_pnts), 7)
+        np.testing.assert_almost_equal(
+            self._evaluate(ctrl_pnts, knots), self.desired)
+
+    def test_insert_existing_knot(self):
+
+        # test
+        ctrl_pnts, knots = rfn.insert_knot(
+            self.ctrl_pnts, self.knots, tc.DEG, 2)
+        np.testing.assert_equal(knots, [0, 0, 0, 1, 2, 2, 3, 3, 3])
+        np.testing.assert_almost_equal(
+            self._evaluate(ctrl_pnts, knots), self.desired)
+
+    def test_refine_knots(self):
+
+        # knots at the ends of the domain are skipped
+        new_knots = [0, .5, 1, 2.5, 2.5, 3]
+        ctrl_pnts, knots = rfn.refine_knots(
+            self.ctrl_pnts, self.knots, tc.DEG, new_knots)
+        np.testing.assert_equal(
+            knots, [0, 0, 0, .5, 1, 1, 2, 2.5, 2.5, 3, 3, 3])
+        np.testing.assert_almost_equal(
+            self._evaluate(ctrl_pnts, knots), self.desired)
+
+    def test_decompose(self):
+
+        # every segment is a Bezier curve on its breakpoint interval
+        segments, breakpoints = rfn.decompose(
+            self.ctrl_pnts, self.knots, tc.DEG)
+        np.testing.assert_equal(breakpoints, [0, 1, 2, 3])
+        self.assertEqual(segments.shape, (3, 3, 3))
+        np.testing.assert_almost_equal(segments[0, 0], tc.CTRL_PNTS[0])
+        np.testing.assert_almost_equal(segments[-1, -1], tc.CTRL_PNTS[-1])
+        np.testing.assert_almost_equal(segments[0, -1], segments[1, 0])
+        np.testing.assert_almost_equal(segments[0, -1], self.desired[10])
+
+
+if __name__ == '__main__':
+    unittest.main()
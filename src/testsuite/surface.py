@@ -116,6 +116,135 @@ class TestCurve(unittest.TestCase):
         surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
         np.testing.assert_equal(surface.evaluate_at(0, 0), [ 0,  0,  1,  1])
 
+    def test_evaluate_many(self):
+
+        # test against the scalar path
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        us = np.linspace(0, 1, 17)
+        vs = np.linspace(1, 0, 17)
+        desired = [surface.evaluate_at(u, v) for u, v in zip(us, vs)]
+        np.testing.assert_equal(surface.evaluate_many(us, vs), desired)
+
+    def test_evaluate_many_out(self):
+
+        # test
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        out = np.empty((1, 4))
+        actual = surface.evaluate_many([0], [0], out=out)
+        self.assertIs(actual, out)
+        np.testing.assert_equal(out, [[0, 0, 1, 1]])
+
+    def test_evaluate_many_cartesian(self):
+
+        # test against the separate projection, with and without cache
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        us = np.linspace(0, 1, 17)
+        vs = np.linspace(1, 0, 17)
+        desired = enneper.foundation.get_cartesian_points(
+            surface.evaluate_many(us, vs))
+        np.testing.assert_equal(surface.evaluate_many(us, vs, cartesian=True),
+                                desired)
+        enneper.cache.enable_cache()
+        try:
+            actual = surface.evaluate_many(us, vs, cartesian=True)
+        finally:
+            enneper.cache.disable_cache()
+        np.testing.assert_equal(actual, desired)
+
+        # single precision points are divided in single precision
+        actual = surface.astype(np.float32).evaluate_many(us, vs,
+                                                          cartesian=True)
+        self.assertEqual(actual.dtype, np.float32)
+        np.testing.assert_allclose(actual, desired, rtol=1e-6, atol=1e-6)
+
+    def test_evaluate_many_float32(self):
+
+        # test: single precision control points and points, double knots
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V, np.float32)
+        self.assertEqual(surface.ctrl_pnts.dtype, np.float32)
+        self.assertEqual(surface.knots_u.dtype, np.double)
+        us = np.linspace(0, 1, 17)
+        vs = np.linspace(1, 0, 17)
+        desired = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V).evaluate_many(
+            us, vs)
+        for actual in (surface.evaluate_many(us, vs),
+                       surface.evaluate_grid(us, vs)[np.arange(17),
+                                                     np.arange(17)]):
+            self.assertEqual(actual.dtype, np.float32)
+            np.testing.assert_allclose(actual, desired, rtol=1e-6, atol=1e-7)
+
+        # test: out must match the precision and layout of the kernels
+        for out in (np.empty((17, 4)), np.empty((17, 5), np.float32)[:, :4],
+                    np.empty((17, 3), np.float32)):
+            with self.assertRaisesRegexp(ValueError, r'float32.*\(17, 4\)'):
+                surface.evaluate_many(us, vs, out=out)
+
+        # test: extruded single precision curves stay single precision
+        curve = enneper.Curve([[0, 0, 1], [1, 1, 1]], [0, 0, 1, 1],
+                              np.float32)
+        extrusion = enneper.Surface.from_extrude_curve(curve, [0, 1])
+        self.assertEqual(extrusion.ctrl_pnts.dtype, np.float32)
+        np.testing.assert_equal(extrusion.evaluate_at(1, 1), [1, 2, 1])
+
+        # test: points and derivatives have the precision of the control
+        # points unless another one is asked for
+        self.assertEqual(surface.evaluate_at(.5, .5).dtype, np.float32)
+        self.assertEqual(surface.derivatives_many(us, vs, 1).dtype,
+                         np.float32)
+        self.assertEqual(surface.normals(us, vs).dtype, np.float32)
+        self.assertEqual(
+            surface.derivatives_many(us, vs, 1, dtype=np.double).dtype,
+            np.double)
+
+    def test_evaluate_grid(self):
+
+        # test against the scalar path
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        us = np.linspace(0, 1, 13)
+        vs = np.array([.7, 0, 1, .5, .25])
+        desired = [[surface.evaluate_at(u, v) for v in vs] for u in us]
+        np.testing.assert_almost_equal(surface.evaluate_grid(us, vs), desired)
+
+    def test_derivatives_many(self):
+
+        # the zeroth derivative is the point itself
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        us, vs = [.1, .6], [.3, .8]
+        ders = surface.derivatives_many(us, vs, 2)
+        self.assertEqual(ders.shape, (2, 3, 3, 4))
+        np.testing.assert_almost_equal(
+            ders[:, 0, 0], surface.evaluate_many(us, vs))
+
+    def test_normals(self):
+
+        # the normals of the unit sphere are radial
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        us, vs = np.linspace(0, 1, 9), np.linspace(.1, .9, 9)
+        h_pnts = surface.evaluate_many(us, vs)
+        pnts = h_pnts[:, :-1] / h_pnts[:, -1:]
+        normals = surface.normals(us, vs)
+        np.testing.assert_almost_equal(np.abs(np.sum(normals * pnts, 1)), 1)
+
+    def test_refine_knots(self):
+
+        # the shape of the surface doesn't change
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        refined = surface.refine_knots([.1, .6], [.3])
+        self.assertEqual(refined.ctrl_pnts.shape, (11, 6, 4))
+        us, vs = np.linspace(0, 1, 9), np.linspace(0, 1, 5)
+        np.testing.assert_almost_equal(
+            refined.evaluate_grid(us, vs), surface.evaluate_grid(us, vs))
+
+    def test_decompose(self):
+
+        # test
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        patches, breakpoints_u, breakpoints_v = surface.decompose()
+        self.assertEqual(patches.shape, (4, 2, 3, 3, 4))
+        np.testing.assert_equal(breakpoints_u, [0, .25, .5, .75, 1])
+        np.testing.assert_equal(breakpoints_v, [0, .5, 1])
+        np.testing.assert_almost_equal(patches[1, 1, 0, 0], CTRL_PNTS[2][2])
+
     def test_export(self):
 
         # construct test obj_to_serialize
@@ -131,6 +260,22 @@ class TestCurve(unittest.TestCase):
         np.testing.assert_equal(obj_to_serialize['knots_u'], KNOTS_U)
         np.testing.assert_equal(obj_to_serialize['knots_u'], KNOTS_U)
 
+    def test_export_binary(self):
+
+        # the binary form round trips losslessly with the json form
+        surface = enneper.Surface(CTRL_PNTS, KNOTS_U, KNOTS_V)
+        json_obj, binary_obj = cStringIO.StringIO(), cStringIO.StringIO()
+        surface.export(json_obj)
+        json_obj.seek(0)
+        enneper.Surface.from_json(json_obj).export_binary(binary_obj)
+        binary_obj.seek(0)
+        copy = enneper.Surface.from_binary(binary_obj)
+
+        # test
+        np.testing.assert_equal(copy.ctrl_pnts, surface.ctrl_pnts)
+        np.testing.assert_equal(copy.knots_u, KNOTS_U)
+        np.testing.assert_equal(copy.knots_v, KNOTS_V)
+
 
 if __name__ == '__main__':
     unittest.main()
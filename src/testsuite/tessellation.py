@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ***************************************************************************
+# *   Copyright (C) 2013 by Andreas Kührmann [andreas.kuehrmann@gmail.com]  *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU General Public License as published by  *
+# *   the Free Software Foundation; either version 3 of the License, or     *
+# *   (at your option) any later version.                                   *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU General Public License for more details.                          *
+# *                                                                         *
+# *   You should have received a copy of the GNU General Public License     *
+# *   along with this program; if not, write to the                         *
+# *   Free Software Foundation, Inc.,                                       *
+# *   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+# ***************************************************************************
+
+
+# standard packages
+import collections
+import unittest
+
+# 3rd party packages
+import numpy as np
+
+# project packages
+import enneper
+import testsuite.surface as ts
+
+
+class TestTessellation(unittest.TestCase):
+
+    def setUp(self):
+        self.surface = enneper.Surface(ts.CTRL_PNTS, ts.KNOTS_U, ts.KNOTS_V)
+
+        # dent the sphere, so that the cells are refined non-uniformly
+        self.surface.ctrl_pnts[3, 2, :3] *= 1.5
+
+    def test_tessellate(self):
+
+        # test
+        vertices, triangles, params = self.surface.tessellate(1e-2)
+        self.assertEqual(vertices.shape, (len(params), 3))
+        self.assertEqual(triangles.shape[1], 3)
+        self.assertTrue(vertices.flags.c_contiguous)
+        self.assertTrue(triangles.flags.c_contiguous)
+        self.assertLess(len(triangles), len(self.surface.tessellate(1e-3)[1]))
+
+    def test_tessellate_is_crack_free(self):
+
+        # edges only used by one triangle must lie on the domain boundary
+        vertices, triangles, params = self.surface.tessellate(1e-2)
+        edges = collections.Counter()
+        for triangle in triangles:
+            for i in range(3):
+                edges[tuple(sorted((triangle[i - 1], triangle[i])))] += 1
+        self.assertEqual(max(edges.values()), 2)
+        for edge, count in edges.items():
+            if count == 1:
+                u, v = params[list(edge)].T
+                on_boundary = u[0] == u[1] and u[0] in (0, 1) or \
+                    v[0] == v[1] and v[0] in (0, 1)
+                self.assertTrue(on_boundary)
+
+    def test_tessellate_meets_tolerance(self):
+
+        # centroids of the triangles are close to the surface
+        tol = 1e-3
+        vertices, triangles, params = self.surface.tessellate(tol)
+        centroids = params[triangles].mean(1)
+        h_pnts = self.surface.evaluate_many(centroids[:, 0], centroids[:, 1])
+        pnts = enneper.foundation.get_cartesian_points(h_pnts)
+        errors = np.sqrt(np.sum((vertices[triangles].mean(1) - pnts)**2, 1))
+        self.assertLess(errors.max(), 2 * tol)
+
+
+if __name__ == '__main__':
+    unittest.main()